@@ -1,6 +1,8 @@
 from a2a.server.agent_execution import AgentExecutor
 from a2a.server.agent_execution.context import RequestContext
 from a2a.server.events.event_queue import EventQueue
+from a2a.server.tasks import TaskUpdater
+from a2a.types import TaskState
 from a2a.utils import new_agent_text_message
 from pydantic import BaseModel
 
@@ -27,4 +29,7 @@ class EvenOrOddAgentExecutor(AgentExecutor):
         await event_queue.queue.put(new_agent_text_message(result))
 
     async def cancel(self, context: RequestContext, event_queue: EventQueue):
-        raise NotImplementedError("Cancel is not implemented")
+        # A resposta é imediata, então não há execução em andamento para
+        # interromper: basta marcar a tarefa como cancelada.
+        updater = TaskUpdater(event_queue, context.task_id, context.context_id)
+        await updater.update_status(TaskState.canceled, final=True)
@@ -1,9 +1,10 @@
 import uvicorn
 from a2a.server.apps import A2AStarletteApplication
 from a2a.server.request_handlers import DefaultRequestHandler
-from a2a.server.tasks import InMemoryTaskStore
 from a2a.types import AgentCapabilities, AgentCard, AgentSkill
 from agent_executor import EvenOrOddAgentExecutor
+from metrics import InstrumentedTaskStore, add_metrics_route
+from task_store import BoundedTaskStore
 
 def main():
     skill = AgentSkill(
@@ -24,9 +25,11 @@ def main():
         capabilities=AgentCapabilities(),
     )
 
+    task_store = InstrumentedTaskStore(BoundedTaskStore())
+
     request_handler = DefaultRequestHandler(
         agent_executor=EvenOrOddAgentExecutor(),
-        task_store=InMemoryTaskStore(),
+        task_store=task_store,
     )
     
     app = A2AStarletteApplication(
@@ -34,7 +37,7 @@ def main():
         agent_card=agent_card,
     )
 
-    uvicorn.run(app.build(), host="0.0.0.0", port=8000)
+    uvicorn.run(add_metrics_route(app.build(), task_store), host="0.0.0.0", port=8000)
 
 
 if __name__ == "__main__":
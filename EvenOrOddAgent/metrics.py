@@ -0,0 +1,147 @@
+"""Métricas do agente no formato de texto do Prometheus, em `GET /metrics`.
+
+* `a2a_tasks_in_flight` e `a2a_task_transitions_total` (ver `InstrumentedTaskStore`);
+* `a2a_task_store_size` e `a2a_task_store_evicted`;
+* `event_loop_lag_seconds`, medido enquanto a aplicação estiver rodando.
+"""
+import asyncio
+import bisect
+from collections import Counter
+from contextlib import asynccontextmanager
+
+from a2a.server.tasks import TaskStore
+from a2a.types import Task, TaskState
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+
+# Limites (em segundos) do histograma de atraso do event loop
+LOOP_LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+# Intervalo entre as medições do atraso do event loop
+EVENT_LOOP_LAG_INTERVAL_SECONDS = 0.5
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_ACTIVE_STATES = frozenset(
+    {TaskState.submitted, TaskState.working, TaskState.input_required, TaskState.auth_required}
+)
+
+
+class InstrumentedTaskStore(TaskStore):
+    """Repassa as operações a outro `TaskStore`, contando estados e tarefas em andamento."""
+
+    def __init__(self, inner: TaskStore):
+        self.inner = inner
+        self.transitions: Counter[str] = Counter()
+        # Estado atual das tarefas ainda não finalizadas
+        self._states: dict[str, TaskState] = {}
+
+    async def save(self, task: Task) -> None:
+        state = task.status.state
+        if state != self._states.get(task.id):
+            self.transitions[state.value] += 1
+            if state in _ACTIVE_STATES:
+                self._states[task.id] = state
+            else:
+                self._states.pop(task.id, None)
+        await self.inner.save(task)
+
+    async def get(self, task_id: str) -> Task | None:
+        return await self.inner.get(task_id)
+
+    async def delete(self, task_id: str) -> None:
+        self._states.pop(task_id, None)
+        await self.inner.delete(task_id)
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._states)
+
+
+class EventLoopLagMonitor:
+    """Mede periodicamente quanto o event loop atrasa para acordar uma task."""
+
+    def __init__(self, interval: float = EVENT_LOOP_LAG_INTERVAL_SECONDS):
+        self.interval = interval
+        self.counts = [0] * len(LOOP_LAG_BUCKETS)
+        self.total = 0.0
+        self.count = 0
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - start - self.interval)
+            index = bisect.bisect_left(LOOP_LAG_BUCKETS, lag)
+            if index < len(self.counts):
+                self.counts[index] += 1
+            self.total += lag
+            self.count += 1
+
+
+def render(task_store: InstrumentedTaskStore, lag: EventLoopLagMonitor) -> str:
+    lines = [
+        "# HELP a2a_tasks_in_flight Tarefas A2A ainda não finalizadas",
+        "# TYPE a2a_tasks_in_flight gauge",
+        f"a2a_tasks_in_flight {task_store.in_flight}",
+        "# HELP a2a_task_transitions_total Mudanças de estado das tarefas A2A, pelo novo estado",
+        "# TYPE a2a_task_transitions_total counter",
+        *(
+            f'a2a_task_transitions_total{{state="{state}"}} {count}'
+            for state, count in task_store.transitions.items()
+        ),
+    ]
+    inner = task_store.inner
+    if hasattr(inner, "__len__"):
+        lines += [
+            "# HELP a2a_task_store_size Tarefas A2A em memória",
+            "# TYPE a2a_task_store_size gauge",
+            f"a2a_task_store_size {len(inner)}",
+        ]
+    if hasattr(inner, "evicted"):
+        lines += [
+            "# HELP a2a_task_store_evicted Tarefas descartadas da memória",
+            "# TYPE a2a_task_store_evicted gauge",
+            f"a2a_task_store_evicted {inner.evicted}",
+        ]
+    lines += [
+        "# HELP event_loop_lag_seconds Atraso do event loop em relação ao agendado",
+        "# TYPE event_loop_lag_seconds histogram",
+    ]
+    cumulative = 0
+    for bound, count in zip(LOOP_LAG_BUCKETS, lag.counts):
+        cumulative += count
+        lines.append(f'event_loop_lag_seconds_bucket{{le="{bound}"}} {cumulative}')
+    lines += [
+        f'event_loop_lag_seconds_bucket{{le="+Inf"}} {lag.count}',
+        f"event_loop_lag_seconds_sum {lag.total}",
+        f"event_loop_lag_seconds_count {lag.count}",
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def add_metrics_route(
+    app: Starlette, task_store: InstrumentedTaskStore, path: str = "/metrics"
+) -> Starlette:
+    """Expõe as métricas em `GET path` e mede o atraso do event loop durante o lifespan."""
+    lag = EventLoopLagMonitor()
+
+    async def metrics_endpoint(request: Request) -> PlainTextResponse:
+        return PlainTextResponse(render(task_store, lag), media_type=CONTENT_TYPE)
+
+    app.add_route(path, metrics_endpoint, methods=["GET"])
+
+    lifespan = app.router.lifespan_context
+
+    @asynccontextmanager
+    async def _lifespan(app: Starlette):
+        monitor = asyncio.get_running_loop().create_task(lag.run())
+        try:
+            async with lifespan(app) as state:
+                yield state
+        finally:
+            monitor.cancel()
+
+    app.router.lifespan_context = _lifespan
+    return app
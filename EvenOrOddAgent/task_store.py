@@ -0,0 +1,58 @@
+"""Task store em memória com limite de tamanho e TTL para tarefas finalizadas."""
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+
+from a2a.server.tasks import TaskStore
+from a2a.types import Task, TaskState
+
+# Tempo que uma tarefa finalizada continua disponível para consulta
+TASK_TTL_SECONDS = 3600.0
+# Máximo de tarefas mantidas em memória
+TASK_STORE_MAX_SIZE = 10_000
+
+TERMINAL_STATES = frozenset(
+    {TaskState.completed, TaskState.canceled, TaskState.failed, TaskState.rejected}
+)
+
+
+class BoundedTaskStore(TaskStore):
+    """`TaskStore` em memória: tarefas finalizadas expiram após `ttl` segundos e,
+    acima de `max_size` tarefas, as mais antigas são descartadas."""
+
+    def __init__(
+        self,
+        max_size: int = TASK_STORE_MAX_SIZE,
+        ttl: float = TASK_TTL_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._clock = clock
+        # id -> (tarefa, instante de expiração ou None se ainda ativa)
+        self._tasks: OrderedDict[str, tuple[Task, float | None]] = OrderedDict()
+        self.evicted = 0
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    async def save(self, task: Task) -> None:
+        expires_at = self._clock() + self.ttl if task.status.state in TERMINAL_STATES else None
+        self._tasks[task.id] = (task, expires_at)
+        self._tasks.move_to_end(task.id)
+        while len(self._tasks) > self.max_size:
+            self._tasks.popitem(last=False)
+            self.evicted += 1
+
+    async def get(self, task_id: str) -> Task | None:
+        entry = self._tasks.get(task_id)
+        if entry is None:
+            return None
+        task, expires_at = entry
+        if expires_at is not None and expires_at <= self._clock():
+            del self._tasks[task_id]
+            return None
+        return task
+
+    async def delete(self, task_id: str) -> None:
+        self._tasks.pop(task_id, None)
@@ -0,0 +1,237 @@
+"""Benchmark ponta a ponta: orquestrador + agentes especializados, sem rede externa.
+
+Sobe os três agentes especializados, cada um no seu processo, com o modelo
+local `FakeLlm` (`LLM_BACKEND=fake`, latência em `--llm-latency-ms`), cria o
+orquestrador neste processo apontando para eles e dispara `--requests`
+aprovações de despesa com `--concurrency` em paralelo. Reporta as latências
+p50/p95/p99, requisições por segundo e a memória (RSS) de cada processo.
+
+    cd a2a_financial_agent
+    python benchmarks/e2e.py --requests 200 --concurrency 20
+
+`--mode structured` envia a despesa como JSON (caminho sem LLM). Com
+`--max-p95-ms`, o script termina com erro se o p95 passar do limite, para
+uso em CI; `--json` imprime o resultado em JSON.
+"""
+import argparse
+import asyncio
+import importlib
+import json
+import logging
+import math
+import os
+import signal
+import subprocess
+import sys
+import time
+import uuid
+from dataclasses import replace
+from pathlib import Path
+
+import httpx
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "host_adk"))
+
+SPECIALISTS = ["check_budget_agent", "check_planning_agent", "check_legal_agent"]
+BASE_PORT = 10102
+STARTUP_TIMEOUT_SECONDS = 90.0
+
+# Despesas da base de exemplo (database/expenses.csv), usadas em rodízio
+EXPENSES = [
+    {"department": "Marketing", "amount": 2500, "supplier": "Agência XYZ"},
+    {"department": "Marketing", "amount": 1800, "supplier": "Agência XYZ"},
+    {"department": "Finance", "amount": 4000, "supplier": "Consultoria Alpha"},
+]
+
+
+def percentile(values: list[float], p: float) -> float:
+    """Percentil pelo método do vizinho mais próximo."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+def rss_mb(pid: int) -> float:
+    """Memória residente do processo, lida de /proc."""
+    with open(f"/proc/{pid}/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def serve(name: str, port: int) -> None:
+    """Roda um agente especializado na porta informada (processo filho)."""
+    logging.basicConfig(level=logging.WARNING)
+    config = importlib.import_module(f"{name}.agent").SPECIALIST
+    from common.server import run_specialist
+
+    run_specialist(replace(config, port=port), workers=1)
+
+
+def start_specialists(base_port: int, latency_ms: float) -> dict[str, subprocess.Popen]:
+    env = dict(
+        os.environ,
+        LLM_BACKEND="fake",
+        FAKE_LLM_LATENCY_MS=str(latency_ms),
+        TASK_STORE_PERSIST="0",
+        SPECIALIST_WORKERS="1",
+    )
+    return {
+        name: subprocess.Popen(
+            [sys.executable, __file__, "serve", name, "--port", str(base_port + i)],
+            cwd=ROOT,
+            env=env,
+            stdout=subprocess.DEVNULL,
+        )
+        for i, name in enumerate(SPECIALISTS)
+    }
+
+
+async def wait_ready(urls: list[str], processes: dict[str, subprocess.Popen]) -> None:
+    deadline = time.monotonic() + STARTUP_TIMEOUT_SECONDS
+    async with httpx.AsyncClient() as client:
+        for url in urls:
+            while True:
+                for name, process in processes.items():
+                    if process.poll() is not None:
+                        raise RuntimeError(f"{name} terminou durante a inicialização")
+                try:
+                    if (await client.get(f"{url}.well-known/agent.json")).status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                if time.monotonic() > deadline:
+                    raise RuntimeError(f"{url} não respondeu em {STARTUP_TIMEOUT_SECONDS}s")
+                await asyncio.sleep(0.2)
+
+
+def build_query(i: int, mode: str) -> str:
+    expense = dict(EXPENSES[i % len(EXPENSES)])
+    if mode == "structured":
+        return json.dumps(expense, ensure_ascii=False)
+    return (
+        f"Aprovar despesa department={expense['department']} amount={expense['amount']} "
+        f'supplier="{expense["supplier"]}" (pedido {i})'
+    )
+
+
+async def drive(orchestrator, requests: int, concurrency: int, mode: str) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+    errors = 0
+
+    async def one(i: int) -> None:
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                async for _ in orchestrator.stream(build_query(i, mode), uuid.uuid4().hex):
+                    pass
+            except Exception as e:
+                errors += 1
+                logging.warning(f"Requisição {i} falhou: {e}")
+                return
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    elapsed = time.perf_counter() - start
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "mode": mode,
+        "errors": errors,
+        "elapsed_s": round(elapsed, 3),
+        "rps": round(len(latencies) / elapsed, 2),
+        "latency_ms": {
+            f"p{p}": round(percentile(latencies, p), 1) if latencies else None
+            for p in (50, 95, 99)
+        },
+    }
+
+
+async def run_benchmark(args: argparse.Namespace, processes: dict[str, subprocess.Popen]) -> dict:
+    urls = [f"http://localhost:{args.base_port + i}/" for i in range(len(SPECIALISTS))]
+    await wait_ready(urls, processes)
+
+    from host.agent import FinancialOrchestratorAgent
+
+    async with await FinancialOrchestratorAgent.create(remote_agent_addresses=urls) as orchestrator:
+        if args.warmup:
+            await drive(orchestrator, args.warmup, args.concurrency, args.mode)
+        result = await drive(orchestrator, args.requests, args.concurrency, args.mode)
+
+    result["llm_latency_ms"] = args.llm_latency_ms
+    result["rss_mb"] = {name: round(rss_mb(p.pid), 1) for name, p in processes.items()}
+    result["rss_mb"]["orchestrator"] = round(rss_mb(os.getpid()), 1)
+    return result
+
+
+def print_report(result: dict) -> None:
+    latency = result["latency_ms"]
+    print(
+        f"{result['requests']} requisições ({result['mode']}), concorrência "
+        f"{result['concurrency']}, LLM falso com {result['llm_latency_ms']:.0f} ms"
+    )
+    print(
+        f"latência: p50 {latency['p50']} ms | p95 {latency['p95']} ms | p99 {latency['p99']} ms"
+    )
+    print(f"vazão: {result['rps']} req/s em {result['elapsed_s']} s, {result['errors']} erros")
+    print("RSS:")
+    for name, mb in result["rss_mb"].items():
+        print(f"  {name:<22} {mb:>8.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    subparsers = parser.add_subparsers(dest="command")
+    serve_parser = subparsers.add_parser("serve", help="(interno) roda um agente especializado")
+    serve_parser.add_argument("name", choices=SPECIALISTS)
+    serve_parser.add_argument("--port", type=int, required=True)
+
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=5, help="requisições antes da medição")
+    parser.add_argument("--mode", choices=["text", "structured"], default="text")
+    parser.add_argument("--llm-latency-ms", type=float, default=50.0)
+    parser.add_argument("--base-port", type=int, default=BASE_PORT)
+    parser.add_argument("--max-p95-ms", type=float, default=None)
+    parser.add_argument("--json", action="store_true", help="imprime o resultado em JSON")
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        serve(args.name, args.port)
+        return
+
+    # O orquestrador roda neste processo, com o mesmo modelo falso.
+    os.environ["LLM_BACKEND"] = "fake"
+    os.environ["FAKE_LLM_LATENCY_MS"] = str(args.llm_latency_ms)
+    os.environ["REMOTE_AGENT_URLS"] = ",".join(
+        f"http://localhost:{args.base_port + i}/" for i in range(len(SPECIALISTS))
+    )
+    logging.basicConfig(level=logging.WARNING)
+
+    processes = start_specialists(args.base_port, args.llm_latency_ms)
+    try:
+        result = asyncio.run(run_benchmark(args, processes))
+    finally:
+        # SIGINT em vez de SIGTERM: o uvicorn encerra normalmente e os
+        # handlers de saída (como o flush dos spans) rodam.
+        for process in processes.values():
+            process.send_signal(signal.SIGINT)
+        for process in processes.values():
+            process.wait()
+
+    if args.json:
+        print(json.dumps(result, ensure_ascii=False))
+    else:
+        print_report(result)
+    p95 = result["latency_ms"]["p95"]
+    if result["errors"] or (args.max_p95_ms is not None and (p95 is None or p95 > args.max_p95_ms)):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
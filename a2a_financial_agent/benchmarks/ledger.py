@@ -0,0 +1,151 @@
+"""Benchmark da base de despesas: CSV indexado em memória x ledger colunar.
+
+Gera uma base sintética com `--rows` despesas, converte-a para o ledger
+(`common.expense_ledger`) e compara as duas fontes usadas pelos agentes de
+planejamento e jurídico: o tempo para abrir a base, a memória (RSS) que
+ela acrescenta ao processo e a latência das consultas (uma despesa e um lote
+de `--batch`). Cada fonte é medida em um processo novo.
+
+    cd a2a_financial_agent
+    python benchmarks/ledger.py --rows 2000000
+"""
+import argparse
+import json
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+DEPARTMENTS = 50
+SUPPLIERS = 5_000
+LOOKUPS = 2_000
+
+
+def generate_csv(path: Path, rows: int, seed: int = 0) -> None:
+    rng = random.Random(seed)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("department,amount,supplier,approved_by_legal\n")
+        for _ in range(rows):
+            f.write(
+                f"Departamento {rng.randrange(DEPARTMENTS)},{rng.randrange(100, 100_000)},"
+                f"Fornecedor {rng.randrange(SUPPLIERS)},{rng.choice(('yes', 'no'))}\n"
+            )
+
+
+def rss_mb() -> float:
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def queries(count: int, seed: int = 1) -> list[dict]:
+    rng = random.Random(seed)
+    return [
+        {
+            "department": f"Departamento {rng.randrange(DEPARTMENTS)}",
+            "amount": rng.randrange(100, 100_000),
+            "supplier": f"Fornecedor {rng.randrange(SUPPLIERS)}",
+        }
+        for _ in range(count)
+    ]
+
+
+def measure(source: str, path: Path, batch: int) -> dict:
+    """(processo filho) Abre a base e mede as consultas."""
+    from common.expense_ledger import META_FILE, ExpenseLedger
+    from common.expense_store import ExpenseIndex
+
+    rss_before = rss_mb()
+    start = time.perf_counter()
+    index = ExpenseLedger.open(path / META_FILE) if source == "ledger" else ExpenseIndex.from_csv(path)
+    open_s = time.perf_counter() - start
+
+    single = []
+    for expense in queries(LOOKUPS):
+        start = time.perf_counter()
+        index.is_legally_approved(**expense)
+        single.append((time.perf_counter() - start) * 1e6)
+
+    expenses = queries(batch, seed=2)
+    start = time.perf_counter()
+    index.lookup_many(expenses)
+    batch_ms = (time.perf_counter() - start) * 1000
+
+    return {
+        "open_s": round(open_s, 3),
+        "rss_mb": round(rss_mb() - rss_before, 1),
+        "lookup_us_p50": round(statistics.median(single), 1),
+        "batch_ms": round(batch_ms, 2),
+    }
+
+
+def run_child(source: str, path: Path, batch: int) -> dict:
+    completed = subprocess.run(
+        [sys.executable, __file__, "measure", source, str(path), "--batch", str(batch)],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    subparsers = parser.add_subparsers(dest="command")
+    measure_parser = subparsers.add_parser("measure", help="(interno) mede uma fonte")
+    measure_parser.add_argument("source", choices=["csv", "ledger"])
+    measure_parser.add_argument("path", type=Path)
+    measure_parser.add_argument("--batch", type=int, default=200)
+
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--batch", type=int, default=200, help="despesas por lote")
+    parser.add_argument("--json", action="store_true", help="imprime o resultado em JSON")
+    args = parser.parse_args()
+
+    if args.command == "measure":
+        print(json.dumps(measure(args.source, args.path, args.batch)))
+        return
+
+    from common.expense_ledger import convert_csv
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = Path(tmp) / "expenses.csv"
+        ledger_path = Path(tmp) / "expenses.ledger"
+        generate_csv(csv_path, args.rows)
+        start = time.perf_counter()
+        convert_csv(csv_path, ledger_path)
+        convert_s = time.perf_counter() - start
+
+        result = {
+            "rows": args.rows,
+            "csv_mb": round(csv_path.stat().st_size / 2**20, 1),
+            "convert_s": round(convert_s, 2),
+            "csv": run_child("csv", csv_path, args.batch),
+            "ledger": run_child("ledger", ledger_path, args.batch),
+        }
+
+    if args.json:
+        print(json.dumps(result, ensure_ascii=False))
+        return
+    print(
+        f"{result['rows']} despesas ({result['csv_mb']} MB de CSV), "
+        f"conversão em {result['convert_s']} s"
+    )
+    for source in ("csv", "ledger"):
+        r = result[source]
+        print(
+            f"  {source:<7} abertura {r['open_s']:>7.3f} s | RSS +{r['rss_mb']:>7.1f} MB | "
+            f"consulta p50 {r['lookup_us_p50']:>6.1f} µs | lote de {args.batch} {r['batch_ms']:>7.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Micro-benchmark: extração das partes dos artefatos de uma resposta A2A.
+
+Compara o caminho antigo do orquestrador (`model_dump_json` da resposta
+inteira seguido de `json.loads`) com `_parts_to_dicts`, que lê as partes
+direto dos modelos. Mede o tempo de CPU e a memória alocada por chamada
+para um artefato com um DataPart de `--rows` linhas.
+
+    cd a2a_financial_agent
+    python benchmarks/parts_extraction.py --rows 5000 --iterations 200
+"""
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "host_adk"))
+
+from a2a.types import Artifact, SendMessageSuccessResponse, Task, TaskState, TaskStatus  # noqa: E402
+
+from host.agent import _parts_to_dicts  # noqa: E402
+
+
+def build_response(rows: int) -> SendMessageSuccessResponse:
+    """Resposta de um agente com um artefato de texto e um DataPart grande."""
+    data = {
+        "approved": True,
+        "message": "Despesas verificadas",
+        "expenses": [
+            {"department": f"dep-{i % 20}", "amount": 100.0 + i, "supplier": f"fornecedor-{i}"}
+            for i in range(rows)
+        ],
+    }
+    task = Task(
+        id="task",
+        contextId="context",
+        status=TaskStatus(state=TaskState.completed),
+        artifacts=[
+            Artifact(
+                artifactId="artifact",
+                parts=[
+                    {"kind": "text", "text": "Resultado da verificação"},
+                    {"kind": "data", "data": data},
+                ],
+            )
+        ],
+    )
+    return SendMessageSuccessResponse(id="1", result=task)
+
+
+def json_round_trip(response: SendMessageSuccessResponse) -> list[dict[str, Any]]:
+    """Caminho anterior: serializa a resposta inteira e interpreta o JSON."""
+    json_content = json.loads(response.model_dump_json(exclude_none=True))
+    resp = []
+    if json_content.get("result", {}).get("artifacts"):
+        for artifact in json_content["result"]["artifacts"]:
+            if artifact.get("parts"):
+                resp.extend(artifact["parts"])
+    return resp
+
+
+def typed(response: SendMessageSuccessResponse) -> list[dict[str, Any]]:
+    """Caminho atual: lê as partes direto dos modelos."""
+    resp = []
+    for artifact in response.result.artifacts or []:
+        resp.extend(_parts_to_dicts(artifact.parts))
+    return resp
+
+
+def measure(
+    fn: Callable[[SendMessageSuccessResponse], Any],
+    response: SendMessageSuccessResponse,
+    iterations: int,
+) -> tuple[float, int]:
+    """Retorna o tempo de CPU médio (µs) e o pico de memória alocada (bytes) por chamada."""
+    start = time.process_time()
+    for _ in range(iterations):
+        fn(response)
+    cpu_us = (time.process_time() - start) / iterations * 1e6
+
+    tracemalloc.start()
+    fn(response)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return cpu_us, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5000, help="linhas no DataPart")
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    response = build_response(args.rows)
+    if json_round_trip(response) != typed(response):
+        raise SystemExit("Os dois caminhos retornaram partes diferentes")
+
+    results = {
+        name: measure(fn, response, args.iterations)
+        for name, fn in (("json round-trip", json_round_trip), ("tipado", typed))
+    }
+    print(f"{args.rows} linhas, {args.iterations} iterações")
+    print(f"{'caminho':<16} {'CPU/chamada':>14} {'pico alocado':>14}")
+    for name, (cpu_us, peak) in results.items():
+        print(f"{name:<16} {cpu_us:>11.1f} µs {peak / 1024:>11.1f} KiB")
+    (old_cpu, old_peak), (new_cpu, new_peak) = results.values()
+    print(f"ganho: {old_cpu / new_cpu:.0f}x em CPU, {old_peak / max(new_peak, 1):.0f}x em memória")
+
+
+if __name__ == "__main__":
+    main()
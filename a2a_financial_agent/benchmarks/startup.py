@@ -0,0 +1,110 @@
+"""Benchmark de inicialização do orquestrador (`host_adk/host`).
+
+Mede, cada cenário em um interpretador novo, o tempo de:
+
+* `import host`: o que o `adk` faz ao carregar o pacote;
+* `import host.agent`: o módulo do orquestrador, sem construir o agente;
+* `host.root_agent`: o import mais a construção do `root_agent` (os agentes
+  remotos só são descobertos na primeira execução).
+
+Para cada cenário reporta a mediana de `--repeat` execuções, o número de
+módulos carregados e quais dependências pesadas (ADK, LiteLLM, OpenAI)
+acabaram importadas.
+
+    cd a2a_financial_agent
+    python benchmarks/startup.py --repeat 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+HOST_DIR = ROOT / "host_adk"
+
+SCENARIOS = {
+    "import host": "import host",
+    "import host.agent": "import host.agent",
+    "host.root_agent": "import host; host.root_agent",
+}
+
+# Módulos cuja presença em sys.modules indica um import pesado
+WATCHED_MODULES = ["google.adk", "google.adk.runners", "litellm", "openai"]
+
+CHILD_TEMPLATE = """\
+import json, sys, time
+start = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - start
+print(json.dumps({{
+    "seconds": elapsed,
+    "modules": len(sys.modules),
+    "loaded": [name for name in {watched!r} if name in sys.modules],
+}}))
+"""
+
+
+def measure(statement: str, env: dict[str, str]) -> dict:
+    """Executa o cenário em um processo novo e lê o resultado da última linha."""
+    code = CHILD_TEMPLATE.format(statement=statement, watched=WATCHED_MODULES)
+    completed = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=HOST_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def run_benchmark(scenarios: list[str], repeat: int, env: dict[str, str]) -> dict:
+    result = {}
+    for name in scenarios:
+        runs = [measure(SCENARIOS[name], env) for _ in range(repeat)]
+        result[name] = {
+            "seconds": round(statistics.median(run["seconds"] for run in runs), 3),
+            "modules": runs[-1]["modules"],
+            "loaded": runs[-1]["loaded"],
+        }
+    return result
+
+
+def print_report(result: dict, repeat: int) -> None:
+    print(f"mediana de {repeat} execuções por cenário")
+    for name, scenario in result.items():
+        loaded = ", ".join(scenario["loaded"]) or "-"
+        print(
+            f"  {name:<20} {scenario['seconds']:>7.3f} s  "
+            f"{scenario['modules']:>5} módulos  pesados: {loaded}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--scenario", choices=list(SCENARIOS), action="append", help="padrão: todos"
+    )
+    parser.add_argument(
+        "--fake-llm", action="store_true", help="usa o modelo local (LLM_BACKEND=fake)"
+    )
+    parser.add_argument("--json", action="store_true", help="imprime o resultado em JSON")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    if args.fake_llm:
+        env["LLM_BACKEND"] = "fake"
+    result = run_benchmark(args.scenario or list(SCENARIOS), args.repeat, env)
+
+    if args.json:
+        print(json.dumps(result, ensure_ascii=False))
+    else:
+        print_report(result, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
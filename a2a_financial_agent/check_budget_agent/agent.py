@@ -1,12 +1,18 @@
 import os
-from pathlib import Path
 from dotenv import load_dotenv
 
+from a2a.types import AgentSkill
 from google.adk.agents import LlmAgent
-from google.adk.models.lite_llm import LiteLlm
+
+from common.budget_store import budget_version, get_current_budget
+from common.llm_cache import create_model
+from common.server import SpecialistConfig
+from common.structured import parse_expense_batch
+from common.tracing import traced
 
 load_dotenv()
 
+@traced()
 def check_budget(value: float) -> str:
     """
     Verifica se há orçamento disponível para o valor solicitado.
@@ -18,9 +24,7 @@ def check_budget(value: float) -> str:
         Uma string indicando se há orçamento disponível ou não
     """
     try:
-        budget_file = Path(__file__).parent.parent / "database" / "current_budget.txt"
-        with open(budget_file, "r") as f:
-            current_budget = float(f.read().strip())
+        current_budget = get_current_budget()
 
         if current_budget >= value:
             return "Tem budget disponível"
@@ -32,10 +36,36 @@ def check_budget(value: float) -> str:
         return "Não tem budget disponível"
 
 
+def check_budget_structured(data: dict) -> dict:
+    """Executa `check_budget` para uma requisição estruturada, sem passar pelo LLM.
+
+    Aceita uma despesa (`amount`) ou um lote (`expenses`); no lote o
+    orçamento é lido uma única vez e comparado com todos os valores.
+    """
+    expenses = parse_expense_batch(data)
+    if expenses is not None:
+        try:
+            current_budget = get_current_budget()
+        except Exception as e:
+            print(f"Erro ao verificar orçamento: {e}")
+            current_budget = float("-inf")
+        return {
+            "results": [
+                {"approved": True, "message": "Tem budget disponível"}
+                if current_budget >= expense["amount"]
+                else {"approved": False, "message": "Não tem budget disponível"}
+                for expense in expenses
+            ]
+        }
+
+    message = check_budget(float(data["amount"]))
+    return {"approved": message == "Tem budget disponível", "message": message}
+
+
 def create_agent() -> LlmAgent:
     """Constrói o agente ADK para verificação de orçamento."""
     return LlmAgent(
-        model=LiteLlm("openai/gpt-4.1-nano"),
+        model=create_model("openai/gpt-4.1-nano"),
         name="check_budget_agent",
         instruction="""
             **Papel:** Você é um agente especializado em verificar disponibilidade de orçamento.
@@ -50,4 +80,21 @@ def create_agent() -> LlmAgent:
                 Se perguntado sobre outros assuntos, educadamente diga que só pode ajudar com verificações de orçamento.
         """,
         tools=[check_budget],
-    )
\ No newline at end of file
+    )
+
+
+SPECIALIST = SpecialistConfig(
+    name="check_budget_agent",
+    description="Um agente que verifica a disponibilidade de orçamento para valores solicitados.",
+    skill=AgentSkill(
+        id="check_budget_agent",
+        name="Check Budget Availability",
+        description="Verifica se há orçamento disponível para um valor solicitado.",
+        tags=["finance", "budget"],
+        examples=["Tem orçamento disponível para 5000?"],
+    ),
+    port=10002,
+    create_agent=create_agent,
+    structured_handler=check_budget_structured,
+    data_version=budget_version,
+)
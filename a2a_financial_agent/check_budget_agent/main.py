@@ -1,87 +1,25 @@
 import logging
-import os
+import sys
+from pathlib import Path
 
-import uvicorn
-from a2a.server.apps import A2AStarletteApplication
-from a2a.server.request_handlers import DefaultRequestHandler
-from a2a.server.tasks import InMemoryTaskStore
-from a2a.types import (
-    AgentCapabilities,
-    AgentCard,
-    AgentSkill,
-)
-from agent import create_agent
-from agent_executor import BudgetAgentExecutor
 from dotenv import load_dotenv
-from google.adk.artifacts import InMemoryArtifactService
-from google.adk.memory.in_memory_memory_service import InMemoryMemoryService
-from google.adk.runners import Runner
-from google.adk.sessions import InMemorySessionService
 
-load_dotenv()
-
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
+# Ponto de entrada: só aqui a raiz do projeto (com o pacote `common`) entra
+# no sys.path; `agent.py` e `common` não alteram o sys.path ao serem importados.
+sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from agent import SPECIALIST
+from common.server import run_specialist
 
-class MissingAPIKeyError(Exception):
-    """Exception for missing API key."""
+load_dotenv()
 
-    pass
+logging.basicConfig(level=logging.INFO)
 
 
 def main():
     """Starts the agent server."""
-    host = "localhost"
-    port = 10002
-    try:
-
-        skill = AgentSkill(
-            id="check_budget_agent",
-            name="Check Budget Availability",
-            description="Verifica se há orçamento disponível para um valor solicitado.",
-            tags=["finance", "budget"],
-            examples=["Tem orçamento disponível para 5000?"],
-        )
-
-        agent_card = AgentCard(
-            name="check_budget_agent",
-            description="Um agente que verifica a disponibilidade de orçamento para valores solicitados.",
-            url=f"http://{host}:{port}/",
-            version="1.0.0",
-            defaultInputModes=["text/plain"],
-            defaultOutputModes=["text/plain"],
-            capabilities=AgentCapabilities(),
-            skills=[skill],
-        )
-
-        adk_agent = create_agent()
-
-        runner = Runner(
-            app_name=agent_card.name,
-            agent=adk_agent,
-            artifact_service=InMemoryArtifactService(),
-            session_service=InMemorySessionService(),
-            memory_service=InMemoryMemoryService(),
-        )
-
-        agent_executor = BudgetAgentExecutor(runner)
-
-        request_handler = DefaultRequestHandler(
-            agent_executor=agent_executor,
-            task_store=InMemoryTaskStore(),
-        )
-
-        server = A2AStarletteApplication(
-            agent_card=agent_card, http_handler=request_handler
-        )
-
-        uvicorn.run(server.build(), host=host, port=port)
-
-    except Exception as e:
-        logger.error(f"An error occurred during server startup: {e}")
-        exit(1)
+    run_specialist(SPECIALIST)
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,13 +1,18 @@
 import os
-from pathlib import Path
 from dotenv import load_dotenv
-import pandas as pd
 
+from a2a.types import AgentSkill
 from google.adk.agents import LlmAgent
-from google.adk.models.lite_llm import LiteLlm
+
+from common.expense_store import expenses_version, get_expense_index
+from common.llm_cache import create_model
+from common.server import SpecialistConfig
+from common.structured import parse_expense, parse_expense_batch
+from common.tracing import traced
 
 load_dotenv()
 
+@traced()
 def check_legal_approval(department: str, amount: float, supplier: str) -> str:
     """
     Verifica se uma despesa foi aprovada pelo departamento jurídico.
@@ -21,21 +26,7 @@ def check_legal_approval(department: str, amount: float, supplier: str) -> str:
         Uma string indicando se a despesa foi aprovada pelo jurídico ou não
     """
     try:
-        expenses_file = Path(__file__).parent.parent / "database" / "expenses.csv"
-        df = pd.read_csv(expenses_file)
-        
-        # Converte o valor para float para comparação
-        df['amount'] = df['amount'].astype(float)
-        
-        # Procura por uma despesa que corresponda aos critérios e tenha aprovação jurídica
-        matching_expense = df[
-            (df['department'].str.lower() == department.lower()) &
-            (df['amount'] == amount) &
-            (df['supplier'].str.lower() == supplier.lower()) &
-            (df['approved_by_legal'].str.lower() == 'yes')
-        ]
-        
-        if not matching_expense.empty:
+        if get_expense_index().is_legally_approved(department, amount, supplier):
             return "Aprovado pelo jurídico"
         else:
             return "Não aprovado pelo jurídico"
@@ -45,10 +36,36 @@ def check_legal_approval(department: str, amount: float, supplier: str) -> str:
         return "Não aprovado pelo jurídico"
 
 
+def check_legal_approval_structured(data: dict) -> dict:
+    """Executa `check_legal_approval` para uma requisição estruturada, sem passar pelo LLM.
+
+    Aceita uma despesa ou um lote (`expenses`); o lote é resolvido com uma
+    única consulta vetorizada ao índice de despesas.
+    """
+    expenses = parse_expense_batch(data)
+    if expenses is not None:
+        try:
+            matches = get_expense_index().lookup_many(expenses)["approved_by_legal"].tolist()
+        except Exception as e:
+            print(f"Erro ao verificar aprovação jurídica: {e}")
+            matches = [False] * len(expenses)
+        return {
+            "results": [
+                {"approved": True, "message": "Aprovado pelo jurídico"}
+                if match
+                else {"approved": False, "message": "Não aprovado pelo jurídico"}
+                for match in matches
+            ]
+        }
+
+    message = check_legal_approval(**parse_expense(data))
+    return {"approved": message == "Aprovado pelo jurídico", "message": message}
+
+
 def create_agent() -> LlmAgent:
     """Constrói o agente ADK para verificação de aprovação jurídica."""
     return LlmAgent(
-        model=LiteLlm("openai/gpt-4.1-nano"),
+        model=create_model("openai/gpt-4.1-nano"),
         name="check_legal_agent",
         instruction="""
             **Papel:** Você é um agente especializado em verificar aprovações jurídicas de despesas.
@@ -66,4 +83,21 @@ def create_agent() -> LlmAgent:
                 Se perguntado sobre outros assuntos, educadamente diga que só pode ajudar com verificações de aprovação jurídica.
         """,
         tools=[check_legal_approval],
-    )
\ No newline at end of file
+    )
+
+
+SPECIALIST = SpecialistConfig(
+    name="check_legal_agent",
+    description="Um agente que verifica se despesas específicas foram aprovadas pelo departamento jurídico.",
+    skill=AgentSkill(
+        id="check_legal_agent",
+        name="Check Legal Approval",
+        description="Verifica se uma despesa foi aprovada pelo departamento jurídico.",
+        tags=["finance", "legal"],
+        examples=["A despesa de R$ 2.500 do departamento de Marketing com a Agência XYZ foi aprovada pelo jurídico?"],
+    ),
+    port=10004,
+    create_agent=create_agent,
+    structured_handler=check_legal_approval_structured,
+    data_version=expenses_version,
+)
@@ -1,13 +1,18 @@
 import os
-from pathlib import Path
 from dotenv import load_dotenv
-import pandas as pd
 
+from a2a.types import AgentSkill
 from google.adk.agents import LlmAgent
-from google.adk.models.lite_llm import LiteLlm
+
+from common.expense_store import expenses_version, get_expense_index
+from common.llm_cache import create_model
+from common.server import SpecialistConfig
+from common.structured import parse_expense, parse_expense_batch
+from common.tracing import traced
 
 load_dotenv()
 
+@traced()
 def check_planned_expense(department: str, amount: float, supplier: str) -> str:
     """
     Verifica se uma despesa está planejada no orçamento.
@@ -21,21 +26,9 @@ def check_planned_expense(department: str, amount: float, supplier: str) -> str:
         Uma string indicando se a despesa foi planejada ou não
     """
     try:
-        expenses_file = Path(__file__).parent.parent / "database" / "expenses.csv"
-        df = pd.read_csv(expenses_file)
-        
-        # Converte o valor para float para comparação
-        df['amount'] = df['amount'].astype(float)
-        
         print(f"Valores a serem verificados: {department}, {amount}, {supplier}")
-        
-        matching_expense = df[
-            (df['department'].str.lower() == department.lower()) &
-            (df['amount'] == amount) &
-            (df['supplier'].str.lower() == supplier.lower())
-        ]
-        
-        if not matching_expense.empty:
+
+        if get_expense_index().is_planned(department, amount, supplier):
             return "Despesa foi planejada"
         else:
             return "Despesa não foi planejada"
@@ -45,10 +38,36 @@ def check_planned_expense(department: str, amount: float, supplier: str) -> str:
         return "Despesa não foi planejada"
 
 
+def check_planned_expense_structured(data: dict) -> dict:
+    """Executa `check_planned_expense` para uma requisição estruturada, sem passar pelo LLM.
+
+    Aceita uma despesa ou um lote (`expenses`); o lote é resolvido com uma
+    única consulta vetorizada ao índice de despesas.
+    """
+    expenses = parse_expense_batch(data)
+    if expenses is not None:
+        try:
+            matches = get_expense_index().lookup_many(expenses)["planned"].tolist()
+        except Exception as e:
+            print(f"Erro ao verificar despesa planejada: {e}")
+            matches = [False] * len(expenses)
+        return {
+            "results": [
+                {"approved": True, "message": "Despesa foi planejada"}
+                if match
+                else {"approved": False, "message": "Despesa não foi planejada"}
+                for match in matches
+            ]
+        }
+
+    message = check_planned_expense(**parse_expense(data))
+    return {"approved": message == "Despesa foi planejada", "message": message}
+
+
 def create_agent() -> LlmAgent:
     """Constrói o agente ADK para verificação de despesas planejadas."""
     return LlmAgent(
-        model=LiteLlm("openai/gpt-4.1-nano"),
+        model=create_model("openai/gpt-4.1-nano"),
         name="check_planning_agent",
         instruction="""
             **Papel:** Você é um agente especializado em verificar se despesas estão planejadas no orçamento.
@@ -66,4 +85,21 @@ def create_agent() -> LlmAgent:
                 Se perguntado sobre outros assuntos, educadamente diga que só pode ajudar com verificações de planejamento.
         """,
         tools=[check_planned_expense],
-    )
\ No newline at end of file
+    )
+
+
+SPECIALIST = SpecialistConfig(
+    name="check_planning_agent",
+    description="Um agente que verifica se despesas específicas estão planejadas no orçamento.",
+    skill=AgentSkill(
+        id="check_planning_agent",
+        name="Check Planned Expense",
+        description="Verifica se uma despesa está planejada no orçamento.",
+        tags=["finance", "planning"],
+        examples=["A despesa de R$ 2.500 do departamento de Marketing com a Agência XYZ está planejada?"],
+    ),
+    port=10003,
+    create_agent=create_agent,
+    structured_handler=check_planned_expense_structured,
+    data_version=expenses_version,
+)
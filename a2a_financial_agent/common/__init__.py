@@ -0,0 +1 @@
+"""Código compartilhado entre os agentes especializados."""
@@ -0,0 +1,312 @@
+import asyncio
+import logging
+from collections.abc import AsyncGenerator, Callable, Hashable
+from typing import Any
+
+from a2a.server.agent_execution import AgentExecutor
+from a2a.server.agent_execution.context import RequestContext
+from a2a.server.events.event_queue import EventQueue
+from a2a.server.tasks import TaskUpdater
+from a2a.types import (
+    DataPart,
+    FilePart,
+    FileWithBytes,
+    FileWithUri,
+    Part,
+    TaskNotCancelableError,
+    TaskState,
+    TextPart,
+)
+from a2a.utils.errors import ServerError
+from google.adk import Runner
+from google.adk.events import Event
+from google.genai import types
+from opentelemetry.trace import SpanKind
+
+from .result_cache import TTLCache
+from .structured import expense_cache_key, extract_data_part, normalize_text
+from .task_store import is_terminal
+from .tracing import extract_context, tracer
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+
+class ADKAgentExecutor(AgentExecutor):
+    """Um AgentExecutor genérico que executa um agente ADK especializado.
+
+    O nome do app do `runner` (o nome do agente) também é usado como
+    `user_id` das sessões do ADK.
+    """
+
+    def __init__(
+        self,
+        runner: Runner,
+        structured_handler: Callable[[dict[str, Any]], dict[str, Any]] | None = None,
+        result_cache: TTLCache | None = None,
+        data_version: Callable[[], Hashable] | None = None,
+    ):
+        self.runner = runner
+        self.structured_handler = structured_handler
+        # Respostas já calculadas, válidas enquanto os arquivos de dados
+        # não mudarem (`data_version` faz parte da chave).
+        self.result_cache = result_cache
+        self.data_version = data_version
+        self.user_id = runner.app_name
+        # Tarefas em execução neste worker e, das que chegaram ao agente, a
+        # execução em andamento, por task_id, para o `cancel`
+        self._executing: set[str] = set()
+        self._running_sessions: dict[str, asyncio.Task] = {}
+
+    def _cache_key(self, kind: str, key: Hashable | None) -> Hashable | None:
+        if self.result_cache is None or key is None:
+            return None
+        version = self.data_version() if self.data_version is not None else None
+        return (kind, key, version)
+
+    def _run_agent(
+        self, session_id, new_message: types.Content
+    ) -> AsyncGenerator[Event, None]:
+        return self.runner.run_async(
+            session_id=session_id, user_id=self.user_id, new_message=new_message
+        )
+
+    async def _process_request(
+        self,
+        new_message: types.Content,
+        session_id: str,
+        task_updater: TaskUpdater,
+        cache_key: Hashable | None = None,
+    ) -> None:
+        session_obj = await self._upsert_session(session_id)
+        session_id = session_obj.id
+
+        try:
+            completed = False
+            with tracer.start_as_current_span("adk.run_agent", attributes={"session.id": session_id}):
+                async for event in self._run_agent(session_id, new_message):
+                    if completed:
+                        # Consome o restante em vez de interromper o loop: um
+                        # gerador do ADK abandonado é finalizado depois, em outro
+                        # contexto, e quebra os spans do OpenTelemetry.
+                        continue
+                    if event.is_final_response():
+                        parts = convert_genai_parts_to_a2a(
+                            event.content.parts if event.content and event.content.parts else []
+                        )
+                        logger.debug("Yielding final response: %s", parts)
+                        if cache_key is not None and parts:
+                            self.result_cache.put(cache_key, parts)
+                        await task_updater.add_artifact(parts)
+                        await task_updater.complete()
+                        completed = True
+                        continue
+                    if not event.get_function_calls():
+                        logger.debug("Yielding update response")
+                        await task_updater.update_status(
+                            TaskState.working,
+                            message=task_updater.new_agent_message(
+                                convert_genai_parts_to_a2a(
+                                    event.content.parts
+                                    if event.content and event.content.parts
+                                    else []
+                                ),
+                            ),
+                        )
+                    else:
+                        logger.debug("Skipping event")
+        except Exception as e:
+            logger.error("Error in _process_request: %s", str(e))
+            await task_updater.update_status(
+                TaskState.failed,
+                message=task_updater.new_agent_message([Part(root=TextPart(text=f"Erro ao processar requisição: {str(e)}"))]),
+            )
+            await task_updater.complete()
+            raise
+
+    async def _process_structured_request(
+        self,
+        data: dict[str, Any],
+        task_updater: TaskUpdater,
+    ) -> None:
+        """Responde a um DataPart chamando a ferramenta diretamente, sem o LLM."""
+        cache_key = self._cache_key("data", expense_cache_key(data))
+        result = self.result_cache.get(cache_key) if cache_key is not None else None
+        if result is None:
+            result = self.structured_handler(data)
+            if cache_key is not None:
+                self.result_cache.put(cache_key, result)
+        logger.debug("Structured response: %s", result)
+        await task_updater.add_artifact([Part(root=DataPart(data=result))])
+        await task_updater.complete()
+
+    async def execute(
+        self,
+        context: RequestContext,
+        event_queue: EventQueue,
+    ):
+        # Continua o trace do orquestrador, recebido no metadata da mensagem.
+        with tracer.start_as_current_span(
+            "a2a.execute",
+            context=extract_context(context.message.metadata if context.message else None),
+            kind=SpanKind.SERVER,
+            attributes={"a2a.agent": self.runner.app_name, "a2a.task_id": context.task_id or ""},
+        ):
+            self._executing.add(context.task_id)
+            try:
+                await self._execute(context, event_queue)
+            finally:
+                self._executing.discard(context.task_id)
+
+    async def _execute(self, context: RequestContext, event_queue: EventQueue):
+        if not context.task_id or not context.context_id:
+            raise ValueError("RequestContext must have task_id and context_id")
+        if not context.message:
+            raise ValueError("RequestContext must have a message")
+
+        updater = TaskUpdater(event_queue, context.task_id, context.context_id)
+        if not context.current_task:
+            await updater.submit()
+        await updater.start_work()
+
+        try:
+            data = extract_data_part(context.message.parts)
+            if data is not None and self.structured_handler is not None:
+                await self._process_structured_request(data, updater)
+                return
+
+            # Converte a mensagem A2A para o formato do Google Gen AI
+            message_content = convert_a2a_parts_to_genai(context.message.parts)
+            logger.debug("Converting message parts to Gen AI format: %s", message_content)
+
+            # Só a primeira mensagem de uma conversa depende apenas do texto;
+            # nas seguintes a resposta depende do histórico da sessão.
+            cache_key = None
+            if not await self._has_history(context.context_id):
+                cache_key = self._cache_key("text", normalize_text(message_content))
+            cached_parts = self.result_cache.get(cache_key) if cache_key is not None else None
+            if cached_parts is not None:
+                logger.debug("Returning cached response: %s", cached_parts)
+                await self._record_cached_turn(context.context_id, message_content, cached_parts)
+                await updater.add_artifact(cached_parts)
+                await updater.complete()
+                return
+
+            run = asyncio.create_task(
+                self._process_request(
+                    types.Content(
+                        role="user",
+                        parts=[types.Part.from_text(text=message_content)],
+                    ),
+                    context.context_id,
+                    updater,
+                    cache_key=cache_key,
+                )
+            )
+            self._running_sessions[context.task_id] = run
+            try:
+                await run
+            finally:
+                self._running_sessions.pop(context.task_id, None)
+        except asyncio.CancelledError:
+            # O status `canceled` já foi publicado por `cancel()`. Termina
+            # normalmente para que o handler do A2A feche a fila de eventos.
+            logger.info("Execução da tarefa %s cancelada", context.task_id)
+        except Exception as e:
+            logger.error("Error processing request: %s", str(e))
+            await updater.update_status(
+                TaskState.failed,
+                message=updater.new_agent_message([Part(root=TextPart(text=f"Erro ao processar requisição: {str(e)}"))]),
+            )
+            await updater.complete()
+            raise
+
+    async def cancel(self, context: RequestContext, event_queue: EventQueue):
+        """Interrompe a execução do agente (e a chamada ao LLM) e marca a tarefa como cancelada.
+
+        Só o worker que executa a tarefa pode cancelá-la: com vários workers,
+        um `tasks/cancel` que chega a outro worker é recusado, em vez de
+        publicar `canceled` enquanto a execução continua no worker dono.
+        """
+        if context.current_task is not None and is_terminal(context.current_task):
+            raise ServerError(error=TaskNotCancelableError())
+
+        if context.task_id not in self._executing:
+            raise ServerError(
+                error=TaskNotCancelableError(
+                    message="A tarefa não está em execução neste worker"
+                )
+            )
+        run = self._running_sessions.pop(context.task_id, None)
+        if run is not None:
+            run.cancel()
+        updater = TaskUpdater(event_queue, context.task_id, context.context_id)
+        await updater.update_status(TaskState.canceled, final=True)
+
+    async def _record_cached_turn(
+        self, session_id: str, message_content: str, parts: list[Part]
+    ) -> None:
+        """Grava na sessão do ADK a pergunta e a resposta servida do cache.
+
+        Sem isso, a conversa ficaria sem histórico e o turno seguinte seria
+        respondido sem o contexto da primeira mensagem.
+        """
+        session = await self._upsert_session(session_id)
+        invocation_id = Event.new_id()
+        for author, role, text in (
+            ("user", "user", message_content),
+            (
+                self.runner.agent.name,
+                "model",
+                "\n".join(part.root.text for part in parts if isinstance(part.root, TextPart)),
+            ),
+        ):
+            await self.runner.session_service.append_event(
+                session,
+                Event(
+                    invocation_id=invocation_id,
+                    author=author,
+                    content=types.Content(role=role, parts=[types.Part.from_text(text=text)]),
+                ),
+            )
+
+    async def _has_history(self, session_id: str) -> bool:
+        """Se a sessão do ADK já existe e tem eventos de turnos anteriores."""
+        if self.result_cache is None:
+            return False
+        session = await self.runner.session_service.get_session(
+            app_name=self.runner.app_name, user_id=self.user_id, session_id=session_id
+        )
+        return session is not None and bool(session.events)
+
+    async def _upsert_session(self, session_id: str):
+        session = await self.runner.session_service.get_session(
+            app_name=self.runner.app_name, user_id=self.user_id, session_id=session_id
+        )
+        if session is None:
+            session = await self.runner.session_service.create_session(
+                app_name=self.runner.app_name,
+                user_id=self.user_id,
+                session_id=session_id,
+            )
+        if session is None:
+            raise RuntimeError(f"Failed to get or create session: {session_id}")
+        return session
+
+
+def convert_a2a_parts_to_genai(parts: list[Part]) -> str:
+    """Convert a list of A2A Part types into a Gen AI message content."""
+    text_parts = []
+    for part in parts:
+        if isinstance(part.root, TextPart):
+            text_parts.append(part.root.text)
+    return "\n".join(text_parts)
+
+
+def convert_genai_parts_to_a2a(parts: list[types.Part]) -> list[Part]:
+    """Convert Gen AI message content into a list of A2A Part types."""
+    a2a_parts = []
+    for part in parts:
+        if hasattr(part, 'text') and part.text:
+            a2a_parts.append(Part(root=TextPart(text=part.text)))
+    return a2a_parts
\ No newline at end of file
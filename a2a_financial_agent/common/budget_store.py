@@ -0,0 +1,24 @@
+"""Acesso ao orçamento atual armazenado em ``database/current_budget.txt``."""
+from pathlib import Path
+
+from .file_snapshot import FileSnapshot, FileVersion
+
+BUDGET_FILE = Path(__file__).parent.parent / "database" / "current_budget.txt"
+
+
+def _parse_budget(path: Path) -> float:
+    with open(path, "r") as f:
+        return float(f.read().strip())
+
+
+_budget = FileSnapshot(BUDGET_FILE, _parse_budget)
+
+
+def get_current_budget() -> float:
+    """Retorna o orçamento atual, relendo o arquivo apenas se ele mudou."""
+    return _budget.get()
+
+
+def budget_version() -> FileVersion:
+    """Versão do arquivo de orçamento atualmente carregada."""
+    return _budget.version
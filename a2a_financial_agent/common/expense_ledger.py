@@ -0,0 +1,281 @@
+"""Formato colunar, mapeado em memória, para a base de despesas.
+
+Para bases grandes demais para o CSV (ler o arquivo inteiro a cada
+recarga), o conversor grava as despesas como colunas NumPy (`.npy`):
+
+* `department.npy` e `supplier.npy`: códigos `int32` de dicionários de
+  valores normalizados (`departments.json` e `suppliers.json`);
+* `amount.npy`: o valor (`float64`);
+* `approved.npy`: a aprovação jurídica (`bool`).
+
+As linhas são deduplicadas pela chave (departamento, fornecedor, valor) e
+ordenadas por ela, o que faz das próprias colunas um índice ordenado: cada
+consulta é uma sequência de buscas binárias (`searchsorted`), uma por
+coluna, que leem só as páginas visitadas. As colunas são abertas com
+`mmap`, então os processos dos agentes compartilham as páginas pelo page
+cache em vez de cada um carregar a base.
+
+Cada conversão grava uma nova geração (`gen-<n>/`) e só então troca o
+`meta.json`, que aponta para a geração atual; é ele que o `FileSnapshot`
+observa para recarregar o ledger.
+
+    cd a2a_financial_agent
+    python -m common.expense_ledger database/expenses.csv database/expenses.ledger
+"""
+import argparse
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+from collections.abc import Iterable, Mapping
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from .expense_store import KEY_COLUMNS, _expense_rows, normalize_key
+
+logger = logging.getLogger(__name__)
+
+LEDGER_FORMAT_VERSION = 1
+META_FILE = "meta.json"
+# Linhas lidas do CSV por vez durante a conversão
+CONVERT_CHUNK_ROWS = 1_000_000
+# Gerações antigas mantidas após uma conversão (processos que ainda não
+# recarregaram continuam lendo a anterior)
+KEEP_GENERATIONS = 2
+
+
+class ExpenseLedger:
+    """Despesas em colunas mapeadas em memória, com a mesma interface de `ExpenseIndex`."""
+
+    def __init__(
+        self,
+        department: np.ndarray,
+        supplier: np.ndarray,
+        amount: np.ndarray,
+        approved: np.ndarray,
+        departments: list[str],
+        suppliers: list[str],
+    ):
+        self._department = department
+        self._supplier = supplier
+        self._amount = amount
+        self._approved = approved
+        self._department_codes = {value: code for code, value in enumerate(departments)}
+        self._supplier_codes = {value: code for code, value in enumerate(suppliers)}
+
+    @classmethod
+    def open(cls, meta_path: Path) -> "ExpenseLedger":
+        """Abre a geração atual do ledger indicada por `meta.json`."""
+        meta_path = Path(meta_path)
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        if meta.get("format") != LEDGER_FORMAT_VERSION:
+            raise ValueError(f"Formato de ledger não suportado: {meta.get('format')}")
+        directory = meta_path.parent / meta["generation"]
+
+        def column(name: str) -> np.ndarray:
+            return np.load(directory / f"{name}.npy", mmap_mode="r")
+
+        def dictionary(name: str) -> list[str]:
+            return json.loads((directory / f"{name}.json").read_text(encoding="utf-8"))
+
+        return cls(
+            column("department"),
+            column("supplier"),
+            column("amount"),
+            column("approved"),
+            dictionary("departments"),
+            dictionary("suppliers"),
+        )
+
+    def __len__(self) -> int:
+        return len(self._amount)
+
+    def _find(self, department: str, amount: float, supplier: str) -> int | None:
+        """Posição da despesa nas colunas, ou `None` se ela não existe."""
+        department, amount, supplier = normalize_key(department, amount, supplier)
+        department_code = self._department_codes.get(department)
+        supplier_code = self._supplier_codes.get(supplier)
+        if department_code is None or supplier_code is None:
+            return None
+
+        # Cada busca restringe o intervalo da seguinte: departamento, depois
+        # fornecedor dentro do departamento, depois valor.
+        # As chaves vão com o dtype da coluna: com outro tipo, o
+        # `searchsorted` converteria (e leria) a coluna inteira.
+        lo, hi = 0, len(self._amount)
+        for values, key in (
+            (self._department, department_code),
+            (self._supplier, supplier_code),
+        ):
+            column = values[lo:hi]
+            key = values.dtype.type(key)
+            lo, hi = (
+                lo + int(np.searchsorted(column, key, "left")),
+                lo + int(np.searchsorted(column, key, "right")),
+            )
+            if lo == hi:
+                return None
+        amount = self._amount.dtype.type(amount)
+        position = lo + int(np.searchsorted(self._amount[lo:hi], amount, "left"))
+        if position < hi and self._amount[position] == amount:
+            return position
+        return None
+
+    def is_planned(self, department: str, amount: float, supplier: str) -> bool:
+        return self._find(department, amount, supplier) is not None
+
+    def is_legally_approved(self, department: str, amount: float, supplier: str) -> bool:
+        position = self._find(department, amount, supplier)
+        return position is not None and bool(self._approved[position])
+
+    def lookup_many(self, expenses: Iterable[Mapping[str, Any]]) -> pd.DataFrame:
+        """Consulta um lote de despesas, uma busca binária por despesa.
+
+        Returns:
+            Um DataFrame na mesma ordem da entrada, com as colunas booleanas
+            `planned` e `approved_by_legal`.
+        """
+        positions = [
+            self._find(expense["department"], expense["amount"], expense["supplier"])
+            for expense in expenses
+        ]
+        return pd.DataFrame(
+            {
+                "planned": [position is not None for position in positions],
+                "approved_by_legal": [
+                    position is not None and bool(self._approved[position])
+                    for position in positions
+                ],
+            },
+            dtype=bool,
+        )
+
+
+def _encode(values: pd.Series, codes: dict[str, int]) -> np.ndarray:
+    """Códigos de dicionário de `values`, acrescentando os valores novos a `codes`."""
+    for value in values.unique():
+        codes.setdefault(value, len(codes))
+    return values.map(codes).to_numpy(dtype=np.int32)
+
+
+def convert_csv(csv_path: Path, ledger_dir: Path, chunk_rows: int = CONVERT_CHUNK_ROWS) -> int:
+    """Converte o CSV de despesas para o ledger colunar em `ledger_dir`.
+
+    O CSV é lido em blocos de `chunk_rows` linhas; só as colunas já
+    codificadas (17 bytes por linha) ficam em memória. Retorna o número de
+    despesas distintas gravadas.
+    """
+    department_codes: dict[str, int] = {}
+    supplier_codes: dict[str, int] = {}
+    chunks: list[tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]] = []
+    for df in pd.read_csv(csv_path, dtype=str, keep_default_na=False, chunksize=chunk_rows):
+        keys = _expense_rows(df, csv_path)
+        chunks.append(
+            (
+                _encode(keys["department"], department_codes),
+                _encode(keys["supplier"], supplier_codes),
+                keys["amount"].to_numpy(dtype=np.float64),
+                keys["approved"].to_numpy(dtype=bool),
+            )
+        )
+
+    if chunks:
+        department, supplier, amount, approved = (np.concatenate(c) for c in zip(*chunks))
+    else:
+        department = supplier = np.empty(0, dtype=np.int32)
+        amount, approved = np.empty(0, dtype=np.float64), np.empty(0, dtype=bool)
+    del chunks
+
+    # Ordena por (departamento, fornecedor, valor); a última chave do
+    # lexsort é a principal.
+    order = np.lexsort((amount, supplier, department))
+    department, supplier, amount, approved = (
+        department[order], supplier[order], amount[order], approved[order]
+    )
+    # Uma mesma despesa pode aparecer mais de uma vez; basta uma linha
+    # aprovada pelo jurídico para considerá-la aprovada.
+    if len(amount):
+        new_key = (
+            (department[1:] != department[:-1])
+            | (supplier[1:] != supplier[:-1])
+            | (amount[1:] != amount[:-1])
+        )
+        starts = np.flatnonzero(np.concatenate(([True], new_key)))
+        approved = np.logical_or.reduceat(approved, starts)
+        department, supplier, amount = department[starts], supplier[starts], amount[starts]
+
+    ledger_dir = Path(ledger_dir)
+    ledger_dir.mkdir(parents=True, exist_ok=True)
+    generation = f"gen-{time.time_ns()}"
+    directory = ledger_dir / generation
+    directory.mkdir()
+    for name, values in (
+        ("department", department),
+        ("supplier", supplier),
+        ("amount", amount),
+        ("approved", approved),
+    ):
+        np.save(directory / f"{name}.npy", values)
+    for name, codes in (("departments", department_codes), ("suppliers", supplier_codes)):
+        (directory / f"{name}.json").write_text(
+            json.dumps(list(codes), ensure_ascii=False), encoding="utf-8"
+        )
+
+    _write_meta(
+        ledger_dir,
+        {
+            "format": LEDGER_FORMAT_VERSION,
+            "generation": generation,
+            "rows": len(amount),
+            "source": str(csv_path),
+        },
+    )
+    _remove_old_generations(ledger_dir, generation)
+    logger.info("Ledger %s gravado com %d despesas", directory, len(amount))
+    return len(amount)
+
+
+def _write_meta(ledger_dir: Path, meta: dict[str, Any]) -> None:
+    """Troca o `meta.json` atomicamente (arquivo temporário + `os.replace`)."""
+    fd, tmp_path = tempfile.mkstemp(dir=ledger_dir, prefix=".meta-", suffix=".json")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, ledger_dir / META_FILE)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def _remove_old_generations(ledger_dir: Path, current: str) -> None:
+    generations = sorted(
+        (path for path in ledger_dir.glob("gen-*") if path.is_dir()),
+        key=lambda path: int(path.name.removeprefix("gen-")),
+    )
+    for path in generations[:-KEEP_GENERATIONS]:
+        if path.name != current:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Converte o CSV de despesas para o ledger colunar mapeado em memória."
+    )
+    parser.add_argument("csv", type=Path, help="CSV com as colunas " + ", ".join(KEY_COLUMNS))
+    parser.add_argument("ledger", type=Path, help="diretório do ledger")
+    parser.add_argument("--chunk-rows", type=int, default=CONVERT_CHUNK_ROWS)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    start = time.perf_counter()
+    rows = convert_csv(args.csv, args.ledger, args.chunk_rows)
+    print(f"{rows} despesas gravadas em {args.ledger} ({time.perf_counter() - start:.1f} s)")
+
+
+if __name__ == "__main__":
+    main()
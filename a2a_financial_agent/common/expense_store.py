@@ -0,0 +1,177 @@
+"""Índice em memória das despesas cadastradas em ``database/expenses.csv``.
+
+O CSV é transformado em um dicionário indexado pela tupla normalizada
+(departamento, valor, fornecedor), de forma que as verificações de
+planejamento e de aprovação jurídica custem O(1). Para lotes de despesas
+o índice também é mantido como tabela, consultada com um único merge do
+pandas. O índice só é reconstruído quando o arquivo muda (ver
+`FileSnapshot`).
+
+Se existir um ledger colunar em `EXPENSES_LEDGER` (por padrão
+``database/expenses.ledger``, gerado por `common.expense_ledger`), ele é
+usado no lugar do CSV: as colunas ficam mapeadas em memória, sem ler a base
+inteira. O ledger não acompanha o CSV sozinho: depois de alterar o CSV é
+preciso rodar o conversor de novo. Enquanto o CSV for mais recente que o
+ledger, as consultas continuam no ledger e um aviso é registrado no log;
+com `EXPENSES_CSV_FALLBACK=1` elas passam a ler o CSV (só para bases
+pequenas: o CSV inteiro é carregado em memória, dentro da chamada da
+ferramenta). A escolha da fonte é refeita a cada consulta, então criar ou
+remover o ledger também vale sem reiniciar os agentes.
+"""
+import logging
+import os
+from collections.abc import Iterable, Mapping
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import pandas as pd
+
+from .file_snapshot import FileSnapshot, FileVersion
+
+if TYPE_CHECKING:
+    from .expense_ledger import ExpenseLedger
+
+logger = logging.getLogger(__name__)
+
+EXPENSES_FILE = Path(__file__).parent.parent / "database" / "expenses.csv"
+EXPENSES_LEDGER = Path(os.getenv("EXPENSES_LEDGER", EXPENSES_FILE.with_suffix(".ledger")))
+# Lê o CSV quando ele for mais recente que o ledger, em vez de só avisar
+EXPENSES_CSV_FALLBACK = os.getenv("EXPENSES_CSV_FALLBACK") == "1"
+
+KEY_COLUMNS = ["department", "amount", "supplier"]
+
+ExpenseKey = tuple[str, float, str]
+
+
+def normalize_key(department: str, amount: float, supplier: str) -> ExpenseKey:
+    """Normaliza os campos de uma despesa para a chave usada no índice."""
+    return (str(department).strip().lower(), float(amount), str(supplier).strip().lower())
+
+
+def _normalize_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Versão vetorizada de `normalize_key` para um DataFrame de despesas."""
+    return pd.DataFrame(
+        {
+            "department": df["department"].astype(str).str.strip().str.lower(),
+            # Valores em branco ou inválidos viram NaN e não casam com nada.
+            "amount": pd.to_numeric(df["amount"], errors="coerce"),
+            "supplier": df["supplier"].astype(str).str.strip().str.lower(),
+        }
+    )
+
+
+def _expense_rows(df: pd.DataFrame, source: Path) -> pd.DataFrame:
+    """Chaves normalizadas e a coluna `approved` das linhas do CSV com valor válido.
+
+    Linhas sem valor numérico (por exemplo, com `amount` em branco) são
+    descartadas com um aviso, em vez de impedir a carga da base inteira.
+    """
+    keys = _normalize_frame(df)
+    keys["approved"] = df["approved_by_legal"].str.strip().str.lower() == "yes"
+    invalid = keys["amount"].isna()
+    if invalid.any():
+        logger.warning(
+            "%s: %d linha(s) sem valor numérico em amount ignoradas", source, int(invalid.sum())
+        )
+        keys = keys[~invalid]
+    return keys
+
+
+class ExpenseIndex:
+    """Índice imutável das despesas planejadas e de sua aprovação jurídica."""
+
+    def __init__(self, table: pd.DataFrame):
+        # `table` tem uma linha por chave normalizada e a coluna `approved`.
+        self._table = table
+        self._entries: dict[ExpenseKey, bool] = dict(
+            zip(
+                zip(table["department"], table["amount"], table["supplier"]),
+                table["approved"].astype(bool),
+            )
+        )
+
+    @classmethod
+    def from_csv(cls, path: Path) -> "ExpenseIndex":
+        df = pd.read_csv(path, dtype=str, keep_default_na=False)
+        keys = _expense_rows(df, path)
+        # Uma mesma despesa pode aparecer mais de uma vez; basta uma linha
+        # aprovada pelo jurídico para considerá-la aprovada.
+        table = keys.groupby(KEY_COLUMNS, as_index=False, sort=False)["approved"].any()
+        return cls(table)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def is_planned(self, department: str, amount: float, supplier: str) -> bool:
+        return normalize_key(department, amount, supplier) in self._entries
+
+    def is_legally_approved(self, department: str, amount: float, supplier: str) -> bool:
+        return self._entries.get(normalize_key(department, amount, supplier), False)
+
+    def lookup_many(self, expenses: Iterable[Mapping[str, Any]]) -> pd.DataFrame:
+        """Consulta um lote de despesas com um único merge contra o índice.
+
+        Returns:
+            Um DataFrame na mesma ordem da entrada, com as colunas booleanas
+            `planned` e `approved_by_legal`.
+        """
+        requests = _normalize_frame(pd.DataFrame(list(expenses), columns=KEY_COLUMNS))
+        merged = requests.merge(self._table, how="left", on=KEY_COLUMNS)
+        return pd.DataFrame(
+            {
+                "planned": merged["approved"].notna(),
+                "approved_by_legal": merged["approved"].eq(True),
+            }
+        )
+
+
+_csv_snapshot = FileSnapshot(EXPENSES_FILE, ExpenseIndex.from_csv)
+_ledger_snapshot: FileSnapshot | None = None
+# Versão do CSV para a qual o aviso de ledger desatualizado já foi emitido
+_stale_warned: int | None = None
+
+
+def _mtime_ns(path: Path) -> int | None:
+    try:
+        return os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def _snapshot() -> FileSnapshot:
+    """Escolhe a fonte das despesas a cada consulta: o ledger, se existir, ou o CSV."""
+    global _ledger_snapshot, _stale_warned
+    from .expense_ledger import META_FILE, ExpenseLedger
+
+    meta = EXPENSES_LEDGER / META_FILE
+    meta_mtime = _mtime_ns(meta)
+    if meta_mtime is None:
+        return _csv_snapshot
+    csv_mtime = _mtime_ns(EXPENSES_FILE)
+    if csv_mtime is not None and csv_mtime > meta_mtime:
+        # O CSV foi alterado (ou só tocado) depois da última conversão: o
+        # ledger não tem essas alterações até o conversor rodar de novo.
+        if _stale_warned != csv_mtime:
+            _stale_warned = csv_mtime
+            logger.warning(
+                "%s é mais recente que o ledger %s; %s até o ledger ser convertido "
+                "de novo (python -m common.expense_ledger)",
+                EXPENSES_FILE,
+                EXPENSES_LEDGER,
+                "usando o CSV" if EXPENSES_CSV_FALLBACK else "mantendo o ledger",
+            )
+        if EXPENSES_CSV_FALLBACK:
+            return _csv_snapshot
+    if _ledger_snapshot is None:
+        _ledger_snapshot = FileSnapshot(meta, ExpenseLedger.open)
+    return _ledger_snapshot
+
+
+def get_expense_index() -> "ExpenseIndex | ExpenseLedger":
+    """Retorna o índice de despesas, reconstruindo-o se o CSV (ou o ledger) mudou."""
+    return _snapshot().get()
+
+
+def expenses_version() -> FileVersion:
+    """Versão da base de despesas atualmente indexada."""
+    return _snapshot().version
@@ -0,0 +1,114 @@
+"""Modelo local e determinístico, para rodar os agentes sem acesso à rede.
+
+Ativado com `LLM_BACKEND=fake` (ver `create_model`). `FakeLlm` espera
+`FAKE_LLM_LATENCY_MS` milissegundos por chamada, simulando o provedor, e
+responde sempre da mesma forma ao mesmo prompt:
+
+* se a última mensagem é do usuário e o agente tem ferramentas, chama a
+  primeira ferramenta declarada. Os argumentos saem do texto: `nome=valor`
+  quando o parâmetro aparece assim, senão o primeiro número (parâmetros
+  numéricos) ou o texto inteiro (strings);
+* se a última mensagem traz respostas de ferramentas, responde com elas em
+  texto;
+* caso contrário, repete a mensagem do usuário.
+
+O uso de tokens reportado é uma estimativa (4 caracteres por token).
+"""
+import asyncio
+import json
+import os
+import re
+from collections.abc import AsyncGenerator
+from typing import Any
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+
+# Latência simulada de cada chamada ao modelo
+FAKE_LLM_LATENCY_MS = float(os.getenv("FAKE_LLM_LATENCY_MS", "50"))
+
+_NUMBER_RE = re.compile(r"-?\d+(?:\.\d+)?")
+_CHARS_PER_TOKEN = 4
+
+
+def _argument(name: str, schema: types.Schema | None, text: str) -> Any:
+    """Extrai do texto o valor de um parâmetro da ferramenta."""
+    match = re.search(rf"\b{re.escape(name)}\s*[=:]\s*(\"[^\"]*\"|[^\s,;]+)", text)
+    value = match.group(1).strip('"') if match else None
+    kind = schema.type if schema is not None else None
+    if kind in (types.Type.NUMBER, types.Type.INTEGER):
+        number = _NUMBER_RE.search(value or text)
+        if number is None:
+            return 0
+        return int(float(number.group())) if kind == types.Type.INTEGER else float(number.group())
+    return value if value is not None else text
+
+
+def _function_declarations(llm_request: LlmRequest) -> list[types.FunctionDeclaration]:
+    if llm_request.config is None or not llm_request.config.tools:
+        return []
+    return [
+        declaration
+        for tool in llm_request.config.tools
+        for declaration in (getattr(tool, "function_declarations", None) or [])
+    ]
+
+
+def _request_chars(llm_request: LlmRequest) -> int:
+    system = llm_request.config.system_instruction if llm_request.config else None
+    chars = len(system) if isinstance(system, str) else 0
+    for content in llm_request.contents:
+        for part in content.parts or []:
+            if part.text:
+                chars += len(part.text)
+            elif part.function_call or part.function_response:
+                chars += len(part.model_dump_json(exclude_none=True))
+    return chars
+
+
+class FakeLlm(BaseLlm):
+    """Modelo falso com latência configurável; não faz nenhuma chamada de rede."""
+
+    latency_ms: float = FAKE_LLM_LATENCY_MS
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        if self.latency_ms > 0:
+            await asyncio.sleep(self.latency_ms / 1000)
+
+        parts = self._respond(llm_request)
+        output_chars = sum(len(part.model_dump_json(exclude_none=True)) for part in parts)
+        yield LlmResponse(
+            content=types.Content(role="model", parts=parts),
+            usage_metadata=types.GenerateContentResponseUsageMetadata(
+                prompt_token_count=_request_chars(llm_request) // _CHARS_PER_TOKEN,
+                candidates_token_count=output_chars // _CHARS_PER_TOKEN,
+            ),
+        )
+
+    def _respond(self, llm_request: LlmRequest) -> list[types.Part]:
+        last = llm_request.contents[-1] if llm_request.contents else None
+        last_parts = (last.parts or []) if last is not None else []
+
+        results = [part.function_response.response for part in last_parts if part.function_response]
+        if results:
+            text = "\n".join(
+                result.get("result") if isinstance(result.get("result"), str)
+                else json.dumps(result, ensure_ascii=False, default=str)
+                for result in results
+            )
+            return [types.Part(text=text)]
+
+        text = " ".join(part.text for part in last_parts if part.text)
+        declarations = _function_declarations(llm_request)
+        if declarations and last is not None and last.role == "user":
+            declaration = declarations[0]
+            properties = declaration.parameters.properties if declaration.parameters else None
+            args = {
+                name: _argument(name, schema, text) for name, schema in (properties or {}).items()
+            }
+            return [types.Part(function_call=types.FunctionCall(name=declaration.name, args=args))]
+        return [types.Part(text=text)]
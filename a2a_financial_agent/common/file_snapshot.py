@@ -0,0 +1,85 @@
+"""Cache de arquivos de dados com recarga automática quando o arquivo muda.
+
+Cada `FileSnapshot` guarda o resultado do parse de um arquivo junto com a
+assinatura (mtime, tamanho) vista no momento da leitura. A cada acesso é
+feito apenas um `stat`; o arquivo só é lido novamente quando a assinatura
+muda. O novo snapshot é publicado com uma única atribuição, de modo que
+chamadas concorrentes sempre enxergam um snapshot completo (o antigo ou o
+novo), nunca uma tabela carregada pela metade.
+"""
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any, Callable, Generic, NamedTuple, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class FileVersion(NamedTuple):
+    """Assinatura de um arquivo usada para detectar alterações."""
+
+    mtime_ns: int
+    size: int
+
+
+class _Loaded(NamedTuple):
+    version: FileVersion
+    value: Any
+
+
+class FileSnapshot(Generic[T]):
+    """Mantém o conteúdo interpretado de um arquivo, recarregando-o quando muda."""
+
+    def __init__(self, path: Path, parser: Callable[[Path], T]):
+        self.path = Path(path)
+        self._parser = parser
+        self._loaded: _Loaded | None = None
+        self._reload_lock = threading.Lock()
+
+    def _stat(self) -> FileVersion:
+        st = os.stat(self.path)
+        return FileVersion(st.st_mtime_ns, st.st_size)
+
+    def get(self) -> T:
+        """Retorna o snapshot atual, recarregando o arquivo se ele mudou."""
+        return self._current().value
+
+    @property
+    def version(self) -> FileVersion:
+        """Assinatura do arquivo correspondente ao snapshot atual."""
+        return self._current().version
+
+    def _current(self) -> _Loaded:
+        loaded = self._loaded
+        version = self._stat()
+        if loaded is not None and loaded.version == version:
+            return loaded
+
+        with self._reload_lock:
+            # Outra thread pode ter recarregado enquanto esperávamos o lock.
+            loaded = self._loaded
+            version = self._stat()
+            if loaded is not None and loaded.version == version:
+                return loaded
+
+            try:
+                value = self._parser(self.path)
+            except Exception:
+                if loaded is None:
+                    raise
+                logger.exception(
+                    "Falha ao recarregar %s; mantendo a versão anterior", self.path
+                )
+                # Associa a versão inválida ao snapshot anterior para não
+                # tentar o parse novamente até o arquivo mudar outra vez.
+                loaded = _Loaded(version, loaded.value)
+                self._loaded = loaded
+                return loaded
+
+            loaded = _Loaded(version, value)
+            self._loaded = loaded
+            logger.info("Arquivo %s (re)carregado", self.path)
+            return loaded
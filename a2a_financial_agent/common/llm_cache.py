@@ -0,0 +1,334 @@
+"""Cache de respostas do LLM, usado por todos os agentes via `create_model`.
+
+`CachingLlm` envolve qualquer modelo do ADK (por padrão `LiteLlm`) e evita
+chamadas repetidas ao provedor em duas camadas:
+
+* **Exata:** hash do prompt completo (instrução de sistema, histórico da
+  conversa e schema das ferramentas). Os IDs aleatórios de chamadas de
+  ferramenta são ignorados no hash.
+* **Semântica (opcional):** quando um `embedder` é configurado, a última
+  mensagem do usuário é comparada, por similaridade de cosseno, com as
+  mensagens já respondidas no mesmo contexto (mesmo prompt anterior). Por
+  segurança, só há acerto se os números citados nas duas mensagens forem
+  idênticos: "2500" e "2600" têm embeddings quase iguais, mas não são a
+  mesma despesa. Respostas com chamadas de ferramenta nunca são servidas
+  por similaridade: "2500 do Marketing" e "2500 do Financeiro" também têm
+  embeddings quase iguais, e a chamada em cache levaria os argumentos da
+  outra despesa. Na prática, a camada semântica só responde textos que não
+  dependem dos dados da despesa (recusas, pedidos de esclarecimento).
+
+As entradas expiram por TTL e são descartadas por LRU (ver `TTLCache`).
+Defina `LLM_CACHE_BYPASS=1` para desligar o cache.
+"""
+import hashlib
+import json
+import logging
+import math
+import os
+import re
+from collections import deque
+from collections.abc import AsyncGenerator, Awaitable, Callable, Sequence
+from typing import Any
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+
+from .metrics import LLM_REQUESTS, LLM_TOKENS, REGISTRY, Sample
+from .result_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL = "openai/gpt-4.1-nano"
+LLM_CACHE_MAX_SIZE = 4096
+LLM_CACHE_TTL_SECONDS = 3600.0
+SEMANTIC_SIMILARITY_THRESHOLD = 0.95
+SEMANTIC_INDEX_MAX_SIZE = 4096
+
+Embedder = Callable[[str], Awaitable[Sequence[float]]]
+
+_NUMBER_RE = re.compile(r"\d+(?:[.,]\d+)*")
+
+
+def _strip_call_ids(value: Any) -> Any:
+    """Remove os campos `id` (aleatórios a cada invocação) de chamadas de ferramenta."""
+    if isinstance(value, dict):
+        return {
+            key: _strip_call_ids(item)
+            for key, item in value.items()
+            if not (key == "id" and ("name" in value))
+        }
+    if isinstance(value, list):
+        return [_strip_call_ids(item) for item in value]
+    return value
+
+
+def _hash(payload: Any) -> str:
+    data = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+def _dump_contents(llm_request: LlmRequest) -> list[Any]:
+    return [
+        _strip_call_ids(content.model_dump(mode="json", exclude_none=True))
+        for content in llm_request.contents
+    ]
+
+
+def _dump_config(llm_request: LlmRequest) -> Any:
+    if llm_request.config is None:
+        return None
+    return llm_request.config.model_dump(mode="json", exclude_none=True)
+
+
+def _last_user_text(llm_request: LlmRequest) -> str | None:
+    if not llm_request.contents:
+        return None
+    last = llm_request.contents[-1]
+    if last.role != "user" or not last.parts:
+        return None
+    texts = [part.text for part in last.parts if part.text]
+    # Mensagens com respostas de ferramenta não entram na camada semântica.
+    if len(texts) != len(last.parts):
+        return None
+    return "\n".join(texts)
+
+
+def _numbers(text: str) -> tuple[str, ...]:
+    return tuple(sorted(re.sub(r"[.,]", "", n) for n in _NUMBER_RE.findall(text)))
+
+
+def _has_function_call(responses: list[LlmResponse]) -> bool:
+    return any(
+        part.function_call is not None
+        for response in responses
+        if response.content and response.content.parts
+        for part in response.content.parts
+    )
+
+
+def _cosine(a: Sequence[float], b: Sequence[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+class LlmResponseCache:
+    """Armazenamento das respostas do LLM e métricas de acerto."""
+
+    def __init__(
+        self,
+        max_size: int = LLM_CACHE_MAX_SIZE,
+        ttl: float = LLM_CACHE_TTL_SECONDS,
+        embedder: Embedder | None = None,
+        similarity_threshold: float = SEMANTIC_SIMILARITY_THRESHOLD,
+        semantic_max_size: int = SEMANTIC_INDEX_MAX_SIZE,
+    ):
+        self._responses = TTLCache(max_size=max_size, ttl=ttl)
+        self.embedder = embedder
+        self.similarity_threshold = similarity_threshold
+        # (escopo, números citados, embedding, chave exata)
+        self._semantic_index: deque[tuple[str, tuple[str, ...], Sequence[float], str]] = deque(
+            maxlen=semantic_max_size
+        )
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.bypassed = 0
+
+    def __len__(self) -> int:
+        return len(self._responses)
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.exact_hits + self.semantic_hits + self.misses
+        return (self.exact_hits + self.semantic_hits) / total if total else 0.0
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "size": len(self),
+            "exact_hits": self.exact_hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "hit_rate": self.hit_rate,
+        }
+
+    def samples(self) -> list[Sample]:
+        """Estatísticas do cache no formato dos coletores de `common.metrics`."""
+        help = "Consultas ao cache do LLM, por resultado"
+        return [
+            ("llm_cache_entries", "Respostas no cache do LLM", {}, len(self)),
+            ("llm_cache_hit_ratio", "Taxa de acerto do cache do LLM", {}, self.hit_rate),
+            ("llm_cache_lookups", help, {"result": "exact_hit"}, self.exact_hits),
+            ("llm_cache_lookups", help, {"result": "semantic_hit"}, self.semantic_hits),
+            ("llm_cache_lookups", help, {"result": "miss"}, self.misses),
+            ("llm_cache_lookups", help, {"result": "bypass"}, self.bypassed),
+        ]
+
+    @staticmethod
+    def keys(model: str, llm_request: LlmRequest) -> tuple[str, str]:
+        """Retorna a chave exata e o escopo semântico (tudo menos a última mensagem)."""
+        config = _dump_config(llm_request)
+        contents = _dump_contents(llm_request)
+        exact = _hash({"model": model, "config": config, "contents": contents})
+        scope = _hash({"model": model, "config": config, "contents": contents[:-1]})
+        return exact, scope
+
+    async def lookup(
+        self, exact_key: str, scope: str, user_text: str | None
+    ) -> tuple[list[LlmResponse] | None, Sequence[float] | None]:
+        """Procura uma resposta, retornando também o embedding calculado (se houver)."""
+        responses = self._responses.get(exact_key)
+        if responses is not None:
+            self.exact_hits += 1
+            return responses, None
+
+        embedding = None
+        if self.embedder is not None and user_text:
+            try:
+                embedding = await self.embedder(user_text)
+            except Exception as e:
+                logger.warning("Falha ao calcular embedding para o cache do LLM: %s", e)
+            if embedding is not None:
+                numbers = _numbers(user_text)
+                best_key, best_score = None, self.similarity_threshold
+                for entry_scope, entry_numbers, entry_embedding, entry_key in self._semantic_index:
+                    if entry_scope != scope or entry_numbers != numbers:
+                        continue
+                    score = _cosine(embedding, entry_embedding)
+                    if score >= best_score:
+                        best_key, best_score = entry_key, score
+                if best_key is not None:
+                    responses = self._responses.get(best_key)
+                    if responses is not None and not _has_function_call(responses):
+                        self.semantic_hits += 1
+                        return responses, embedding
+
+        self.misses += 1
+        return None, embedding
+
+    def store(
+        self,
+        exact_key: str,
+        scope: str,
+        user_text: str | None,
+        embedding: Sequence[float] | None,
+        responses: list[LlmResponse],
+    ) -> None:
+        self._responses.put(exact_key, responses)
+        if embedding is not None and user_text and not _has_function_call(responses):
+            self._semantic_index.append((scope, _numbers(user_text), embedding, exact_key))
+
+
+class CachingLlm(BaseLlm):
+    """Modelo do ADK que consulta o `LlmResponseCache` antes do modelo real."""
+
+    inner: BaseLlm
+    cache: LlmResponseCache
+    bypass: bool = False
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        # Respostas em streaming chegam em pedaços parciais e não são cacheadas.
+        if stream or self.bypass or os.getenv("LLM_CACHE_BYPASS") == "1":
+            self.cache.bypassed += 1
+            LLM_REQUESTS.inc(model=self.inner.model, result="bypass")
+            async for response in self.inner.generate_content_async(llm_request, stream):
+                _count_tokens(self.inner.model, response)
+                yield response
+            return
+
+        exact_key, scope = self.cache.keys(self.inner.model, llm_request)
+        user_text = _last_user_text(llm_request)
+        cached, embedding = await self.cache.lookup(exact_key, scope, user_text)
+        if cached is not None:
+            LLM_REQUESTS.inc(model=self.inner.model, result="cache")
+            for response in cached:
+                yield _fresh_copy(response)
+            return
+
+        LLM_REQUESTS.inc(model=self.inner.model, result="provider")
+        responses = []
+        async for response in self.inner.generate_content_async(llm_request, stream):
+            _count_tokens(self.inner.model, response)
+            responses.append(response)
+            yield response
+
+        if responses and not any(r.error_code or r.partial for r in responses):
+            self.cache.store(exact_key, scope, user_text, embedding, responses)
+
+    def connect(self, llm_request: LlmRequest):
+        return self.inner.connect(llm_request)
+
+
+def _count_tokens(model: str, response: LlmResponse) -> None:
+    usage = response.usage_metadata
+    if usage is None:
+        return
+    LLM_TOKENS.inc(usage.prompt_token_count or 0, model=model, type="prompt")
+    LLM_TOKENS.inc(usage.cached_content_token_count or 0, model=model, type="cached")
+    LLM_TOKENS.inc(usage.candidates_token_count or 0, model=model, type="output")
+
+
+def _fresh_copy(response: LlmResponse) -> LlmResponse:
+    """Copia a resposta sem os IDs das chamadas de ferramenta, que o ADK regenera.
+
+    O uso de tokens também é removido: a resposta em cache não consumiu tokens.
+    """
+    response = response.model_copy(deep=True)
+    response.usage_metadata = None
+    if response.content and response.content.parts:
+        for part in response.content.parts:
+            if part.function_call is not None:
+                part.function_call.id = None
+    return response
+
+
+def litellm_embedder(model: str) -> Embedder:
+    """Cria um embedder que usa `litellm.aembedding` com o modelo informado."""
+
+    async def _embed(text: str) -> Sequence[float]:
+        import litellm
+
+        response = await litellm.aembedding(model=model, input=[text])
+        return response.data[0]["embedding"]
+
+    return _embed
+
+
+_default_cache: LlmResponseCache | None = None
+
+
+def get_default_cache() -> LlmResponseCache:
+    """Cache compartilhado pelos modelos do processo.
+
+    A camada semântica é ativada definindo `LLM_CACHE_EMBEDDING_MODEL`
+    (por exemplo `openai/text-embedding-3-small`).
+    """
+    global _default_cache
+    if _default_cache is None:
+        embedding_model = os.getenv("LLM_CACHE_EMBEDDING_MODEL")
+        _default_cache = LlmResponseCache(
+            embedder=litellm_embedder(embedding_model) if embedding_model else None
+        )
+        REGISTRY.add_collector(_default_cache.samples)
+    return _default_cache
+
+
+def create_model(model: str = DEFAULT_MODEL) -> BaseLlm:
+    """Cria o modelo usado pelos agentes: `LiteLlm` envolto pelo cache de respostas.
+
+    Com `LLM_BACKEND=fake`, usa o `FakeLlm` local no lugar do `LiteLlm` (para
+    testes de carga sem rede; ver `common/fake_llm.py`).
+    """
+    if os.getenv("LLM_BACKEND") == "fake":
+        from .fake_llm import FakeLlm
+
+        inner = FakeLlm(model=model)
+    else:
+        from google.adk.models.lite_llm import LiteLlm
+
+        inner = LiteLlm(model)
+    return CachingLlm(model=model, inner=inner, cache=get_default_cache())
@@ -0,0 +1,477 @@
+"""Métricas de execução no formato de texto do Prometheus.
+
+`REGISTRY` guarda os contadores, gauges e histogramas do processo;
+`add_metrics_route` expõe o conteúdo em `GET /metrics` de uma aplicação
+Starlette (a de `A2AStarletteApplication.build()`) e mede o atraso do event
+loop enquanto a aplicação estiver rodando.
+
+Valores que já existem em outros objetos (tamanho das sessões, do task
+store, acertos dos caches) não são duplicados: funções registradas com
+`REGISTRY.add_collector` são lidas a cada coleta.
+
+Com vários workers (`configure_multiprocess`), cada processo grava
+periodicamente as próprias métricas, com o rótulo `worker` (o pid), em um
+diretório compartilhado, e `GET /metrics` responde com as de todos os
+workers; some por `worker` para ter o valor do serviço.
+
+Principais métricas:
+
+* `a2a_tasks_in_flight` e `a2a_task_transitions_total` (ver `InstrumentedTaskStore`);
+* `agent_tool_duration_seconds`, por ferramenta;
+* `llm_requests_total` e `llm_tokens_total`, por modelo;
+* `event_loop_lag_seconds`.
+"""
+import asyncio
+import bisect
+import json
+import logging
+import math
+import os
+import tempfile
+import threading
+import time
+from collections.abc import Callable, Iterable, Sequence
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+from a2a.server.tasks import TaskStore
+from a2a.types import Task, TaskState
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+
+logger = logging.getLogger(__name__)
+
+# Limites (em segundos) dos histogramas de latência
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LOOP_LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+# Intervalo entre as medições do atraso do event loop
+EVENT_LOOP_LAG_INTERVAL_SECONDS = 0.5
+# Vários workers: intervalo entre as gravações das métricas de cada worker e
+# idade a partir da qual o arquivo de um worker (que morreu) é descartado
+MULTIPROCESS_WRITE_INTERVAL_SECONDS = 1.0
+MULTIPROCESS_STALE_SECONDS = 10.0
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+Labels = tuple[tuple[str, str], ...]
+# (nome, ajuda, rótulos, valor), sempre exposto como gauge
+Sample = tuple[str, str, dict[str, str], float]
+# nome -> (ajuda, tipo, linhas das amostras)
+Families = dict[str, tuple[str, str, list[str]]]
+
+
+def _labels(labels: dict[str, object]) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _format_labels(labels: Labels, extra: Labels = ()) -> str:
+    items = labels + extra
+    if not items:
+        return ""
+    escaped = (
+        (key, value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for key, value in items
+    )
+    return "{" + ",".join(f'{key}="{value}"' for key, value in escaped) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self._lock = threading.Lock()
+
+    def _lines(self, extra: Labels = ()) -> list[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str):
+        super().__init__(name, help)
+        self._values: dict[Labels, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: object) -> None:
+        key = _labels(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def _lines(self, extra: Labels = ()) -> list[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(key, extra)} {_format_value(v)}" for key, v in items]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, **labels: object) -> None:
+        with self._lock:
+            self._values[_labels(labels)] = value
+
+    def dec(self, amount: float = 1.0, **labels: object) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help)
+        self.buckets = tuple(sorted(buckets))
+        # rótulos -> (contagem por bucket, soma, total)
+        self._values: dict[Labels, tuple[list[int], float, int]] = {}
+
+    def observe(self, value: float, **labels: object) -> None:
+        key = _labels(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total, count = self._values.get(key) or ([0] * len(self.buckets), 0.0, 0)
+            if index < len(counts):
+                counts[index] += 1
+            self._values[key] = (counts, total + value, count + 1)
+
+    def _lines(self, extra: Labels = ()) -> list[str]:
+        with self._lock:
+            items = [(key, list(counts), total, count) for key, (counts, total, count) in self._values.items()]
+        lines = []
+        for key, counts, total, count in items:
+            key += extra
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                le = (("le", _format_value(bound)),)
+                lines.append(f"{self.name}_bucket{_format_labels(key, le)} {cumulative}")
+            lines.append(f'{self.name}_bucket{_format_labels(key, (("le", "+Inf"),))} {count}')
+            lines.append(f"{self.name}_sum{_format_labels(key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Métricas do processo, criadas sob demanda pelo nome."""
+
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+        self._collectors: list[Callable[[], Iterable[Sample]]] = []
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls: type, name: str, help: str, **kwargs) -> _Metric:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help, **kwargs)
+            elif type(metric) is not cls:
+                raise ValueError(f"Métrica {name} já registrada como {metric.kind}")
+            return metric
+
+    def counter(self, name: str, help: str) -> Counter:
+        return self._get_or_create(Counter, name, help)
+
+    def gauge(self, name: str, help: str) -> Gauge:
+        return self._get_or_create(Gauge, name, help)
+
+    def histogram(self, name: str, help: str, buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, help, buckets=buckets)
+
+    def add_collector(self, collector: Callable[[], Iterable[Sample]]) -> None:
+        """Registra uma função lida a cada coleta, que retorna amostras de gauges."""
+        with self._lock:
+            self._collectors.append(collector)
+
+    def families(self, extra: Labels = ()) -> Families:
+        """As métricas e as amostras dos coletores, com os rótulos `extra` em todas."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+
+        families: Families = {
+            metric.name: (metric.help, metric.kind, metric._lines(extra)) for metric in metrics
+        }
+        for collector in collectors:
+            try:
+                samples = list(collector())
+            except Exception as e:
+                logger.warning(f"Erro ao coletar métricas: {e}")
+                continue
+            for name, help, labels, value in samples:
+                _, _, sample_lines = families.setdefault(name, (help, "gauge", []))
+                sample_lines.append(
+                    f"{name}{_format_labels(_labels(labels), extra)} {_format_value(value)}"
+                )
+        return families
+
+    def render(self) -> str:
+        return render_families(self.families())
+
+
+def render_families(families: Families) -> str:
+    lines = []
+    for name, (help, kind, sample_lines) in families.items():
+        lines.extend([f"# HELP {name} {help}", f"# TYPE {name} {kind}", *sample_lines])
+    return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+TASKS_IN_FLIGHT = REGISTRY.gauge(
+    "a2a_tasks_in_flight", "Tarefas A2A ainda não finalizadas"
+)
+TASK_TRANSITIONS = REGISTRY.counter(
+    "a2a_task_transitions_total", "Mudanças de estado das tarefas A2A, pelo novo estado"
+)
+TOOL_DURATION = REGISTRY.histogram(
+    "agent_tool_duration_seconds", "Duração das chamadas às ferramentas dos agentes"
+)
+LLM_REQUESTS = REGISTRY.counter(
+    "llm_requests_total", "Chamadas ao modelo, por resultado (provider, cache, bypass)"
+)
+LLM_TOKENS = REGISTRY.counter(
+    "llm_tokens_total", "Tokens consumidos no provedor, por tipo (prompt, cached, output)"
+)
+EVENT_LOOP_LAG = REGISTRY.histogram(
+    "event_loop_lag_seconds", "Atraso do event loop em relação ao agendado", LOOP_LAG_BUCKETS
+)
+
+
+_ACTIVE_STATES = frozenset(
+    {TaskState.submitted, TaskState.working, TaskState.input_required, TaskState.auth_required}
+)
+
+
+class InstrumentedTaskStore(TaskStore):
+    """Repassa as operações a outro `TaskStore`, contando estados e tarefas em andamento.
+
+    Toda mudança de estado de uma tarefa passa por `save`, então é aqui que
+    as transições são contadas.
+    """
+
+    def __init__(self, inner: TaskStore, agent: str):
+        self.inner = inner
+        self.agent = agent
+        # Estado atual das tarefas ainda não finalizadas
+        self._states: dict[str, TaskState] = {}
+
+    async def save(self, task: Task) -> None:
+        state = task.status.state
+        previous = self._states.get(task.id)
+        if state != previous:
+            TASK_TRANSITIONS.inc(agent=self.agent, state=state.value)
+            if state in _ACTIVE_STATES:
+                if previous is None:
+                    TASKS_IN_FLIGHT.inc(agent=self.agent)
+                self._states[task.id] = state
+            elif previous is not None:
+                del self._states[task.id]
+                TASKS_IN_FLIGHT.dec(agent=self.agent)
+        await self.inner.save(task)
+
+    async def get(self, task_id: str) -> Task | None:
+        return await self.inner.get(task_id)
+
+    async def delete(self, task_id: str) -> None:
+        if self._states.pop(task_id, None) is not None:
+            TASKS_IN_FLIGHT.dec(agent=self.agent)
+        await self.inner.delete(task_id)
+
+
+def state_collector(
+    agent: str,
+    task_store: TaskStore,
+    session_service: object | None = None,
+    result_cache: object | None = None,
+) -> Callable[[], list[Sample]]:
+    """Coletor com o tamanho do task store, das sessões e do cache de respostas de um agente.
+
+    Usa o que cada objeto oferecer (`len`, `stats()`, `hit_ratio`), então
+    serve para qualquer combinação de implementações.
+    """
+    if isinstance(task_store, InstrumentedTaskStore):
+        task_store = task_store.inner
+    labels = {"agent": agent}
+
+    def collect() -> list[Sample]:
+        samples: list[Sample] = []
+
+        def add(name: str, help: str, value: float) -> None:
+            samples.append((name, help, labels, value))
+
+        if hasattr(task_store, "__len__"):
+            add("a2a_task_store_size", "Tarefas A2A em memória", len(task_store))
+        if hasattr(task_store, "evicted"):
+            add("a2a_task_store_evicted", "Tarefas descartadas da memória", task_store.evicted)
+        if hasattr(session_service, "stats"):
+            stats = session_service.stats()
+            add("adk_sessions", "Sessões do ADK em memória", stats["sessions"])
+            add("adk_session_events", "Eventos nas sessões do ADK", stats["events"])
+            add("adk_session_bytes", "Tamanho aproximado das sessões", stats["approx_bytes"])
+        if result_cache is not None:
+            add("result_cache_entries", "Respostas no cache do agente", len(result_cache))
+            add("result_cache_hit_ratio", "Taxa de acerto do cache do agente", result_cache.hit_ratio)
+        return samples
+
+    return collect
+
+
+class EventLoopLagMonitor:
+    """Mede periodicamente quanto o event loop atrasa para acordar uma task."""
+
+    def __init__(self, interval: float = EVENT_LOOP_LAG_INTERVAL_SECONDS):
+        self.interval = interval
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            EVENT_LOOP_LAG.observe(max(0.0, loop.time() - start - self.interval))
+
+
+_lag_monitor = EventLoopLagMonitor()
+
+
+class MultiprocessMetrics:
+    """Métricas de vários workers reunidas por um diretório compartilhado.
+
+    Cada worker grava as próprias métricas em `worker-<pid>.json` a cada
+    `interval` segundos, com o rótulo `worker`; o worker que atende o
+    `GET /metrics` grava as suas na hora e junta os arquivos de todos.
+    Arquivos sem atualização há mais de `stale_after` segundos são de
+    workers que terminaram e são removidos.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        registry: MetricsRegistry = REGISTRY,
+        interval: float = MULTIPROCESS_WRITE_INTERVAL_SECONDS,
+        stale_after: float = MULTIPROCESS_STALE_SECONDS,
+    ):
+        self.directory = Path(directory)
+        self.registry = registry
+        self.interval = interval
+        self.stale_after = stale_after
+        self.worker = str(os.getpid())
+        self.path = self.directory / f"worker-{self.worker}.json"
+        self._task: asyncio.Task | None = None
+
+    def write(self) -> None:
+        """Grava as métricas deste worker (arquivo temporário + `os.replace`)."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        families = self.registry.families((("worker", self.worker),))
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=".worker-", suffix=".json")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(families, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def collect(self) -> Families:
+        """As métricas de todos os workers, agrupadas por nome."""
+        self.write()
+        merged: Families = {}
+        now = time.time()
+        for path in sorted(self.directory.glob("worker-*.json")):
+            try:
+                if path != self.path and now - path.stat().st_mtime > self.stale_after:
+                    path.unlink(missing_ok=True)
+                    continue
+                families = json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, ValueError) as e:
+                logger.warning(f"Erro ao ler as métricas de {path}: {e}")
+                continue
+            for name, (help, kind, lines) in families.items():
+                merged.setdefault(name, (help, kind, []))[2].extend(lines)
+        return merged
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.path.unlink(missing_ok=True)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.to_thread(self.write)
+            except Exception as e:
+                logger.warning(f"Erro ao gravar as métricas do worker: {e}")
+            await asyncio.sleep(self.interval)
+
+
+_multiprocess: MultiprocessMetrics | None = None
+
+
+def configure_multiprocess(directory: Path) -> None:
+    """Junta as métricas dos workers que compartilham `directory` (ver `MultiprocessMetrics`)."""
+    global _multiprocess
+    _multiprocess = MultiprocessMetrics(directory)
+
+
+async def _metrics_endpoint(request: Request) -> PlainTextResponse:
+    if _multiprocess is not None:
+        text = render_families(await asyncio.to_thread(_multiprocess.collect))
+    else:
+        text = REGISTRY.render()
+    return PlainTextResponse(text, media_type=CONTENT_TYPE)
+
+
+def add_metrics_route(app: Starlette, path: str = "/metrics") -> Starlette:
+    """Expõe `REGISTRY` em `GET path` e mede o atraso do event loop durante o lifespan.
+
+    Com `configure_multiprocess`, também grava as métricas do worker durante
+    o lifespan, e `GET path` responde com as de todos os workers.
+    """
+    app.add_route(path, _metrics_endpoint, methods=["GET"])
+
+    lifespan = app.router.lifespan_context
+
+    @asynccontextmanager
+    async def _lifespan(app: Starlette):
+        _lag_monitor.start()
+        if _multiprocess is not None:
+            _multiprocess.start()
+        try:
+            async with lifespan(app) as state:
+                yield state
+        finally:
+            await _lag_monitor.stop()
+            if _multiprocess is not None:
+                await _multiprocess.stop()
+
+    app.router.lifespan_context = _lifespan
+    return app
@@ -0,0 +1,292 @@
+"""Servidor A2A dos agentes especializados.
+
+Cada agente declara um `SpecialistConfig` no seu `agent.py`. A partir dele,
+`build_specialist_app` monta a aplicação A2A completa (agent card, runner do
+ADK, executor, cache de respostas e métricas em `/metrics`). Um agente pode
+rodar sozinho, na sua porta (`run_specialist`), ou junto com outros no mesmo
+processo e no mesmo event loop (`run_specialists`), cada um sob o prefixo
+`/<nome do agente>`.
+
+Com mais de um worker (`SPECIALIST_WORKERS`), o uvicorn sobe N processos na
+mesma porta. As tarefas A2A e as sessões do ADK passam então para um arquivo
+SQLite por agente em `SPECIALIST_STATE_DIR`, para que qualquer worker atenda
+qualquer tarefa ou sessão. A exceção é `tasks/cancel`: só o worker que
+executa a tarefa pode interrompê-la, e nos demais o cancelamento é recusado
+(`TaskNotCancelableError`).
+
+As métricas também são de cada processo; para que `GET /metrics` não
+mostre só as do worker que atendeu a requisição, cada worker grava as suas
+em `SPECIALIST_STATE_DIR/metrics`, com o rótulo `worker`, e a resposta traz
+as de todos (ver `common.metrics.MultiprocessMetrics`).
+"""
+import importlib
+import inspect
+import logging
+import os
+import shutil
+from collections.abc import Callable, Hashable, Sequence
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import uvicorn
+from a2a.server.apps import A2AStarletteApplication
+from a2a.server.request_handlers import DefaultRequestHandler
+from a2a.server.tasks import TaskStore
+from a2a.types import AgentCapabilities, AgentCard, AgentSkill
+from google.adk.agents import LlmAgent
+from google.adk.artifacts import InMemoryArtifactService
+from google.adk.memory.in_memory_memory_service import InMemoryMemoryService
+from google.adk.runners import Runner
+from google.adk.sessions import BaseSessionService
+from starlette.applications import Starlette
+from starlette.routing import Mount
+
+from .adk_executor import ADKAgentExecutor
+from .metrics import (
+    REGISTRY,
+    InstrumentedTaskStore,
+    add_metrics_route,
+    configure_multiprocess,
+    state_collector,
+)
+from .result_cache import TTLCache
+from .session_manager import ManagedSessionService
+from .task_store import SQLITE_BUSY_TIMEOUT_SECONDS, BoundedTaskStore, SqliteTaskStore
+from .tracing import configure_tracing
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = "localhost"
+# Porta usada quando vários agentes rodam no mesmo processo
+MULTI_SPECIALIST_PORT = 10000
+# Número de processos worker por servidor
+SPECIALIST_WORKERS = int(os.getenv("SPECIALIST_WORKERS", "1"))
+# Diretório do estado compartilhado entre workers (tarefas e sessões)
+SPECIALIST_STATE_DIR = Path(
+    os.getenv("SPECIALIST_STATE_DIR", Path(__file__).resolve().parent.parent / ".state")
+)
+# Subdiretório de `SPECIALIST_STATE_DIR` com as métricas de cada worker
+METRICS_DIR = "metrics"
+# Com um único worker, grava as tarefas também em SQLite (em lote), para que
+# sobrevivam a reinícios
+TASK_STORE_PERSIST = os.getenv("TASK_STORE_PERSIST") == "1"
+
+# Tempo que o uvicorn espera um worker subir: importar o ADK leva vários segundos
+WORKER_STARTUP_TIMEOUT_SECONDS = 60
+
+# Variáveis usadas para passar a configuração do servidor aos workers
+_ENV_MODULES = "SPECIALIST_SERVER_MODULES"
+_ENV_URL = "SPECIALIST_SERVER_URL"
+_ENV_MOUNT = "SPECIALIST_SERVER_MOUNT"
+_ENV_STATE_DIR = "SPECIALIST_SERVER_STATE_DIR"
+
+
+@dataclass(frozen=True)
+class SpecialistConfig:
+    """Tudo o que diferencia um agente especializado dos outros."""
+
+    name: str
+    description: str
+    skill: AgentSkill
+    port: int
+    create_agent: Callable[[], LlmAgent]
+    structured_handler: Callable[[dict[str, Any]], dict[str, Any]] | None = None
+    data_version: Callable[[], Hashable] | None = None
+    version: str = "1.0.0"
+
+
+def build_agent_card(config: SpecialistConfig, url: str) -> AgentCard:
+    return AgentCard(
+        name=config.name,
+        description=config.description,
+        url=url,
+        version=config.version,
+        defaultInputModes=["text/plain", "application/json"],
+        defaultOutputModes=["text/plain", "application/json"],
+        capabilities=AgentCapabilities(streaming=True),
+        skills=[config.skill],
+    )
+
+
+def create_task_store(name: str, state_dir: Path | None = None) -> TaskStore:
+    """Tarefas do agente.
+
+    Com `state_dir` (vários workers), vão direto para o SQLite compartilhado.
+    Caso contrário ficam em um `BoundedTaskStore`, gravado em lote no SQLite
+    de `SPECIALIST_STATE_DIR` quando `TASK_STORE_PERSIST` está ativo.
+    """
+    if state_dir is not None:
+        return SqliteTaskStore(Path(state_dir) / f"{name}.sqlite3")
+    backend = (
+        SqliteTaskStore(SPECIALIST_STATE_DIR / f"{name}.sqlite3") if TASK_STORE_PERSIST else None
+    )
+    return BoundedTaskStore(backend=backend)
+
+
+def create_session_service(name: str, state_dir: Path | None = None) -> BaseSessionService:
+    """Sessões do ADK em memória (com expiração) ou, com `state_dir`, no SQLite compartilhado."""
+    if state_dir is None:
+        return ManagedSessionService()
+    from google.adk.sessions import DatabaseSessionService
+
+    Path(state_dir).mkdir(parents=True, exist_ok=True)
+    return DatabaseSessionService(
+        f"sqlite:///{Path(state_dir) / f'{name}.sqlite3'}",
+        connect_args={"timeout": SQLITE_BUSY_TIMEOUT_SECONDS},
+    )
+
+
+def build_specialist_app(
+    config: SpecialistConfig, url: str, state_dir: Path | None = None
+) -> Starlette:
+    """Monta a aplicação A2A de um agente, anunciada no endereço `url`.
+
+    Sem `state_dir`, as sessões ficam na memória do processo.
+    """
+    agent_card = build_agent_card(config, url)
+    task_store = InstrumentedTaskStore(create_task_store(config.name, state_dir), config.name)
+    session_service = create_session_service(config.name, state_dir)
+
+    runner = Runner(
+        app_name=agent_card.name,
+        agent=config.create_agent(),
+        artifact_service=InMemoryArtifactService(),
+        session_service=session_service,
+        memory_service=InMemoryMemoryService(),
+    )
+
+    agent_executor = ADKAgentExecutor(
+        runner,
+        structured_handler=config.structured_handler,
+        result_cache=TTLCache(),
+        data_version=config.data_version,
+    )
+    REGISTRY.add_collector(
+        state_collector(config.name, task_store, session_service, agent_executor.result_cache)
+    )
+
+    request_handler = DefaultRequestHandler(
+        agent_executor=agent_executor,
+        task_store=task_store,
+    )
+
+    server = A2AStarletteApplication(agent_card=agent_card, http_handler=request_handler)
+    return add_metrics_route(server.build())
+
+
+def build_multi_specialist_app(
+    configs: Sequence[SpecialistConfig], base_url: str, state_dir: Path | None = None
+) -> Starlette:
+    """Monta vários agentes em uma única aplicação, cada um em `/<nome>/`.
+
+    As métricas de todos ficam também em `/metrics`, na raiz.
+    """
+    base_url = base_url.rstrip("/")
+    app = Starlette(
+        routes=[
+            Mount(
+                f"/{config.name}",
+                app=build_specialist_app(config, f"{base_url}/{config.name}/", state_dir),
+            )
+            for config in configs
+        ]
+    )
+    return add_metrics_route(app)
+
+
+def _service_name(configs: Sequence[SpecialistConfig]) -> str:
+    return configs[0].name if len(configs) == 1 else "financial_specialists"
+
+
+def create_app_from_env() -> Starlette:
+    """Factory chamada pelo uvicorn em cada worker (ver `_serve`)."""
+    configs = [
+        importlib.import_module(module).SPECIALIST
+        for module in os.environ[_ENV_MODULES].split(",")
+    ]
+    url = os.environ[_ENV_URL]
+    state_dir = Path(os.environ[_ENV_STATE_DIR])
+    configure_tracing(_service_name(configs))
+    configure_multiprocess(state_dir / METRICS_DIR)
+    if os.environ.get(_ENV_MOUNT) == "1":
+        return build_multi_specialist_app(configs, url, state_dir)
+    return build_specialist_app(configs[0], url, state_dir)
+
+
+def _serve(
+    configs: Sequence[SpecialistConfig],
+    host: str,
+    port: int,
+    mount: bool,
+    workers: int,
+    state_dir: Path | None,
+) -> None:
+    url = f"http://{host}:{port}/"
+    if workers <= 1:
+        configure_tracing(_service_name(configs))
+        app = (
+            build_multi_specialist_app(configs, url, state_dir)
+            if mount
+            else build_specialist_app(configs[0], url, state_dir)
+        )
+        uvicorn.run(app, host=host, port=port)
+        return
+
+    # Cada worker é um processo novo: ele reconstrói a aplicação a partir
+    # dos módulos dos agentes, e o estado fica no SQLite compartilhado.
+    os.environ[_ENV_MODULES] = ",".join(config.create_agent.__module__ for config in configs)
+    os.environ[_ENV_URL] = url
+    os.environ[_ENV_MOUNT] = "1" if mount else "0"
+    os.environ[_ENV_STATE_DIR] = str(state_dir or SPECIALIST_STATE_DIR)
+    # Cria as tabelas antes de subir os workers, para que eles não disputem
+    # a criação do esquema.
+    for config in configs:
+        create_task_store(config.name, Path(os.environ[_ENV_STATE_DIR])).close()
+        create_session_service(config.name, Path(os.environ[_ENV_STATE_DIR]))
+    # Métricas de workers de uma execução anterior
+    shutil.rmtree(Path(os.environ[_ENV_STATE_DIR]) / METRICS_DIR, ignore_errors=True)
+    logger.info(f"Iniciando {workers} workers com estado em {os.environ[_ENV_STATE_DIR]}")
+    options = {}
+    # Versões antigas do uvicorn não têm essa opção (nem o health check).
+    if "timeout_worker_healthcheck" in inspect.signature(uvicorn.Config).parameters:
+        options["timeout_worker_healthcheck"] = WORKER_STARTUP_TIMEOUT_SECONDS
+    uvicorn.run(
+        f"{__name__}:create_app_from_env",
+        factory=True,
+        host=host,
+        port=port,
+        workers=workers,
+        **options,
+    )
+
+
+def run_specialist(
+    config: SpecialistConfig,
+    host: str = DEFAULT_HOST,
+    workers: int = SPECIALIST_WORKERS,
+    state_dir: Path | None = None,
+) -> None:
+    """Inicia o servidor de um único agente na porta configurada."""
+    try:
+        _serve([config], host, config.port, False, workers, state_dir)
+    except Exception as e:
+        logger.error(f"An error occurred during server startup: {e}")
+        exit(1)
+
+
+def run_specialists(
+    configs: Sequence[SpecialistConfig],
+    host: str = DEFAULT_HOST,
+    port: int = MULTI_SPECIALIST_PORT,
+    workers: int = SPECIALIST_WORKERS,
+    state_dir: Path | None = None,
+) -> None:
+    """Inicia vários agentes em um único processo (ou grupo de workers) e porta."""
+    try:
+        for config in configs:
+            logger.info(f"Agente {config.name} em http://{host}:{port}/{config.name}/")
+        _serve(configs, host, port, True, workers, state_dir)
+    except Exception as e:
+        logger.error(f"An error occurred during server startup: {e}")
+        exit(1)
@@ -0,0 +1,184 @@
+"""Sessões do ADK em memória, com expiração e limite de histórico.
+
+O `InMemorySessionService` do ADK nunca apaga uma sessão e o histórico de
+eventos de cada uma cresce sem limite. `ManagedSessionService` é um
+substituto direto que:
+
+* remove sessões sem acesso há mais de `idle_timeout` segundos;
+* compacta o histórico quando uma sessão passa de `max_events` eventos: os
+  eventos mais antigos viram um único evento com o resumo em texto da
+  conversa, e os mais recentes são mantidos a partir de uma mensagem do
+  usuário (para não separar chamadas de ferramenta das suas respostas);
+* contabiliza sessões, eventos e bytes aproximados em `stats()`.
+"""
+import logging
+import time
+from collections.abc import Callable
+from typing import Any, Optional
+
+from google.adk.events import Event
+from google.adk.sessions import InMemorySessionService, Session
+from google.adk.sessions.base_session_service import GetSessionConfig
+from google.genai import types
+
+logger = logging.getLogger(__name__)
+
+# Tempo sem acesso após o qual uma sessão é removida
+SESSION_IDLE_TIMEOUT_SECONDS = 1800.0
+# Eventos por sessão a partir dos quais o histórico é compactado
+SESSION_MAX_EVENTS = 200
+# Intervalo entre as varreduras de sessões ociosas
+SESSION_SWEEP_INTERVAL_SECONDS = 60.0
+# Tamanho máximo do resumo que substitui os eventos compactados
+COMPACTION_SUMMARY_MAX_CHARS = 2000
+
+_SUMMARY_PREFIX = "[Resumo da conversa anterior]"
+
+SessionKey = tuple[str, str, str]
+
+
+def _event_size(event: Event) -> int:
+    return len(event.model_dump_json(exclude_none=True))
+
+
+def _summarize(events: list[Event]) -> Event | None:
+    """Resume em texto os eventos descartados, mantendo o final da conversa."""
+    lines = []
+    for event in events:
+        if not event.content or not event.content.parts:
+            continue
+        text = " ".join(part.text for part in event.content.parts if part.text)
+        if not text:
+            continue
+        if text.startswith(_SUMMARY_PREFIX):
+            lines.append(text[len(_SUMMARY_PREFIX):].strip())
+        else:
+            lines.append(f"{event.author}: {text}")
+    if not lines:
+        return None
+    summary = "\n".join(lines)[-COMPACTION_SUMMARY_MAX_CHARS:]
+    return Event(
+        author="user",
+        invocation_id=events[-1].invocation_id,
+        timestamp=events[-1].timestamp,
+        content=types.Content(role="user", parts=[types.Part(text=f"{_SUMMARY_PREFIX}\n{summary}")]),
+    )
+
+
+class ManagedSessionService(InMemorySessionService):
+    """`InMemorySessionService` com expiração por ociosidade e compactação do histórico."""
+
+    def __init__(
+        self,
+        idle_timeout: float = SESSION_IDLE_TIMEOUT_SECONDS,
+        max_events: int = SESSION_MAX_EVENTS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        super().__init__()
+        self.idle_timeout = idle_timeout
+        self.max_events = max_events
+        self._clock = clock
+        self._last_access: dict[SessionKey, float] = {}
+        self._bytes: dict[SessionKey, int] = {}
+        self._next_sweep = 0.0
+        self.evicted_sessions = 0
+        self.compactions = 0
+
+    def stats(self) -> dict[str, int]:
+        """Métricas de uso de memória das sessões."""
+        return {
+            "sessions": len(self._last_access),
+            "events": sum(
+                len(session.events)
+                for users in self.sessions.values()
+                for sessions in users.values()
+                for session in sessions.values()
+            ),
+            "approx_bytes": sum(self._bytes.values()),
+            "evicted_sessions": self.evicted_sessions,
+            "compactions": self.compactions,
+        }
+
+    def _touch(self, key: SessionKey) -> None:
+        now = self._clock()
+        self._last_access[key] = now
+        if now >= self._next_sweep:
+            self.evict_idle(now)
+
+    def evict_idle(self, now: float | None = None) -> int:
+        """Remove as sessões ociosas há mais de `idle_timeout`. Retorna quantas saíram."""
+        now = self._clock() if now is None else now
+        self._next_sweep = now + SESSION_SWEEP_INTERVAL_SECONDS
+        idle = [
+            key for key, last in self._last_access.items() if now - last > self.idle_timeout
+        ]
+        for app_name, user_id, session_id in idle:
+            self._delete_session_impl(app_name=app_name, user_id=user_id, session_id=session_id)
+        if idle:
+            self.evicted_sessions += len(idle)
+            logger.info(f"{len(idle)} sessões ociosas removidas")
+        return len(idle)
+
+    def _create_session_impl(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        state: Optional[dict[str, Any]] = None,
+        session_id: Optional[str] = None,
+    ) -> Session:
+        session = super()._create_session_impl(
+            app_name=app_name, user_id=user_id, state=state, session_id=session_id
+        )
+        key = (app_name, user_id, session.id)
+        self._bytes[key] = 0
+        self._touch(key)
+        return session
+
+    def _get_session_impl(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        config: Optional[GetSessionConfig] = None,
+    ) -> Optional[Session]:
+        session = super()._get_session_impl(
+            app_name=app_name, user_id=user_id, session_id=session_id, config=config
+        )
+        if session is not None:
+            self._touch((app_name, user_id, session_id))
+        return session
+
+    def _delete_session_impl(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        super()._delete_session_impl(app_name=app_name, user_id=user_id, session_id=session_id)
+        key = (app_name, user_id, session_id)
+        self._last_access.pop(key, None)
+        self._bytes.pop(key, None)
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        event = await super().append_event(session=session, event=event)
+        key = (session.app_name, session.user_id, session.id)
+        storage = self.sessions.get(session.app_name, {}).get(session.user_id, {}).get(session.id)
+        if storage is None or not storage.events or storage.events[-1] is not event:
+            return event
+
+        self._bytes[key] = self._bytes.get(key, 0) + _event_size(event)
+        self._last_access[key] = self._clock()
+        if len(storage.events) > self.max_events:
+            self._compact(key, storage)
+        return event
+
+    def _compact(self, key: SessionKey, session: Session) -> None:
+        """Reduz o histórico à metade de `max_events`, resumindo o que foi descartado."""
+        events = session.events
+        cut = len(events) - self.max_events // 2
+        while cut < len(events) and events[cut].author != "user":
+            cut += 1
+        if cut >= len(events):
+            # A invocação atual ainda não terminou; compacta na próxima.
+            return
+        summary = _summarize(events[:cut])
+        session.events = ([summary] if summary else []) + events[cut:]
+        self._bytes[key] = sum(_event_size(e) for e in session.events)
+        self.compactions += 1
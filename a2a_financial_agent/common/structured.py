@@ -0,0 +1,104 @@
+"""Requisições estruturadas de despesa, processadas sem passar pelo LLM.
+
+Quando a requisição já traz departamento, valor e fornecedor (como um
+`DataPart` A2A ou um objeto JSON), os agentes podem aplicar as regras de
+verificação diretamente, sem gastar uma chamada ao modelo.
+"""
+import json
+from collections.abc import Mapping
+from typing import Any
+
+from a2a.types import DataPart, Part
+
+EXPENSE_FIELDS = ("department", "amount", "supplier")
+
+
+def parse_expense(data: Mapping[str, Any]) -> dict[str, Any]:
+    """Valida e normaliza os campos de uma despesa estruturada.
+
+    Raises:
+        ValueError: Se algum campo estiver ausente ou o valor não for numérico.
+    """
+    missing = [field for field in EXPENSE_FIELDS if data.get(field) in (None, "")]
+    if missing:
+        raise ValueError(f"Campos obrigatórios ausentes: {', '.join(missing)}")
+    try:
+        amount = float(data["amount"])
+    except (TypeError, ValueError):
+        raise ValueError(f"Valor inválido: {data['amount']!r}")
+    return {
+        "department": str(data["department"]).strip(),
+        "amount": amount,
+        "supplier": str(data["supplier"]).strip(),
+    }
+
+
+def expense_cache_key(data: Mapping[str, Any]) -> tuple | None:
+    """Chave normalizada de uma despesa estruturada para uso em caches.
+
+    Retorna `None` para lotes ou requisições inválidas, que não são cacheadas.
+    """
+    if "expenses" in data:
+        return None
+    try:
+        expense = parse_expense(data)
+    except ValueError:
+        return None
+    return (expense["department"].lower(), expense["amount"], expense["supplier"].lower())
+
+
+def normalize_text(text: str) -> str:
+    """Normaliza um texto livre (caixa e espaços) para uso como chave de cache."""
+    return " ".join(text.lower().split())
+
+
+def parse_expense_batch(data: Mapping[str, Any]) -> list[dict[str, Any]] | None:
+    """Retorna as despesas de um lote (`{"expenses": [...]}`) já validadas.
+
+    Retorna `None` se `data` não for um lote.
+
+    Raises:
+        ValueError: Se alguma despesa do lote for inválida.
+    """
+    expenses = data.get("expenses")
+    if not isinstance(expenses, list):
+        return None
+    return [parse_expense(expense) for expense in expenses]
+
+
+def _load_json_object(text: str) -> dict[str, Any] | None:
+    text = text.strip()
+    if not text.startswith("{"):
+        return None
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def parse_expense_text(text: str) -> dict[str, Any] | None:
+    """Interpreta um texto como despesa estruturada, se for um objeto JSON válido."""
+    data = _load_json_object(text)
+    if data is None:
+        return None
+    try:
+        return parse_expense(data)
+    except ValueError:
+        return None
+
+
+def parse_expense_batch_text(text: str) -> list[Any] | None:
+    """Retorna a lista `expenses` de um texto JSON de lote, sem validar os itens."""
+    data = _load_json_object(text)
+    if data is None or not isinstance(data.get("expenses"), list):
+        return None
+    return data["expenses"]
+
+
+def extract_data_part(parts: list[Part]) -> dict[str, Any] | None:
+    """Retorna o conteúdo do primeiro `DataPart` de uma mensagem A2A, se houver."""
+    for part in parts:
+        if isinstance(part.root, DataPart):
+            return part.root.data
+    return None
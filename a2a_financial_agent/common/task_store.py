@@ -0,0 +1,278 @@
+"""Armazenamento das tarefas A2A, com limite de memória e persistência opcional.
+
+* `BoundedTaskStore` substitui o `InMemoryTaskStore`: tarefas finalizadas
+  expiram após `ttl` segundos e o número de tarefas em memória é limitado a
+  `max_size`. Com um `backend` SQLite, as escritas são agrupadas em lotes
+  por uma thread (write-behind) e as tarefas sobrevivem a reinícios.
+* `SqliteTaskStore` grava direto no SQLite (modo WAL). É o que os workers
+  usam para compartilhar tarefas entre processos.
+"""
+import asyncio
+import atexit
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+from pathlib import Path
+
+from a2a.server.tasks import TaskStore
+from a2a.types import Task, TaskState
+
+logger = logging.getLogger(__name__)
+
+# Tempo que uma escrita espera pelo lock do banco antes de falhar
+SQLITE_BUSY_TIMEOUT_SECONDS = 10.0
+# Tempo que uma tarefa finalizada continua disponível para consulta
+TASK_TTL_SECONDS = 3600.0
+# Máximo de tarefas mantidas em memória
+TASK_STORE_MAX_SIZE = 10_000
+# Intervalo entre remoções das tarefas expiradas
+PURGE_INTERVAL_SECONDS = 60.0
+# Escritas em lote: intervalo máximo e tamanho que antecipa a gravação
+WRITE_BEHIND_INTERVAL_SECONDS = 0.5
+WRITE_BEHIND_BATCH_SIZE = 256
+
+TERMINAL_STATES = frozenset(
+    {TaskState.completed, TaskState.canceled, TaskState.failed, TaskState.rejected}
+)
+
+
+def is_terminal(task: Task) -> bool:
+    return task.status.state in TERMINAL_STATES
+
+
+def replaces_terminal(stored: Task | None, task: Task) -> bool:
+    """Se gravar `task` trocaria o estado final de uma tarefa já finalizada.
+
+    Ex.: um worker que conclui uma tarefa já cancelada por outro. Gravar de
+    novo a tarefa no mesmo estado final (com mais artefatos) é permitido.
+    """
+    return (
+        stored is not None
+        and is_terminal(stored)
+        and stored.status.state != task.status.state
+    )
+
+
+class SqliteTaskStore(TaskStore):
+    """`TaskStore` em um arquivo SQLite (modo WAL).
+
+    Vários workers apontando para o mesmo arquivo enxergam as mesmas tarefas,
+    então qualquer um deles pode responder a `tasks/get` de uma tarefa criada
+    por outro. Uma tarefa finalizada não muda mais de estado (ver
+    `replaces_terminal`), e expira após `ttl` segundos. As operações rodam
+    em uma thread para não bloquear o event loop.
+    """
+
+    def __init__(self, path: Path | str, ttl: float = TASK_TTL_SECONDS):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._next_purge = 0.0
+        self._conn = sqlite3.connect(
+            self.path, timeout=SQLITE_BUSY_TIMEOUT_SECONDS, check_same_thread=False
+        )
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS a2a_tasks "
+                "(id TEXT PRIMARY KEY, data TEXT NOT NULL, expires_at REAL)"
+            )
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(a2a_tasks)")}
+            if "expires_at" not in columns:
+                self._conn.execute("ALTER TABLE a2a_tasks ADD COLUMN expires_at REAL")
+
+    def write_batch(self, tasks: Iterable[Task] = (), deleted: Iterable[str] = ()) -> None:
+        """Grava e remove várias tarefas em uma única transação."""
+        now = time.time()
+        rows = [
+            (task.id, task.model_dump_json(), now + self.ttl if is_terminal(task) else None)
+            for task in tasks
+        ]
+        with self._lock, self._conn:
+            if rows:
+                # `expires_at` só é preenchido para tarefas finalizadas.
+                self._conn.executemany(
+                    "INSERT INTO a2a_tasks (id, data, expires_at) VALUES (?, ?, ?) "
+                    "ON CONFLICT (id) DO UPDATE SET "
+                    "data = excluded.data, expires_at = excluded.expires_at "
+                    "WHERE a2a_tasks.expires_at IS NULL "
+                    "OR json_extract(a2a_tasks.data, '$.status.state') "
+                    "= json_extract(excluded.data, '$.status.state')",
+                    rows,
+                )
+            self._conn.executemany(
+                "DELETE FROM a2a_tasks WHERE id = ?", [(task_id,) for task_id in deleted]
+            )
+            if now >= self._next_purge:
+                self._conn.execute("DELETE FROM a2a_tasks WHERE expires_at < ?", (now,))
+                self._next_purge = now + PURGE_INTERVAL_SECONDS
+
+    def read(self, task_id: str) -> Task | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM a2a_tasks WHERE id = ? AND (expires_at IS NULL OR expires_at >= ?)",
+                (task_id, time.time()),
+            ).fetchone()
+        return Task.model_validate_json(row[0]) if row else None
+
+    async def save(self, task: Task) -> None:
+        await asyncio.to_thread(self.write_batch, [task])
+
+    async def get(self, task_id: str) -> Task | None:
+        return await asyncio.to_thread(self.read, task_id)
+
+    async def delete(self, task_id: str) -> None:
+        await asyncio.to_thread(self.write_batch, (), [task_id])
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class BoundedTaskStore(TaskStore):
+    """`TaskStore` em memória com TTL e tamanho máximo.
+
+    Tarefas finalizadas expiram `ttl` segundos depois de finalizadas. Acima de
+    `max_size` tarefas, as mais antigas são descartadas da memória (primeiro
+    as finalizadas). Com `backend`, toda alteração é enfileirada e gravada em
+    lote, e tarefas fora da memória são buscadas no SQLite.
+    """
+
+    def __init__(
+        self,
+        max_size: int = TASK_STORE_MAX_SIZE,
+        ttl: float = TASK_TTL_SECONDS,
+        backend: SqliteTaskStore | None = None,
+        flush_interval: float = WRITE_BEHIND_INTERVAL_SECONDS,
+        batch_size: int = WRITE_BEHIND_BATCH_SIZE,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.backend = backend
+        self._clock = clock
+        self._lock = threading.Lock()
+        # id -> (tarefa, instante de expiração ou None se ainda ativa)
+        self._tasks: OrderedDict[str, tuple[Task, float | None]] = OrderedDict()
+        self._next_purge = 0.0
+        self.evicted = 0
+
+        # Alterações ainda não gravadas: id -> tarefa (ou None para remoção)
+        self._pending: dict[str, Task | None] = {}
+        self._flush_interval = flush_interval
+        self._batch_size = batch_size
+        self._wake = threading.Event()
+        self._closed = False
+        self._flusher = None
+        if backend is not None:
+            self._flusher = threading.Thread(
+                target=self._flush_loop, name="task-store-flusher", daemon=True
+            )
+            self._flusher.start()
+            atexit.register(self.close)
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    async def save(self, task: Task) -> None:
+        now = self._clock()
+        expires_at = now + self.ttl if is_terminal(task) else None
+        with self._lock:
+            entry = self._tasks.get(task.id)
+            if entry is not None and replaces_terminal(entry[0], task):
+                logger.warning(
+                    f"Tarefa {task.id} já finalizada como {entry[0].status.state.value}; "
+                    f"ignorando o estado {task.status.state.value}"
+                )
+                return
+            self._tasks[task.id] = (task, expires_at)
+            self._tasks.move_to_end(task.id)
+            if now >= self._next_purge:
+                self._purge_expired(now)
+            while len(self._tasks) > self.max_size:
+                self._evict_one()
+            if self.backend is not None:
+                self._pending[task.id] = task
+                if len(self._pending) >= self._batch_size:
+                    self._wake.set()
+
+    async def get(self, task_id: str) -> Task | None:
+        with self._lock:
+            entry = self._tasks.get(task_id)
+            if entry is not None:
+                task, expires_at = entry
+                if expires_at is None or expires_at > self._clock():
+                    return task
+                del self._tasks[task_id]
+                return None
+            if self.backend is None:
+                return None
+            if task_id in self._pending:
+                return self._pending[task_id]
+        return await asyncio.to_thread(self.backend.read, task_id)
+
+    async def delete(self, task_id: str) -> None:
+        with self._lock:
+            self._tasks.pop(task_id, None)
+            if self.backend is not None:
+                self._pending[task_id] = None
+
+    def _purge_expired(self, now: float) -> None:
+        expired = [
+            task_id
+            for task_id, (_, expires_at) in self._tasks.items()
+            if expires_at is not None and expires_at <= now
+        ]
+        for task_id in expired:
+            del self._tasks[task_id]
+        self._next_purge = now + PURGE_INTERVAL_SECONDS
+
+    def _evict_one(self) -> None:
+        victim = next(
+            (task_id for task_id, (_, expires_at) in self._tasks.items() if expires_at is not None),
+            None,
+        )
+        if victim is None:
+            # Só há tarefas em andamento: descarta a mais antiga mesmo assim,
+            # para manter o limite de memória (com backend, ela continua no SQLite).
+            victim = next(iter(self._tasks))
+            logger.warning(f"Limite de tarefas atingido; descartando tarefa ativa {victim}")
+        del self._tasks[victim]
+        self.evicted += 1
+
+    def flush(self) -> None:
+        """Grava imediatamente as alterações pendentes no backend."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending or self.backend is None:
+            return
+        try:
+            self.backend.write_batch(
+                [task for task in pending.values() if task is not None],
+                [task_id for task_id, task in pending.items() if task is None],
+            )
+        except Exception as e:
+            logger.error(f"Erro ao gravar {len(pending)} tarefas no SQLite: {e}")
+
+    def _flush_loop(self) -> None:
+        while not self._closed:
+            self._wake.wait(self._flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def close(self) -> None:
+        """Para a thread de gravação e grava o que ainda estiver pendente."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._flusher is not None:
+            self._wake.set()
+            self._flusher.join()
+            self.flush()
+            self.backend.close()
+            atexit.unregister(self.close)
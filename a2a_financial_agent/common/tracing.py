@@ -0,0 +1,184 @@
+"""Tracing com OpenTelemetry do orquestrador e dos agentes especializados.
+
+Os spans cobrem o turno do orquestrador (`orchestrator.stream`), cada
+chamada A2A (`a2a.send_message`), a execução da tarefa no agente
+(`a2a.execute` e `adk.run_agent`) e as ferramentas (`tool.<nome>`). Os spans
+do próprio ADK (chamadas ao LLM e às ferramentas) ficam aninhados nesses.
+
+O contexto do trace atravessa a chamada A2A no `metadata` da mensagem
+(formato W3C `traceparent`), então o trace do agente continua o do
+orquestrador.
+
+Sem configuração, nada é exportado (a API do OpenTelemetry é no-op).
+`TRACING_EXPORTER` escolhe o destino:
+
+* `console`: imprime os spans na saída padrão;
+* `file`: grava um span por linha, em JSON, em `TRACING_FILE`.
+"""
+import functools
+import inspect
+import logging
+import os
+import time
+from collections.abc import AsyncGenerator, AsyncIterator, Callable, Mapping, Sequence
+from pathlib import Path
+from typing import Any, TypeVar
+
+from opentelemetry import context as otel_context
+from opentelemetry import propagate, trace
+from opentelemetry.sdk.trace import ReadableSpan
+from opentelemetry.sdk.trace.export import SpanExporter, SpanExportResult
+from opentelemetry.trace import Span, Status, StatusCode
+
+from .metrics import TOOL_DURATION
+
+logger = logging.getLogger(__name__)
+
+TRACING_EXPORTER = os.getenv("TRACING_EXPORTER", "")
+TRACING_FILE = Path(
+    os.getenv("TRACING_FILE", Path(__file__).resolve().parent.parent / ".state" / "traces.jsonl")
+)
+
+# Chave do `metadata` da mensagem A2A que leva o contexto do trace
+TRACE_CONTEXT_METADATA_KEY = "trace_context"
+# Spans internos do SDK do A2A (fila de eventos, handlers), descartados na
+# exportação: são dezenas por requisição e quase todos sem pai
+EXCLUDED_INSTRUMENTATION_SCOPES = frozenset({"a2a-python-sdk"})
+
+tracer = trace.get_tracer("a2a_financial_agent")
+
+_configured = False
+
+T = TypeVar("T")
+
+
+def configure_tracing(service_name: str) -> None:
+    """Ativa a exportação dos spans conforme `TRACING_EXPORTER` (uma vez por processo)."""
+    global _configured
+    if _configured or not TRACING_EXPORTER:
+        return
+    _configured = True
+
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+
+    if TRACING_EXPORTER == "console":
+        exporter = ConsoleSpanExporter()
+    elif TRACING_EXPORTER == "file":
+        TRACING_FILE.parent.mkdir(parents=True, exist_ok=True)
+        exporter = ConsoleSpanExporter(
+            out=open(TRACING_FILE, "a", encoding="utf-8"),
+            formatter=lambda span: span.to_json(indent=None) + "\n",
+        )
+    else:
+        logger.warning(f"TRACING_EXPORTER desconhecido: {TRACING_EXPORTER}; tracing desativado")
+        return
+
+    provider = trace.get_tracer_provider()
+    if not isinstance(provider, TracerProvider):
+        provider = TracerProvider(resource=Resource.create({"service.name": service_name}))
+        trace.set_tracer_provider(provider)
+    provider.add_span_processor(BatchSpanProcessor(_ScopeFilterExporter(exporter)))
+    logger.info(f"Tracing ativo ({TRACING_EXPORTER}) para {service_name}")
+
+
+class _ScopeFilterExporter(SpanExporter):
+    """Repassa ao `exporter` apenas os spans fora de `EXCLUDED_INSTRUMENTATION_SCOPES`."""
+
+    def __init__(self, exporter: SpanExporter):
+        self.exporter = exporter
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        spans = [
+            span
+            for span in spans
+            if span.instrumentation_scope is None
+            or span.instrumentation_scope.name not in EXCLUDED_INSTRUMENTATION_SCOPES
+        ]
+        return self.exporter.export(spans) if spans else SpanExportResult.SUCCESS
+
+    def shutdown(self) -> None:
+        self.exporter.shutdown()
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return self.exporter.force_flush(timeout_millis)
+
+
+def inject_context(metadata: dict[str, Any] | None = None) -> dict[str, Any] | None:
+    """Acrescenta o contexto do trace atual ao `metadata` de uma mensagem A2A."""
+    carrier: dict[str, str] = {}
+    propagate.inject(carrier)
+    if not carrier:
+        return metadata
+    return {**(metadata or {}), TRACE_CONTEXT_METADATA_KEY: carrier}
+
+
+def extract_context(metadata: Mapping[str, Any] | None) -> otel_context.Context | None:
+    """Contexto do trace recebido no `metadata` de uma mensagem A2A, se houver."""
+    carrier = (metadata or {}).get(TRACE_CONTEXT_METADATA_KEY)
+    if not isinstance(carrier, Mapping):
+        return None
+    return propagate.extract(carrier)
+
+
+def record_error(span: Span, error: BaseException) -> None:
+    span.record_exception(error)
+    span.set_status(Status(StatusCode.ERROR, str(error)))
+
+
+async def iterate_in_span(span: Span, iterator: AsyncGenerator[T, None]) -> AsyncIterator[T]:
+    """Itera um gerador assíncrono com `span` como span atual a cada passo.
+
+    O span só fica ativo enquanto o gerador executa, e não entre um `yield`
+    e outro (senão vazaria para o código do consumidor). Se o consumidor
+    parar antes do fim, o gerador é fechado ainda dentro do span.
+    """
+    try:
+        while True:
+            with _in_span(span):
+                try:
+                    item = await iterator.__anext__()
+                except StopAsyncIteration:
+                    return
+            yield item
+    finally:
+        with _in_span(span):
+            await iterator.aclose()
+
+
+def _in_span(span: Span):
+    return trace.use_span(
+        span, end_on_exit=False, record_exception=False, set_status_on_exception=False
+    )
+
+
+def traced(name: str | None = None) -> Callable[[Callable[..., T]], Callable[..., T]]:
+    """Decorator que envolve a função (síncrona) em um span `tool.<nome>`.
+
+    Os argumentos de tipos simples viram atributos do span, e a duração vai
+    para o histograma `agent_tool_duration_seconds`. A assinatura e a
+    docstring são preservadas, então a função continua servindo de
+    ferramenta do ADK.
+    """
+
+    def decorator(func: Callable[..., T]) -> Callable[..., T]:
+        span_name = name or f"tool.{func.__name__}"
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            with tracer.start_as_current_span(span_name) as span:
+                if span.is_recording():
+                    for arg, value in signature.bind_partial(*args, **kwargs).arguments.items():
+                        if isinstance(value, (str, int, float, bool)):
+                            span.set_attribute(f"tool.arg.{arg}", value)
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    TOOL_DURATION.observe(time.perf_counter() - start, tool=func.__name__)
+
+        return wrapper
+
+    return decorator
@@ -1,3 +1,23 @@
-from .agent import root_agent
+import importlib.util
+import sys
+from pathlib import Path
 
-__all__ = ["root_agent"]
\ No newline at end of file
+# O `adk web`/`adk run` carrega este pacote como ponto de entrada do
+# orquestrador. Quando o pacote `common` (em `a2a_financial_agent/`) não
+# está instalado nem no PYTHONPATH, a raiz do projeto entra no sys.path
+# aqui, uma única vez, antes de `host.agent` importá-lo.
+if importlib.util.find_spec("common") is None:
+    sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+
+def __getattr__(name: str):
+    # `root_agent` só é criado no primeiro acesso (ver `host.agent`), para que
+    # importar o pacote não dependa dos agentes remotos.
+    if name == "root_agent":
+        from .agent import root_agent
+
+        return root_agent
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+__all__ = ["root_agent"]
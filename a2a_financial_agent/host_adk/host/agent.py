@@ -1,175 +1,365 @@
+from __future__ import annotations
+
 import asyncio
-import json
+import contextvars
 import logging
+import os
 import uuid
-from typing import Any, AsyncIterable, List
-from google.adk.models.lite_llm import LiteLlm
+from typing import TYPE_CHECKING, Any, AsyncIterable, AsyncIterator, Iterable, List, Mapping
 
 import httpx
-import nest_asyncio
-from a2a.client import A2ACardResolver
+from a2a.client import A2AClientHTTPError
 from a2a.types import (
     AgentCard,
+    DataPart,
     Message,
     MessageSendParams,
     Part,
-    Role,
     SendMessageRequest,
     SendMessageResponse,
     SendMessageSuccessResponse,
+    SendStreamingMessageRequest,
+    SendStreamingMessageSuccessResponse,
     Task,
+    TaskArtifactUpdateEvent,
+    TaskState,
+    TaskStatusUpdateEvent,
     TextPart,
 )
-from dotenv import load_dotenv
-from google.adk import Agent
-from google.adk.agents.readonly_context import ReadonlyContext
-from google.adk.artifacts import InMemoryArtifactService
-from google.adk.memory.in_memory_memory_service import InMemoryMemoryService
-from google.adk.runners import Runner
-from google.adk.sessions import InMemorySessionService
-from google.adk.tools.tool_context import ToolContext
-from openai.types.chat import ChatCompletionMessage
-
-from .remote_connection import RemoteAgentConnections
+from opentelemetry.trace import SpanKind
+
+from .agent_registry import AgentRegistry
+from .circuit_breaker import CircuitOpenError
+from .remote_connection import RemoteAgentConnections, create_httpx_client
+
+from common.structured import parse_expense, parse_expense_batch_text, parse_expense_text
+from common.tracing import (
+    configure_tracing,
+    inject_context,
+    iterate_in_span,
+    record_error,
+    tracer,
+)
+
+if TYPE_CHECKING:
+    from google.adk import Agent
+    from google.adk.agents.callback_context import CallbackContext
+    from google.adk.agents.readonly_context import ReadonlyContext
+    from google.adk.artifacts import InMemoryArtifactService
+    from google.adk.memory.in_memory_memory_service import InMemoryMemoryService
+    from google.adk.runners import Runner
+    from google.adk.tools.tool_context import ToolContext
+    from google.genai import types
+
+    from common.llm_cache import create_model
+    from common.session_manager import ManagedSessionService
 
 # Configuração do logger
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
-# Carrega variáveis de ambiente e configura o asyncio
-load_dotenv()
-nest_asyncio.apply()
-
 # Configuração dos agentes remotos
-REMOTE_AGENTS = [
+# (REMOTE_AGENT_URLS, separado por vírgulas, substitui a lista padrão; use-o
+# quando os agentes rodam juntos em `run_specialists.py`)
+DEFAULT_REMOTE_AGENTS = [
     "http://localhost:10002",  # check_budget_agent
     "http://localhost:10003",  # check_planning_agent
     "http://localhost:10004",  # check_legal_agent
 ]
 
+# Tempo máximo de espera pela resposta de cada agente remoto
+AGENT_TIMEOUT_SECONDS = 30
+
+# Aprovação em lote: despesas por requisição A2A e lotes simultâneos
+BATCH_SIZE = 200
+BATCH_MAX_CONCURRENCY = 4
+
+
+# Parte fixa das instruções do orquestrador. Fica no início do prompt e não
+# muda entre turnos, para aproveitar o cache de prompt do provedor; o catálogo
+# de agentes (que muda com o registro) vai no final.
+ROOT_INSTRUCTION_PREFIX = """\
+**Papel:** Você é o Agente Orquestrador Financeiro, responsável por coordenar a aprovação de despesas de negócios.
+
+**Diretrizes Principais:**
+
+* **Coordenação de Verificações:**
+    * Toda requisição deve ser validada com os agentes disponíveis
+        - podem existir despesas planejadas com valores diferentes para o mesmo fornecedor
+        - podem existir despesas planejadas com valores diferentes para o mesmo departamento
+        - podem existir despesas planejadas com valores diferentes para o mesmo fornecedor e departamento
+    * SEMPRE tente validar com TODOS os agentes listados em <Agentes Disponíveis>
+    * Use a ferramenta `validate_with_all_agents` para consultar TODOS os agentes de uma só vez (em paralelo)
+        - a resposta traz o retorno de cada agente e a lista `unavailable_agents` com os agentes indisponíveis
+    * Use a ferramenta `send_message` apenas para consultar novamente um agente específico
+    * Se um agente estiver indisponível, continue com as validações dos outros
+    * Use o agente de check_budget_agent para verificar se há dinheiro disponível
+    * Use o agente de check_planning_agent para verificar se a despesa está no orçamento
+    * Use o agente de check_legal_agent para verificar contratos com fornecedores
+
+* **Processo de Decisão:**
+    * A despesa SÓ pode ser aprovada se TODOS os agentes estiverem disponíveis e aprovarem
+    * Se QUALQUER agente estiver indisponível, a despesa DEVE ser rejeitada
+    * Mesmo que a despesa vá ser rejeitada, continue com as validações dos agentes disponíveis
+    * Documente claramente:
+        - Quais agentes foram consultados e suas respostas
+        - Quais agentes estavam indisponíveis
+        - Por que a despesa foi rejeitada (agentes indisponíveis ou reprovação)
+
+* **Comunicação:**
+    * Mantenha o usuário informado sobre o progresso das verificações
+    * Apresente as respostas de cada agente de forma clara
+    * Se algum agente estiver indisponível, informe qual agente não pôde ser consultado
+    * Forneça uma justificativa detalhada para a decisão final
+    * Explique que mesmo que alguns agentes tenham aprovado, a despesa foi rejeitada por falta de todas as validações
+
+* **Formato da Resposta:**
+    * Use marcadores para melhor legibilidade
+    * Inclua o status de cada verificação realizada
+    * Liste claramente:
+        - Quais agentes foram consultados e suas respostas
+        - Quais agentes estavam indisponíveis
+    * Apresente a decisão final claramente (✅ Aprovado ou ❌ Rejeitado)
+    * Explique que a despesa foi rejeitada se QUALQUER agente estiver indisponível
+    * Destaque quais validações foram positivas, mesmo que a despesa tenha sido rejeitada
+
+IMPORTANTE:
+- SEMPRE tente validar com TODOS os agentes listados em <Agentes Disponíveis>
+- A despesa SÓ pode ser aprovada se TODOS os agentes estiverem disponíveis e aprovarem
+- Se QUALQUER agente não estiver disponível, a despesa DEVE ser rejeitada
+- Mesmo que a despesa vá ser rejeitada, continue com as validações dos agentes disponíveis
+- Informe claramente:
+    * Quais agentes foram consultados e suas respostas
+    * Quais agentes não puderam ser consultados
+    * Por que a despesa foi rejeitada
+    * Quais validações foram positivas
+"""
+
+
+class RemoteAgentError(Exception):
+    """Erro ao obter uma resposta válida de um agente remoto."""
+
+
+# Fila para a qual as ferramentas publicam as atualizações intermediárias dos
+# agentes remotos durante um `stream()`. Fica em uma ContextVar para que as
+# ferramentas, chamadas pelo ADK, encontrem a fila da requisição corrente.
+_progress_queue: contextvars.ContextVar[asyncio.Queue | None] = contextvars.ContextVar(
+    "_progress_queue", default=None
+)
+
+_environment_ready = False
+
+
+def remote_agent_urls() -> list[str]:
+    """Os agentes remotos de `REMOTE_AGENT_URLS` ou, sem ela, os padrões."""
+    urls = [url.strip() for url in os.getenv("REMOTE_AGENT_URLS", "").split(",") if url.strip()]
+    return urls or list(DEFAULT_REMOTE_AGENTS)
 
-class FinancialOrchestratorAgent:
-    """O agente orquestrador financeiro."""
 
-    def __init__(self):
-        self.remote_agent_connections: dict[str, RemoteAgentConnections] = {}
-        self.cards: dict[str, AgentCard] = {}
+def _prepare_environment() -> None:
+    """Carrega o `.env` e configura o tracing (uma vez, na criação do orquestrador)."""
+    global _environment_ready
+    if _environment_ready:
+        return
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    configure_tracing("financial_orchestrator")
+    _environment_ready = True
+
+
+def _import_adk() -> None:
+    """Importa o ADK (e, com ele, o modelo) só quando o orquestrador é criado.
+
+    O import do ADK leva segundos, e importar este módulo não deve custar
+    isso. Os nomes são publicados no módulo, e não só importados aqui, porque
+    o ADK resolve as anotações das ferramentas (como `ToolContext`) nos
+    globais do módulo ao montar as declarações de função.
+    """
+    global Agent, CallbackContext, ReadonlyContext, InMemoryArtifactService
+    global InMemoryMemoryService, Runner, ToolContext, types, create_model, ManagedSessionService
+    from google.adk import Agent
+    from google.adk.agents.callback_context import CallbackContext
+    from google.adk.agents.readonly_context import ReadonlyContext
+    from google.adk.artifacts import InMemoryArtifactService
+    from google.adk.memory.in_memory_memory_service import InMemoryMemoryService
+    from google.adk.runners import Runner
+    from google.adk.tools.tool_context import ToolContext
+    from google.genai import types
+
+    from common.llm_cache import create_model
+    from common.session_manager import ManagedSessionService
+
+
+class FinancialOrchestratorAgent:
+    """O agente orquestrador financeiro.
+
+    Cada instância tem um único `Agent` do ADK, um único `Runner` e um único
+    pool HTTP, reaproveitados em todas as requisições. Os agentes remotos são
+    descobertos por `start()`, chamado por `create()` ou, na primeira
+    execução, pelo callback do agente; `aclose()` fecha todas as conexões.
+    """
+
+    def __init__(self, remote_agent_addresses: List[str] | None = None):
+        _prepare_environment()
+        _import_adk()
+        self.remote_agent_addresses = (
+            remote_agent_addresses if remote_agent_addresses is not None else remote_agent_urls()
+        )
+        # Um único pool de conexões HTTP compartilhado por todos os agentes remotos
+        self._httpx_client = create_httpx_client()
+        self.registry = AgentRegistry(self._httpx_client, on_change=self._update_agent_info)
+        self._started = False
+        self._start_lock = asyncio.Lock()
+        self._closed = False
+        self._close_on_loop_shutdown = False
+        self._shutdown_task: asyncio.Task | None = None
         self.agents: str = ""
-        self._agent = self.create_agent()
+        self._instruction: str = ""
+        self._update_agent_info()
+        # Uso de tokens do último turno que passou pelo LLM
+        self.last_turn_usage: dict[str, int] = {}
+        self._agent = self._create_agent()
         self._user_id = "finance_orchestrator"
         self._runner = Runner(
             app_name=self._agent.name,
             agent=self._agent,
             artifact_service=InMemoryArtifactService(),
-            session_service=InMemorySessionService(),
+            session_service=ManagedSessionService(),
             memory_service=InMemoryMemoryService(),
         )
 
-    async def _async_init_components(self, remote_agent_addresses: List[str]):
-        async with httpx.AsyncClient(timeout=30) as client:
-            for address in remote_agent_addresses:
-                card_resolver = A2ACardResolver(client, address)
-                try:
-                    card = await card_resolver.get_agent_card()
-                    remote_connection = RemoteAgentConnections(
-                        agent_card=card, agent_url=address
+    async def start(self, refresh_in_background: bool = True) -> None:
+        """Descobre os agentes remotos (só na primeira chamada)."""
+        if self._started:
+            return
+        async with self._start_lock:
+            if not self._started:
+                await self.registry.start(self.remote_agent_addresses, refresh_in_background)
+                self._started = True
+                if self._close_on_loop_shutdown:
+                    self._shutdown_task = asyncio.get_running_loop().create_task(
+                        self._close_when_cancelled()
                     )
-                    self.remote_agent_connections[card.name] = remote_connection
-                    self.cards[card.name] = card
-                except httpx.ConnectError as e:
-                    print(f"ERROR: Failed to get agent card from {address}: {e}")
-                except Exception as e:
-                    print(f"ERROR: Failed to initialize connection for {address}: {e}")
-
-        agent_info = [
-            json.dumps({"name": card.name, "description": card.description})
-            for card in self.cards.values()
-        ]
-        print("agent_info:", agent_info)
+
+    def close_on_loop_shutdown(self) -> None:
+        """Fecha o orquestrador quando o event loop em que ele foi iniciado terminar.
+
+        Para instâncias sem um dono que chame `aclose()`, como o `root_agent`
+        carregado pelo `adk web`: ao terminar, `asyncio.run` (usado pelo
+        uvicorn) cancela as tasks pendentes, e a task criada por `start()`
+        fecha as conexões nesse momento, ainda no event loop em que elas
+        foram abertas.
+        """
+        self._close_on_loop_shutdown = True
+
+    async def _close_when_cancelled(self) -> None:
+        try:
+            await asyncio.Event().wait()
+        finally:
+            self._shutdown_task = None
+            await self.aclose()
+
+    @property
+    def agent(self) -> Agent:
+        """O agente do ADK do orquestrador (o `root_agent` carregado pelo `adk`)."""
+        return self._agent
+
+    @property
+    def remote_agent_connections(self) -> dict[str, RemoteAgentConnections]:
+        """Conexões com os agentes remotos atualmente saudáveis."""
+        return self.registry.connections
+
+    @property
+    def cards(self) -> dict[str, AgentCard]:
+        return self.registry.cards
+
+    def _update_agent_info(self) -> None:
+        """Renderiza o catálogo de agentes e as instruções (só quando o registro muda)."""
+        agent_info = [f"- {card.name}: {card.description}" for card in self.cards.values()]
+        logger.debug("Catálogo de agentes atualizado: %s", agent_info)
         self.agents = "\n".join(agent_info) if agent_info else "No agents found"
+        self._instruction = (
+            f"{ROOT_INSTRUCTION_PREFIX}\n<Agentes Disponíveis>\n{self.agents}\n</Agentes Disponíveis>\n"
+        )
 
     @classmethod
-    async def create(cls, remote_agent_addresses: List[str]):
-        instance = cls()
-        await instance._async_init_components(remote_agent_addresses)
+    async def create(cls, remote_agent_addresses: List[str] | None = None):
+        instance = cls(remote_agent_addresses)
+        await instance.start()
         return instance
 
-    def create_agent(self) -> Agent:
+    async def aclose(self) -> None:
+        """Fecha as conexões com os agentes remotos e o pool HTTP compartilhado."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._shutdown_task is not None:
+            self._shutdown_task.cancel()
+            self._shutdown_task = None
+        await self.registry.aclose()
+        await self._httpx_client.aclose()
+
+    async def __aenter__(self) -> "FinancialOrchestratorAgent":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    def _create_agent(self) -> Agent:
         return Agent(
-            model=LiteLlm("openai/gpt-4.1-nano"),
+            model=create_model("openai/gpt-4.1-nano"),
             name="financial_orchestrator",
             instruction=self.root_instruction,
             description="Agente que coordena verificações de despesas com agentes especializados.",
-            tools=[self.send_message],
+            tools=[self.validate_with_all_agents, self.send_message],
+            before_agent_callback=self._before_agent_callback,
         )
 
     def root_instruction(self, context: ReadonlyContext) -> str:
-        return f"""
-        **Papel:** Você é o Agente Orquestrador Financeiro, responsável por coordenar a aprovação de despesas de negócios.
-
-        **Diretrizes Principais:**
-
-        * **Coordenação de Verificações:**
-            * Toda requisição deve ser validada com os agentes disponíveis
-                - podem existir despesas planejadas com valores diferentes para o mesmo fornecedor
-                - podem existir despesas planejadas com valores diferentes para o mesmo departamento
-                - podem existir despesas planejadas com valores diferentes para o mesmo fornecedor e departamento
-            * SEMPRE tente validar com TODOS os agentes listados abaixo
-            * Se um agente estiver indisponível, continue com as validações dos outros
-            * Use o agente de check_budget_agent para verificar se há dinheiro disponível
-            * Use o agente de check_planning_agent para verificar se a despesa está no orçamento
-            * Use o agente de check_legal_agent para verificar contratos com fornecedores
-
-        * **Processo de Decisão:**
-            * A despesa SÓ pode ser aprovada se TODOS os agentes estiverem disponíveis e aprovarem
-            * Se QUALQUER agente estiver indisponível, a despesa DEVE ser rejeitada
-            * Mesmo que a despesa vá ser rejeitada, continue com as validações dos agentes disponíveis
-            * Documente claramente:
-                - Quais agentes foram consultados e suas respostas
-                - Quais agentes estavam indisponíveis
-                - Por que a despesa foi rejeitada (agentes indisponíveis ou reprovação)
-
-        * **Comunicação:**
-            * Mantenha o usuário informado sobre o progresso das verificações
-            * Apresente as respostas de cada agente de forma clara
-            * Se algum agente estiver indisponível, informe qual agente não pôde ser consultado
-            * Forneça uma justificativa detalhada para a decisão final
-            * Explique que mesmo que alguns agentes tenham aprovado, a despesa foi rejeitada por falta de todas as validações
-
-        * **Formato da Resposta:**
-            * Use marcadores para melhor legibilidade
-            * Inclua o status de cada verificação realizada
-            * Liste claramente:
-                - Quais agentes foram consultados e suas respostas
-                - Quais agentes estavam indisponíveis
-            * Apresente a decisão final claramente (✅ Aprovado ou ❌ Rejeitado)
-            * Explique que a despesa foi rejeitada se QUALQUER agente estiver indisponível
-            * Destaque quais validações foram positivas, mesmo que a despesa tenha sido rejeitada
-
-        <Agentes Disponíveis>
-        {self.agents}
-        </Agentes Disponíveis>
-
-        IMPORTANTE: 
-        - SEMPRE tente validar com TODOS os agentes listados acima
-        - A despesa SÓ pode ser aprovada se TODOS os agentes estiverem disponíveis e aprovarem
-        - Se QUALQUER agente não estiver disponível, a despesa DEVE ser rejeitada
-        - Mesmo que a despesa vá ser rejeitada, continue com as validações dos agentes disponíveis
-        - Informe claramente:
-            * Quais agentes foram consultados e suas respostas
-            * Quais agentes não puderam ser consultados
-            * Por que a despesa foi rejeitada
-            * Quais validações foram positivas
-        """
+        return self._instruction
 
     async def stream(self, query: str, session_id: str) -> AsyncIterable[dict[str, Any]]:
         """Streams a resposta do agente para uma consulta."""
+        span = tracer.start_span("orchestrator.stream", attributes={"session.id": session_id})
+        try:
+            async for item in iterate_in_span(span, self._stream(query, session_id)):
+                yield item
+        except Exception as e:
+            record_error(span, e)
+            raise
+        finally:
+            span.end()
+
+    async def _stream(self, query: str, session_id: str) -> AsyncIterable[dict[str, Any]]:
+        expense = parse_expense_text(query)
+        if expense is not None:
+            decision = await self.approve_expense(**expense)
+            yield {"is_task_complete": True, "content": format_decision(decision)}
+            return
+
+        expenses = parse_expense_batch_text(query)
+        if expenses is not None:
+            approved = 0
+            async for decision in self.approve_expenses(expenses):
+                approved += decision["approved"]
+                yield {
+                    "is_task_complete": False,
+                    "updates": format_batch_update(decision),
+                    "decision": decision,
+                }
+            yield {
+                "is_task_complete": True,
+                "content": f"{approved} de {len(expenses)} despesas aprovadas.",
+            }
+            return
+
         session = await self._runner.session_service.get_session(
             app_name=self._agent.name,
             user_id=self._user_id,
             session_id=session_id,
         )
-        content = ChatCompletionMessage(role="user", content=query)
+        content = types.Content(role="user", parts=[types.Part(text=query)])
         if session is None:
             session = await self._runner.session_service.create_session(
                 app_name=self._agent.name,
@@ -177,16 +367,56 @@ class FinancialOrchestratorAgent:
                 state={},
                 session_id=session_id,
             )
-        async for event in self._runner.run_async(
-            user_id=self._user_id, session_id=session.id, new_message=content
-        ):
-            if event.is_final_response():
-                response = ""
-                if event.content and event.content.parts and event.content.parts[0].text:
-                    response = "\n".join([p.text for p in event.content.parts if p.text])
-                yield {"is_task_complete": True, "content": response}
-            else:
-                yield {"is_task_complete": False, "updates": "O agente financeiro está pensando..."}
+
+        # O runner roda em uma task separada para que as atualizações dos
+        # agentes remotos (publicadas pelas ferramentas na fila) possam ser
+        # repassadas enquanto a ferramenta ainda está esperando a resposta.
+        queue: asyncio.Queue = asyncio.Queue()
+
+        async def _run_agent():
+            try:
+                async for event in self._runner.run_async(
+                    user_id=self._user_id, session_id=session.id, new_message=content
+                ):
+                    await queue.put(("event", event))
+            except Exception as e:
+                await queue.put(("error", e))
+            finally:
+                await queue.put(("done", None))
+
+        token = _progress_queue.set(queue)
+        runner_task = asyncio.create_task(_run_agent())
+        _progress_queue.reset(token)
+
+        usage = {"llm_calls": 0, "prompt_tokens": 0, "cached_tokens": 0, "output_tokens": 0}
+        self.last_turn_usage = usage
+        try:
+            while True:
+                kind, item = await queue.get()
+                if kind == "done":
+                    break
+                if kind == "error":
+                    raise item
+                if kind == "progress":
+                    yield {"is_task_complete": False, "updates": item}
+                    continue
+                _add_usage(usage, item.usage_metadata)
+                if item.is_final_response():
+                    response = ""
+                    if item.content and item.content.parts and item.content.parts[0].text:
+                        response = "\n".join([p.text for p in item.content.parts if p.text])
+                    yield {"is_task_complete": True, "content": response}
+                else:
+                    for call in item.get_function_calls():
+                        target = (call.args or {}).get("agent_name", "todos os agentes")
+                        yield {"is_task_complete": False, "updates": f"Consultando {target}..."}
+        finally:
+            runner_task.cancel()
+            logger.info(
+                "Tokens do turno: %(llm_calls)d chamadas ao LLM, %(prompt_tokens)d de prompt "
+                "(%(cached_tokens)d em cache no provedor), %(output_tokens)d de saída",
+                usage,
+            )
 
     async def send_message(self, agent_name: str, task: str, tool_context: ToolContext):
         """Envia uma tarefa para um agente remoto."""
@@ -194,77 +424,408 @@ class FinancialOrchestratorAgent:
             logger.warning(f"Tentativa de chamar agente não disponível: {agent_name}")
             return [{"text": f"Agente {agent_name} não está disponível no momento."}]
 
-        client = self.remote_agent_connections[agent_name]
-
-        if not client:
+        if not self.remote_agent_connections[agent_name]:
             logger.warning(f"Cliente não disponível para {agent_name}")
             return [{"text": f"Cliente não disponível para {agent_name}"}]
 
-        # Gerenciamento simplificado de task e context ID
-        state = tool_context.state
-        task_id = state.get("task_id", str(uuid.uuid4()))
-        context_id = state.get("context_id", str(uuid.uuid4()))
-        message_id = str(uuid.uuid4())
-
-        payload = {
-            "message": {
-                "role": "user",
-                "parts": [{"type": "text", "text": task}],
-                "messageId": message_id,
-                "taskId": task_id,
-                "contextId": context_id,
-            },
-        }
-
         try:
-            message_request = SendMessageRequest(
-                id=message_id, params=MessageSendParams.model_validate(payload)
+            return await self._send_to_agent(
+                agent_name, [{"type": "text", "text": task}], tool_context.state
             )
-            send_response: SendMessageResponse = await client.send_message(message_request)
-            logger.debug("send_response %s", send_response)
-
-            if not isinstance(send_response.root, SendMessageSuccessResponse) or not isinstance(
-                send_response.root.result, Task
-            ):
-                logger.warning("Recebida uma resposta não-sucedida ou não-task")
-                return [{"text": f"Erro ao chamar agente {agent_name}"}]
-
-            response_content = send_response.root.model_dump_json(exclude_none=True)
-            json_content = json.loads(response_content)
-
-            resp = []
-            if json_content.get("result", {}).get("artifacts"):
-                for artifact in json_content["result"]["artifacts"]:
-                    if artifact.get("parts"):
-                        resp.extend(artifact["parts"])
-            return resp
+        except (RemoteAgentError, CircuitOpenError) as e:
+            return [{"text": str(e)}]
         except Exception as e:
             logger.error(f"Erro ao chamar agente {agent_name}: {str(e)}")
+            if _is_connection_error(e):
+                self.registry.mark_unhealthy(agent_name)
             return [{"text": f"Erro ao chamar agente {agent_name}: {str(e)}"}]
 
+    async def validate_with_all_agents(self, task: str, tool_context: ToolContext):
+        """Envia a mesma tarefa para todos os agentes remotos em paralelo.
 
-def _get_initialized_financial_agent_sync():
-    """Sincronamente cria e inicializa o FinancialOrchestratorAgent."""
+        Args:
+            task: A descrição da despesa a ser validada
 
-    async def _async_main():
-        print("inicializando agente financeiro")
-        financial_agent_instance = await FinancialOrchestratorAgent.create(
-            remote_agent_addresses=REMOTE_AGENTS
+        Returns:
+            Um dicionário com a resposta de cada agente em `responses` e os
+            agentes que não puderam ser consultados em `unavailable_agents`
+        """
+        responses, unavailable = await self._send_to_all_agents(
+            [{"type": "text", "text": task}], tool_context.state
         )
-        print("FinancialOrchestratorAgent inicializado")
-        return financial_agent_instance.create_agent()
-
-    try:
-        return asyncio.run(_async_main())
-    except RuntimeError as e:
-        if "asyncio.run() cannot be called from a running event loop" in str(e):
-            print(
-                f"Aviso: Não foi possível inicializar FinancialOrchestratorAgent com asyncio.run(): {e}. "
-                "Isso pode acontecer se um event loop já estiver rodando (ex: em Jupyter). "
-                "Considere inicializar FinancialOrchestratorAgent dentro de uma função async em sua aplicação."
-            )
-        else:
-            raise
+        return {"responses": responses, "unavailable_agents": unavailable}
+
+    async def approve_expense(
+        self, department: str, amount: float, supplier: str
+    ) -> dict[str, Any]:
+        """Decide sobre uma despesa estruturada sem passar por nenhum LLM.
+
+        Os campos são enviados como DataPart a todos os agentes em paralelo;
+        cada agente executa sua verificação diretamente e responde com
+        `approved` e `message`. As regras de decisão são as mesmas do
+        orquestrador: a despesa só é aprovada se todos os agentes estiverem
+        disponíveis e aprovarem.
+        """
+        expense = parse_expense(
+            {"department": department, "amount": amount, "supplier": supplier}
+        )
+        responses, unavailable = await self._send_to_all_agents(
+            [{"kind": "data", "data": expense}], {}
+        )
+        results = {
+            agent_name: next((p["data"] for p in parts if p.get("kind") == "data"), None)
+            for agent_name, parts in responses.items()
+            if agent_name not in unavailable
+        }
+        return _decide(expense, results, unavailable)
+
+    async def approve_expenses(
+        self,
+        expenses: Iterable[Mapping[str, Any]],
+        batch_size: int = BATCH_SIZE,
+        max_concurrency: int = BATCH_MAX_CONCURRENCY,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Aprova um lote de despesas, emitindo as decisões à medida que ficam prontas.
+
+        As despesas são agrupadas em lotes de `batch_size`; cada lote é
+        enviado como um único DataPart a todos os agentes, e no máximo
+        `max_concurrency` lotes ficam em andamento ao mesmo tempo. Cada
+        decisão tem o mesmo formato de `approve_expense`, com o campo
+        `index` indicando a posição da despesa na entrada.
+        """
+        valid: list[tuple[int, dict[str, Any]]] = []
+        for index, raw in enumerate(expenses):
+            try:
+                valid.append((index, parse_expense(raw)))
+            except (AttributeError, ValueError) as e:
+                yield {"index": index, "expense": raw, "approved": False, "error": str(e)}
+
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def _run_batch(batch: list[tuple[int, dict[str, Any]]]) -> list[dict[str, Any]]:
+            async with semaphore:
+                batch_expenses = [expense for _, expense in batch]
+                responses, unavailable = await self._send_to_all_agents(
+                    [{"kind": "data", "data": {"expenses": batch_expenses}}], {}
+                )
+
+            per_agent: dict[str, list[Any]] = {}
+            for agent_name, parts in responses.items():
+                if agent_name in unavailable:
+                    continue
+                data = next((p["data"] for p in parts if p.get("kind") == "data"), None)
+                agent_results = data.get("results") if data else None
+                if not isinstance(agent_results, list) or len(agent_results) != len(batch):
+                    agent_results = [None] * len(batch)
+                per_agent[agent_name] = agent_results
+
+            decisions = []
+            for position, (index, expense) in enumerate(batch):
+                results = {name: agent_results[position] for name, agent_results in per_agent.items()}
+                decisions.append({"index": index, **_decide(expense, results, unavailable)})
+            return decisions
+
+        tasks = [
+            asyncio.ensure_future(_run_batch(valid[i : i + batch_size]))
+            for i in range(0, len(valid), batch_size)
+        ]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                for decision in await finished:
+                    yield decision
+        finally:
+            # Se o consumidor parar antes do fim, não deixa lotes pendentes.
+            for task in tasks:
+                task.cancel()
+
+    async def _before_agent_callback(
+        self, callback_context: CallbackContext
+    ) -> types.Content | None:
+        # Quando o agente é executado por outro runner (o do `adk web`), esta
+        # é a primeira chance de descobrir os agentes remotos, já no event
+        # loop que vai usá-los.
+        await self.start()
+        return await self._structured_request_callback(callback_context)
+
+    async def _structured_request_callback(
+        self, callback_context: CallbackContext
+    ) -> types.Content | None:
+        """Responde diretamente, sem o LLM, quando a mensagem é uma despesa em JSON."""
+        content = callback_context.user_content
+        parts = getattr(content, "parts", None) or []
+        expense = parse_expense_text("\n".join(p.text for p in parts if p.text))
+        if expense is None:
+            return None
+        decision = await self.approve_expense(**expense)
+        return types.Content(role="model", parts=[types.Part(text=format_decision(decision))])
+
+    async def _send_to_all_agents(
+        self, parts: list[dict[str, Any]], state: dict[str, Any]
+    ) -> tuple[dict[str, list[dict[str, Any]]], list[str]]:
+        """Envia as mesmas partes a todos os agentes remotos em paralelo.
+
+        Retorna as partes respondidas por agente e a lista de agentes
+        indisponíveis (sem card, com erro ou que excederam o tempo limite).
+        """
+        await self.start()
+        agent_names = [name for name, client in self.remote_agent_connections.items() if client]
+        results = await asyncio.gather(
+            *(
+                asyncio.wait_for(
+                    self._send_to_agent(name, parts, state),
+                    timeout=AGENT_TIMEOUT_SECONDS,
+                )
+                for name in agent_names
+            ),
+            return_exceptions=True,
+        )
+
+        responses: dict[str, list[dict[str, Any]]] = {}
+        unavailable = self.registry.unavailable_agents
+        for agent_name, result in zip(agent_names, results):
+            if isinstance(result, asyncio.TimeoutError):
+                logger.error(f"Tempo esgotado ao chamar agente {agent_name}")
+                responses[agent_name] = [{"text": f"Tempo esgotado ao chamar agente {agent_name}"}]
+                unavailable.append(agent_name)
+            elif isinstance(result, CircuitOpenError):
+                responses[agent_name] = [{"text": str(result)}]
+                unavailable.append(agent_name)
+            elif isinstance(result, BaseException):
+                logger.error(f"Erro ao chamar agente {agent_name}: {str(result)}")
+                responses[agent_name] = [{"text": f"Erro ao chamar agente {agent_name}: {str(result)}"}]
+                unavailable.append(agent_name)
+                if _is_connection_error(result):
+                    self.registry.mark_unhealthy(agent_name)
+            else:
+                responses[agent_name] = result
+        return responses, unavailable
+
+    async def _send_to_agent(
+        self, agent_name: str, parts: list[dict[str, Any]], state: dict[str, Any]
+    ) -> list[dict[str, Any]]:
+        """Envia partes de mensagem para um agente remoto e retorna as partes dos artefatos."""
+        client = self.remote_agent_connections[agent_name]
 
+        # Gerenciamento simplificado de task e context ID
+        task_id = state.get("task_id", str(uuid.uuid4()))
+        context_id = state.get("context_id", str(uuid.uuid4()))
+        message_id = str(uuid.uuid4())
 
-root_agent = _get_initialized_financial_agent_sync()
+        progress = _progress_queue.get()
+        streaming = progress is not None and client.card.capabilities.streaming
+        with tracer.start_as_current_span(
+            "a2a.send_message",
+            kind=SpanKind.CLIENT,
+            attributes={"a2a.agent": agent_name, "a2a.task_id": task_id, "a2a.streaming": streaming},
+        ):
+            payload = {
+                "message": {
+                    "role": "user",
+                    "parts": parts,
+                    "messageId": message_id,
+                    "taskId": task_id,
+                    "contextId": context_id,
+                    "metadata": inject_context(),
+                },
+            }
+
+            params = MessageSendParams.model_validate(payload)
+            if streaming:
+                return await self._stream_from_agent(agent_name, message_id, params, progress)
+
+            message_request = SendMessageRequest(id=message_id, params=params)
+            send_response: SendMessageResponse = await client.send_message(message_request)
+        logger.debug("send_response %s", send_response)
+
+        if not isinstance(send_response.root, SendMessageSuccessResponse) or not isinstance(
+            send_response.root.result, Task
+        ):
+            logger.warning("Recebida uma resposta não-sucedida ou não-task")
+            raise RemoteAgentError(f"Erro ao chamar agente {agent_name}")
+
+        resp: list[dict[str, Any]] = []
+        for artifact in send_response.root.result.artifacts or []:
+            resp.extend(_parts_to_dicts(artifact.parts))
+        return resp
+
+    async def _stream_from_agent(
+        self,
+        agent_name: str,
+        message_id: str,
+        params: MessageSendParams,
+        progress: asyncio.Queue,
+    ) -> list[dict[str, Any]]:
+        """Envia a mensagem via streaming, repassando as atualizações do agente.
+
+        As mensagens de status intermediárias vão para a fila `progress`; as
+        partes dos artefatos são acumuladas e retornadas no mesmo formato de
+        `_send_to_agent`.
+        """
+        client = self.remote_agent_connections[agent_name]
+        request = SendStreamingMessageRequest(id=message_id, params=params)
+
+        resp: list[dict[str, Any]] = []
+        async for response in client.send_message_streaming(request):
+            if not isinstance(response.root, SendStreamingMessageSuccessResponse):
+                logger.warning("Recebida uma resposta de streaming não-sucedida")
+                raise RemoteAgentError(f"Erro ao chamar agente {agent_name}")
+
+            event = response.root.result
+            if isinstance(event, TaskStatusUpdateEvent):
+                text = _message_text(event.status.message)
+                if event.status.state == TaskState.failed:
+                    raise RemoteAgentError(text or f"Erro ao chamar agente {agent_name}")
+                if text:
+                    await progress.put(("progress", f"{agent_name}: {text}"))
+            elif isinstance(event, TaskArtifactUpdateEvent):
+                resp.extend(_parts_to_dicts(event.artifact.parts))
+            elif isinstance(event, Task) and not resp:
+                for artifact in event.artifacts or []:
+                    resp.extend(_parts_to_dicts(artifact.parts))
+        return resp
+
+def _add_usage(usage: dict[str, int], metadata: types.GenerateContentResponseUsageMetadata | None) -> None:
+    """Soma o uso de tokens de uma resposta do LLM ao total do turno."""
+    if metadata is None:
+        return
+    usage["llm_calls"] += 1
+    usage["prompt_tokens"] += metadata.prompt_token_count or 0
+    usage["cached_tokens"] += metadata.cached_content_token_count or 0
+    usage["output_tokens"] += metadata.candidates_token_count or 0
+
+
+def _is_connection_error(error: BaseException) -> bool:
+    """Indica se o erro significa que o agente não está aceitando conexões."""
+    # O A2AClient converte falhas de rede do httpx em A2AClientHTTPError,
+    # mantendo o erro original em __cause__. Timeouts não contam: o agente
+    # pode estar apenas lento.
+    # O streaming pode propagar o ConnectError diretamente.
+    if isinstance(error, httpx.ConnectError):
+        return True
+    return isinstance(error, A2AClientHTTPError) and isinstance(
+        error.__cause__, httpx.ConnectError
+    )
+
+
+def _parts_to_dicts(parts: Iterable[Part]) -> list[dict[str, Any]]:
+    """Converte as partes de um artefato para o formato de dicionário do A2A.
+
+    Texto e dados são lidos direto dos modelos, sem serializar para JSON e
+    interpretar de novo: o `data` de um DataPart é devolvido como está (o
+    mesmo objeto do modelo, sem cópia). Outros tipos de parte usam o
+    `model_dump` do pydantic.
+    """
+    result = []
+    for part in parts:
+        root = part.root
+        if isinstance(root, TextPart):
+            item = {"kind": "text", "text": root.text}
+        elif isinstance(root, DataPart):
+            item = {"kind": "data", "data": root.data}
+        else:
+            result.append(root.model_dump(mode="json", exclude_none=True))
+            continue
+        if root.metadata is not None:
+            item["metadata"] = root.metadata
+        result.append(item)
+    return result
+
+
+def _message_text(message: Message | None) -> str:
+    """Concatena as partes de texto de uma mensagem A2A."""
+    if message is None:
+        return ""
+    return "\n".join(part.root.text for part in message.parts if isinstance(part.root, TextPart))
+
+
+def _decide(
+    expense: dict[str, Any],
+    results: dict[str, dict[str, Any] | None],
+    unavailable: list[str],
+) -> dict[str, Any]:
+    """Aplica as regras de aprovação às respostas estruturadas dos agentes.
+
+    Args:
+        expense: A despesa normalizada
+        results: O resultado (`approved`/`message`) de cada agente consultado,
+            ou `None` se o agente não respondeu de forma estruturada
+        unavailable: Os agentes que não puderam ser consultados
+    """
+    checks: dict[str, dict[str, Any]] = {}
+    for agent_name, result in results.items():
+        if not isinstance(result, dict):
+            checks[agent_name] = {
+                "approved": False,
+                "message": "Resposta não estruturada do agente",
+            }
+        else:
+            checks[agent_name] = {
+                "approved": bool(result.get("approved")),
+                "message": result.get("message", ""),
+            }
+
+    approved = (
+        bool(checks)
+        and not unavailable
+        and all(check["approved"] for check in checks.values())
+    )
+    return {
+        "expense": expense,
+        "approved": approved,
+        "checks": checks,
+        "unavailable_agents": unavailable,
+    }
+
+
+def format_batch_update(decision: dict[str, Any]) -> str:
+    """Resume em uma linha uma decisão de `approve_expenses`."""
+    expense = decision["expense"]
+    label = f"Despesa {decision['index'] + 1}"
+    if isinstance(expense, Mapping):
+        label += f" ({expense.get('department')}, {expense.get('amount')}, {expense.get('supplier')})"
+    if "error" in decision:
+        return f"{label}: ❌ inválida: {decision['error']}"
+    if decision["approved"]:
+        return f"{label}: ✅ aprovada"
+    if decision["unavailable_agents"]:
+        return f"{label}: ❌ rejeitada (agentes indisponíveis)"
+    return f"{label}: ❌ rejeitada"
+
+
+def format_decision(decision: dict[str, Any]) -> str:
+    """Formata a decisão de `approve_expense` no padrão de resposta do orquestrador."""
+    lines = []
+    for agent_name, check in decision["checks"].items():
+        icon = "✅" if check["approved"] else "❌"
+        lines.append(f"• {agent_name}: {icon} {check['message']}")
+    for agent_name in decision["unavailable_agents"]:
+        lines.append(f"• {agent_name}: ❌ Agente indisponível")
+    lines.append("")
+    if decision["approved"]:
+        lines.append("✅ DESPESA APROVADA")
+        lines.append("Todos os agentes aprovaram a despesa.")
+    else:
+        lines.append("❌ DESPESA REJEITADA")
+        if decision["unavailable_agents"]:
+            lines.append("Motivo: nem todos os agentes puderam ser consultados.")
+        else:
+            lines.append("Motivo: reprovada por pelo menos um agente.")
+    return "\n".join(lines)
+
+
+def __getattr__(name: str):
+    """Cria o `root_agent` (carregado pelo `adk`) no primeiro acesso.
+
+    Importar o módulo não descobre os agentes remotos nem importa o ADK. O
+    `root_agent` é o agente do ADK de um único `FinancialOrchestratorAgent`
+    (`orchestrator`), que descobre os agentes remotos na primeira execução.
+    Ninguém chama `aclose()` nessa instância: ela se fecha quando o event
+    loop em que foi iniciada termina (ver `close_on_loop_shutdown`).
+    Em código assíncrono, prefira `await FinancialOrchestratorAgent.create(...)`.
+    """
+    if name in ("root_agent", "orchestrator"):
+        orchestrator = FinancialOrchestratorAgent()
+        orchestrator.close_on_loop_shutdown()
+        globals().update(orchestrator=orchestrator, root_agent=orchestrator.agent)
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
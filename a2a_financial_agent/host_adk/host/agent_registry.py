@@ -0,0 +1,154 @@
+import asyncio
+import logging
+from typing import Callable, List
+
+import httpx
+from a2a.types import AgentCard
+
+from .card_cache import AgentCardCache
+from .remote_connection import RemoteAgentConnections
+
+logger = logging.getLogger(__name__)
+
+# Intervalo entre as verificações de saúde dos agentes remotos
+HEALTH_CHECK_INTERVAL_SECONDS = 15
+
+
+class AgentRegistry:
+    """Registro dos agentes remotos, com verificação de saúde em segundo plano.
+
+    Apenas agentes saudáveis ficam em `connections`. Periodicamente o card de
+    cada agente é revalidado: agentes que não respondem são marcados como
+    indisponíveis e os que voltaram a responder são readicionados. Sempre que
+    o conjunto de agentes muda, `on_change` é chamado.
+    """
+
+    def __init__(
+        self,
+        httpx_client: httpx.AsyncClient,
+        card_cache: AgentCardCache | None = None,
+        on_change: Callable[[], None] | None = None,
+        health_check_interval: float = HEALTH_CHECK_INTERVAL_SECONDS,
+    ):
+        self.connections: dict[str, RemoteAgentConnections] = {}
+        self.cards: dict[str, AgentCard] = {}
+        self.addresses: list[str] = []
+        self._httpx_client = httpx_client
+        self._card_cache = card_cache or AgentCardCache()
+        self._on_change = on_change
+        self._health_check_interval = health_check_interval
+        # Nome de cada endereço já visto, mantido mesmo quando o agente cai,
+        # para que os relatórios de indisponibilidade usem o nome do agente.
+        self._names: dict[str, str] = {}
+        self._unhealthy: set[str] = set()
+        self._tasks: list[asyncio.Task] = []
+
+    @property
+    def unavailable_agents(self) -> list[str]:
+        """Agentes indisponíveis, pelo nome quando conhecido ou pelo endereço."""
+        return [
+            self._names.get(address, address)
+            for address in self.addresses
+            if address in self._unhealthy
+        ]
+
+    async def start(self, addresses: List[str], refresh_in_background: bool = True) -> None:
+        """Registra os agentes e inicia a verificação de saúde periódica.
+
+        Agentes com card em cache ficam disponíveis imediatamente e são
+        revalidados em segundo plano; os demais são resolvidos agora, em
+        paralelo.
+        """
+        self.addresses = list(addresses)
+        cached, pending = [], []
+        for address in self.addresses:
+            card = self._card_cache.get(address)
+            if card is None:
+                pending.append(address)
+            else:
+                self._add_connection(address, card)
+                cached.append(address)
+
+        if pending:
+            await self.refresh(pending)
+        if cached and not refresh_in_background:
+            await self.refresh(cached)
+        self._notify()
+
+        if cached and refresh_in_background:
+            self._tasks.append(asyncio.create_task(self.refresh(cached)))
+
+        self._tasks.append(asyncio.create_task(self._health_check_loop()))
+
+    async def refresh(self, addresses: List[str] | None = None) -> None:
+        """Revalida os agent cards dos endereços em paralelo, atualizando o registro."""
+        addresses = self.addresses if addresses is None else addresses
+        results = await asyncio.gather(
+            *(self._card_cache.fetch(self._httpx_client, address) for address in addresses),
+            return_exceptions=True,
+        )
+
+        changed_any = False
+        for address, result in zip(addresses, results):
+            if isinstance(result, BaseException):
+                if address not in self._unhealthy:
+                    logger.warning(f"Falha ao obter o agent card de {address}: {result}")
+                    self._mark_address_unhealthy(address)
+                    changed_any = True
+                continue
+
+            card, changed = result
+            if changed or address not in self._names or address in self._unhealthy:
+                if address in self._unhealthy:
+                    logger.info(f"Agente {card.name} ({address}) voltou a responder")
+                self._add_connection(address, card)
+                changed_any = True
+
+        if changed_any:
+            self._notify()
+
+    def mark_unhealthy(self, agent_name: str) -> None:
+        """Marca um agente como indisponível até a próxima verificação bem-sucedida."""
+        for address, name in self._names.items():
+            if name == agent_name and address not in self._unhealthy:
+                logger.warning(f"Agente {agent_name} marcado como indisponível")
+                self._mark_address_unhealthy(address)
+                self._notify()
+
+    async def _health_check_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self._health_check_interval)
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.error(f"Erro na verificação de saúde dos agentes: {e}")
+
+    def _add_connection(self, address: str, card: AgentCard) -> None:
+        self._remove_connection(address)
+        self.connections[card.name] = RemoteAgentConnections(
+            agent_card=card, agent_url=address, httpx_client=self._httpx_client
+        )
+        self.cards[card.name] = card
+        self._names[address] = card.name
+        self._unhealthy.discard(address)
+
+    def _remove_connection(self, address: str) -> None:
+        name = self._names.get(address)
+        if name is not None:
+            self.connections.pop(name, None)
+            self.cards.pop(name, None)
+
+    def _mark_address_unhealthy(self, address: str) -> None:
+        self._remove_connection(address)
+        self._unhealthy.add(address)
+
+    def _notify(self) -> None:
+        if self._on_change is not None:
+            self._on_change()
+
+    async def aclose(self) -> None:
+        """Interrompe as verificações em segundo plano e fecha as conexões."""
+        for task in self._tasks:
+            task.cancel()
+        for connection in self.connections.values():
+            await connection.aclose()
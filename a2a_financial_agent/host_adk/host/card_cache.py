@@ -0,0 +1,90 @@
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+
+import httpx
+from a2a.types import AgentCard
+
+logger = logging.getLogger(__name__)
+
+# Arquivo onde os agent cards resolvidos ficam salvos entre execuções
+CARD_CACHE_FILE = Path(__file__).parent / ".agent_cards.json"
+AGENT_CARD_PATH = "/.well-known/agent.json"
+# Timeouts curtos: um agente fora do ar não deve atrasar a inicialização
+CARD_CONNECT_TIMEOUT_SECONDS = 2
+CARD_READ_TIMEOUT_SECONDS = 5
+
+
+class AgentCardCache:
+    """Cache em disco dos agent cards, revalidado por ETag ou pelo conteúdo do card."""
+
+    def __init__(self, path: Path = CARD_CACHE_FILE):
+        self.path = Path(path)
+        self._entries: dict[str, dict] = self._load()
+
+    def _load(self) -> dict[str, dict]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Cache de agent cards ignorado ({self.path}): {e}")
+            return {}
+
+    def _save(self) -> None:
+        # Escreve em um arquivo temporário e renomeia, para nunca deixar o
+        # cache pela metade se o processo morrer durante a escrita.
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, prefix=".agent_cards.")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning(f"Não foi possível salvar o cache de agent cards: {e}")
+
+    def get(self, address: str) -> AgentCard | None:
+        """Retorna o card salvo para o endereço, se houver."""
+        entry = self._entries.get(address)
+        if entry is None:
+            return None
+        try:
+            return AgentCard.model_validate(entry["card"])
+        except Exception as e:
+            logger.warning(f"Card em cache inválido para {address}: {e}")
+            return None
+
+    async def fetch(self, client: httpx.AsyncClient, address: str) -> tuple[AgentCard, bool]:
+        """Busca o card do agente, revalidando a cópia em cache.
+
+        Returns:
+            O card atual e se ele mudou em relação ao cache.
+        """
+        entry = self._entries.get(address)
+        headers = {}
+        if entry and entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+
+        response = await client.get(
+            f"{address.rstrip('/')}{AGENT_CARD_PATH}",
+            headers=headers,
+            timeout=httpx.Timeout(
+                CARD_READ_TIMEOUT_SECONDS, connect=CARD_CONNECT_TIMEOUT_SECONDS
+            ),
+        )
+        if response.status_code == 304 and entry is not None:
+            return AgentCard.model_validate(entry["card"]), False
+        response.raise_for_status()
+
+        card_data = response.json()
+        card = AgentCard.model_validate(card_data)
+        changed = entry is None or entry["card"] != card_data
+        if changed or entry.get("etag") != response.headers.get("etag"):
+            self._entries[address] = {
+                "card": card_data,
+                "etag": response.headers.get("etag"),
+            }
+            self._save()
+        return card, changed
@@ -0,0 +1,122 @@
+import time
+from collections import deque
+from enum import Enum
+from typing import Callable
+
+# Falhas consecutivas que abrem o circuito
+FAILURE_THRESHOLD = 3
+# Tempo com o circuito aberto antes de liberar uma requisição de teste
+RESET_TIMEOUT_SECONDS = 10.0
+
+# Timeout adaptativo: multiplicador sobre o p99 observado, com piso e teto
+LATENCY_WINDOW = 200
+LATENCY_MIN_SAMPLES = 20
+TIMEOUT_P99_MULTIPLIER = 2.0
+MIN_TIMEOUT_SECONDS = 1.0
+MAX_TIMEOUT_SECONDS = 30.0
+
+
+class CircuitState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """A requisição foi recusada porque o circuito do agente está aberto."""
+
+
+class CircuitBreaker:
+    """Circuit breaker de um agente remoto (fechado, aberto e meio-aberto).
+
+    Após `failure_threshold` falhas consecutivas o circuito abre e as
+    requisições falham na hora. Passado `reset_timeout`, o circuito fica
+    meio-aberto e deixa passar uma única requisição de teste: se ela tiver
+    sucesso o circuito fecha, se falhar ele abre de novo.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = FAILURE_THRESHOLD,
+        reset_timeout: float = RESET_TIMEOUT_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._state = CircuitState.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    @property
+    def state(self) -> CircuitState:
+        if (
+            self._state is CircuitState.OPEN
+            and self._clock() - self._opened_at >= self.reset_timeout
+        ):
+            self._state = CircuitState.HALF_OPEN
+            self._probe_in_flight = False
+        return self._state
+
+    def allow_request(self) -> bool:
+        state = self.state
+        if state is CircuitState.CLOSED:
+            return True
+        if state is CircuitState.HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self._state = CircuitState.CLOSED
+        self._failures = 0
+        self._probe_in_flight = False
+
+    def release(self) -> None:
+        """Libera a vaga de teste quando a requisição foi cancelada sem resultado."""
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self._state is CircuitState.HALF_OPEN or self._failures >= self.failure_threshold:
+            self._state = CircuitState.OPEN
+            self._opened_at = self._clock()
+            self._probe_in_flight = False
+
+
+class LatencyTracker:
+    """Janela das latências recentes de um agente, usada para derivar o timeout."""
+
+    def __init__(
+        self,
+        window: int = LATENCY_WINDOW,
+        min_samples: int = LATENCY_MIN_SAMPLES,
+        multiplier: float = TIMEOUT_P99_MULTIPLIER,
+        min_timeout: float = MIN_TIMEOUT_SECONDS,
+        max_timeout: float = MAX_TIMEOUT_SECONDS,
+    ):
+        self._samples: deque[float] = deque(maxlen=window)
+        self.min_samples = min_samples
+        self.multiplier = multiplier
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def percentile(self, q: float) -> float | None:
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def timeout(self) -> float:
+        """Timeout atual: `multiplier` x p99, limitado a [min_timeout, max_timeout].
+
+        Enquanto não houver amostras suficientes, usa `max_timeout`.
+        """
+        if len(self._samples) < self.min_samples:
+            return self.max_timeout
+        p99 = self.percentile(0.99)
+        return min(self.max_timeout, max(self.min_timeout, p99 * self.multiplier))
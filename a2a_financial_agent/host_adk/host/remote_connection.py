@@ -1,35 +1,109 @@
+import asyncio
+import importlib.util
+import logging
+import time
+import uuid
+from collections import defaultdict
+from collections.abc import AsyncIterator
 from typing import Callable
 
 import httpx
 from a2a.client import A2AClient
 from a2a.types import (
     AgentCard,
+    CancelTaskRequest,
+    DataPart,
     SendMessageRequest,
     SendMessageResponse,
+    SendStreamingMessageRequest,
+    SendStreamingMessageResponse,
     Task,
     TaskArtifactUpdateEvent,
+    TaskIdParams,
+    TaskState,
     TaskStatusUpdateEvent,
 )
 from dotenv import load_dotenv
 
+from .circuit_breaker import CircuitBreaker, CircuitOpenError, CircuitState, LatencyTracker
+
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 TaskCallbackArg = Task | TaskStatusUpdateEvent | TaskArtifactUpdateEvent
 TaskUpdateCallback = Callable[[TaskCallbackArg, AgentCard], Task]
 
+# Connection pool defaults for the shared httpx client
+HTTP_TIMEOUT_SECONDS = 30
+HTTP_MAX_CONNECTIONS = 100
+HTTP_MAX_KEEPALIVE_CONNECTIONS = 20
+HTTP_KEEPALIVE_EXPIRY_SECONDS = 30.0
+# Maximum in-flight requests to a single remote agent
+MAX_CONCURRENT_REQUESTS_PER_AGENT = 20
+# Timeout for the tasks/cancel sent when a call is abandoned
+CANCEL_TIMEOUT_SECONDS = 5
+
+
+def create_httpx_client(
+    timeout: float = HTTP_TIMEOUT_SECONDS,
+    max_connections: int = HTTP_MAX_CONNECTIONS,
+    max_keepalive_connections: int = HTTP_MAX_KEEPALIVE_CONNECTIONS,
+    keepalive_expiry: float = HTTP_KEEPALIVE_EXPIRY_SECONDS,
+    http2: bool | None = None,
+) -> httpx.AsyncClient:
+    """Creates the pooled httpx client shared by all remote agent connections.
+
+    HTTP/2 is enabled by default when the optional `h2` package is installed;
+    it is negotiated per server, so HTTP/1.1-only agents keep working.
+    """
+    if http2 is None:
+        http2 = importlib.util.find_spec("h2") is not None
+    return httpx.AsyncClient(
+        timeout=timeout,
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        ),
+        http2=http2,
+    )
+
+
+def _request_kind(
+    message_request: SendMessageRequest | SendStreamingMessageRequest,
+) -> str:
+    parts = message_request.params.message.parts
+    return "data" if any(isinstance(part.root, DataPart) for part in parts) else "text"
+
 
 class RemoteAgentConnections:
     """A class to hold the connections to the remote agents."""
 
-    def __init__(self, agent_card: AgentCard, agent_url: str):
-        print(f"agent_card: {agent_card}")
-        print(f"agent_url: {agent_url}")
-        self._httpx_client = httpx.AsyncClient(timeout=30)
+    def __init__(
+        self,
+        agent_card: AgentCard,
+        agent_url: str,
+        httpx_client: httpx.AsyncClient | None = None,
+        max_concurrent_requests: int = MAX_CONCURRENT_REQUESTS_PER_AGENT,
+    ):
+        logger.debug("Connecting to %s at %s", agent_card.name, agent_url)
+        # Only close the client on aclose() if this connection created it.
+        self._owns_httpx_client = httpx_client is None
+        self._httpx_client = httpx_client or create_httpx_client()
+        self._request_slots = asyncio.Semaphore(max_concurrent_requests)
+        self.circuit_breaker = CircuitBreaker()
+        # Structured (DataPart) requests skip the specialist's LLM and are
+        # orders of magnitude faster, so they get their own latency window.
+        self.latency: defaultdict[str, LatencyTracker] = defaultdict(LatencyTracker)
         self.agent_client = A2AClient(self._httpx_client, agent_card, url=agent_url)
         self.card = agent_card
         self.conversation_name = None
         self.conversation = None
-        self.pending_tasks = set()
+        # Remote task ids with a request in flight, cancelled on the remote
+        # agent if the caller gives up on them.
+        self.pending_tasks: set[str] = set()
+        self._background_cancels: set[asyncio.Task] = set()
 
     def get_agent(self) -> AgentCard:
         return self.card
@@ -37,4 +111,142 @@ class RemoteAgentConnections:
     async def send_message(
         self, message_request: SendMessageRequest
     ) -> SendMessageResponse:
-        return await self.agent_client.send_message(message_request)
\ No newline at end of file
+        """Sends a message, failing fast while the agent's circuit is open.
+
+        The request timeout is derived from the agent's observed p99 latency
+        instead of the fixed pool timeout.
+        """
+        self._fail_if_open()
+        latency = self.latency[_request_kind(message_request)]
+        task_id = message_request.params.message.taskId
+        async with self._request_slots:
+            # The half-open probe is claimed only once a slot is held: a
+            # caller cancelled while waiting for a slot must not keep it.
+            if not self.circuit_breaker.allow_request():
+                raise CircuitOpenError(f"Circuito aberto para o agente {self.card.name}")
+            started = time.monotonic()
+            self._track(task_id)
+            try:
+                response = await self.agent_client.send_message(
+                    message_request, http_kwargs={"timeout": latency.timeout()}
+                )
+            except asyncio.CancelledError:
+                self.circuit_breaker.release()
+                self._cancel_in_background(task_id)
+                raise
+            except Exception:
+                self.circuit_breaker.record_failure()
+                raise
+            finally:
+                self.pending_tasks.discard(task_id)
+            latency.record(time.monotonic() - started)
+            if _is_failed(response):
+                self.circuit_breaker.record_failure()
+            else:
+                self.circuit_breaker.record_success()
+            return response
+
+    async def send_message_streaming(
+        self, message_request: SendStreamingMessageRequest
+    ) -> AsyncIterator[SendStreamingMessageResponse]:
+        """Streams the task events for a message as the agent publishes them.
+
+        Uses the same circuit breaker and latency window as `send_message`.
+        A task that ends in the `failed` state counts as a breaker failure,
+        even if the caller stops reading right after that event.
+        """
+        self._fail_if_open()
+        latency = self.latency[_request_kind(message_request)]
+        task_id = message_request.params.message.taskId
+        async with self._request_slots:
+            if not self.circuit_breaker.allow_request():
+                raise CircuitOpenError(f"Circuito aberto para o agente {self.card.name}")
+            started = time.monotonic()
+            self._track(task_id)
+            failed = False
+            try:
+                async for response in self.agent_client.send_message_streaming(
+                    message_request, http_kwargs={"timeout": latency.timeout()}
+                ):
+                    if task_id is None:
+                        task_id = _response_task_id(response)
+                        self._track(task_id)
+                    if not failed and _is_failed(response):
+                        # Recorded before yielding: the caller usually raises
+                        # on this event and never resumes the stream.
+                        failed = True
+                        self.circuit_breaker.record_failure()
+                        self.pending_tasks.discard(task_id)
+                    yield response
+            except (asyncio.CancelledError, GeneratorExit):
+                if not failed:
+                    self.circuit_breaker.release()
+                    self._cancel_in_background(task_id)
+                raise
+            except Exception:
+                if not failed:
+                    self.circuit_breaker.record_failure()
+                raise
+            finally:
+                self.pending_tasks.discard(task_id)
+            latency.record(time.monotonic() - started)
+            if not failed:
+                self.circuit_breaker.record_success()
+
+    def _fail_if_open(self) -> None:
+        """Fails fast, without waiting for a slot, while the circuit is open."""
+        if self.circuit_breaker.state is CircuitState.OPEN:
+            raise CircuitOpenError(f"Circuito aberto para o agente {self.card.name}")
+
+    def _track(self, task_id: str | None) -> None:
+        if task_id is not None:
+            self.pending_tasks.add(task_id)
+
+    def _cancel_in_background(self, task_id: str | None) -> None:
+        """Asks the remote agent to cancel a task the caller gave up on.
+
+        Runs as a separate task because the caller is being cancelled (or,
+        for streams, closed) and cannot await anything itself.
+        """
+        if task_id is None:
+            return
+        task = asyncio.get_running_loop().create_task(self.cancel_task(task_id))
+        self._background_cancels.add(task)
+        task.add_done_callback(self._background_cancels.discard)
+
+    async def cancel_task(self, task_id: str) -> None:
+        """Cancels a task on the remote agent, freeing its capacity (e.g. the LLM call)."""
+        request = CancelTaskRequest(id=str(uuid.uuid4()), params=TaskIdParams(id=task_id))
+        try:
+            await self.agent_client.cancel_task(
+                request, http_kwargs={"timeout": CANCEL_TIMEOUT_SECONDS}
+            )
+            logger.info(f"Cancelled task {task_id} on {self.card.name}")
+        except Exception as e:
+            logger.warning(f"Could not cancel task {task_id} on {self.card.name}: {e}")
+
+    async def aclose(self) -> None:
+        """Cancels the in-flight remote tasks and closes the client if owned."""
+        for task_id in list(self.pending_tasks):
+            self._cancel_in_background(task_id)
+        if self._background_cancels:
+            await asyncio.gather(*self._background_cancels, return_exceptions=True)
+        if self._owns_httpx_client:
+            await self._httpx_client.aclose()
+
+
+def _response_task_id(response: SendStreamingMessageResponse) -> str | None:
+    result = getattr(response.root, "result", None)
+    if isinstance(result, Task):
+        return result.id
+    return getattr(result, "taskId", None)
+
+
+def _is_failed(response: SendMessageResponse | SendStreamingMessageResponse) -> bool:
+    """Whether the response reports the remote task as failed."""
+    result = getattr(response.root, "result", None)
+    if isinstance(result, Task):
+        return result.status.state == TaskState.failed
+    if isinstance(result, TaskStatusUpdateEvent):
+        return result.status.state == TaskState.failed
+    return False
@@ -0,0 +1,57 @@
+"""Roda vários agentes especializados em um único processo.
+
+Cada agente fica disponível em `http://<host>:<porta>/<nome do agente>/`.
+Para apontar o orquestrador para eles, defina `REMOTE_AGENT_URLS`, por exemplo:
+
+    REMOTE_AGENT_URLS=http://localhost:10000/check_budget_agent,http://localhost:10000/check_planning_agent,http://localhost:10000/check_legal_agent
+"""
+import argparse
+import importlib
+import logging
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+from common.server import (
+    DEFAULT_HOST,
+    MULTI_SPECIALIST_PORT,
+    SPECIALIST_WORKERS,
+    run_specialists,
+)
+
+SPECIALISTS = ["check_budget_agent", "check_planning_agent", "check_legal_agent"]
+
+load_dotenv()
+
+logging.basicConfig(level=logging.INFO)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "agents", nargs="*", default=SPECIALISTS,
+        help=f"agentes a iniciar (padrão: todos): {', '.join(SPECIALISTS)}",
+    )
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=MULTI_SPECIALIST_PORT)
+    parser.add_argument(
+        "--workers", type=int, default=SPECIALIST_WORKERS,
+        help="processos worker; com mais de um, o estado vai para SQLite",
+    )
+    parser.add_argument(
+        "--state-dir", type=Path, default=None,
+        help="diretório do estado compartilhado (SQLite) entre workers",
+    )
+    args = parser.parse_args()
+    unknown = sorted(set(args.agents) - set(SPECIALISTS))
+    if unknown:
+        parser.error(f"agentes desconhecidos: {', '.join(unknown)}")
+
+    configs = [importlib.import_module(f"{name}.agent").SPECIALIST for name in args.agents]
+    run_specialists(
+        configs, host=args.host, port=args.port, workers=args.workers, state_dir=args.state_dir
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+import asyncio
+
+import pytest
+from a2a.types import (
+    AgentCapabilities,
+    AgentCard,
+    Message,
+    MessageSendParams,
+    Part,
+    Role,
+    SendMessageRequest,
+    SendStreamingMessageRequest,
+    SendStreamingMessageResponse,
+    SendStreamingMessageSuccessResponse,
+    TaskState,
+    TaskStatus,
+    TaskStatusUpdateEvent,
+    TextPart,
+)
+
+from host.circuit_breaker import CircuitBreaker, CircuitState, LatencyTracker
+from host.remote_connection import RemoteAgentConnections
+
+
+def test_opens_after_consecutive_failures(clock):
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=10, clock=clock)
+
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state is CircuitState.CLOSED
+
+    breaker.record_failure()
+    assert breaker.state is CircuitState.OPEN
+    assert not breaker.allow_request()
+
+
+def test_half_open_lets_a_single_probe_through(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+    breaker.record_failure()
+
+    clock.now = 9.9
+    assert not breaker.allow_request()
+    clock.now = 10
+    assert breaker.state is CircuitState.HALF_OPEN
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+
+    # Uma requisição de teste cancelada libera a vaga sem mudar o estado.
+    breaker.release()
+    assert breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state is CircuitState.CLOSED
+
+
+def test_failed_probe_reopens(clock):
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=10, clock=clock)
+    for _ in range(3):
+        breaker.record_failure()
+
+    clock.now = 10
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state is CircuitState.OPEN
+    clock.now = 19
+    assert not breaker.allow_request()
+    clock.now = 20
+    assert breaker.allow_request()
+
+
+def test_latency_timeout():
+    tracker = LatencyTracker(min_samples=10, multiplier=2.0, min_timeout=1.0, max_timeout=30.0)
+    assert tracker.percentile(0.99) is None
+    assert tracker.timeout() == 30.0
+
+    for _ in range(9):
+        tracker.record(2.0)
+    assert tracker.timeout() == 30.0
+    tracker.record(3.0)
+    assert tracker.percentile(0.99) == 3.0
+    assert tracker.timeout() == 6.0
+
+    fast = LatencyTracker(min_samples=1)
+    fast.record(0.01)
+    assert fast.timeout() == fast.min_timeout
+
+
+def _card() -> AgentCard:
+    return AgentCard(
+        name="agente",
+        description="agente de teste",
+        url="http://localhost:1",
+        version="1",
+        capabilities=AgentCapabilities(streaming=True),
+        defaultInputModes=["text"],
+        defaultOutputModes=["text"],
+        skills=[],
+    )
+
+
+def _request(kind=SendMessageRequest):
+    return kind(
+        id="1",
+        params=MessageSendParams(
+            message=Message(
+                role=Role.user,
+                parts=[Part(root=TextPart(text="oi"))],
+                messageId="m1",
+            )
+        ),
+    )
+
+
+class StreamingClient:
+    """Cliente A2A falso que responde com uma tarefa `failed`."""
+
+    def __init__(self):
+        self.cancelled: list[str] = []
+
+    async def send_message_streaming(self, request, http_kwargs=None):
+        event = TaskStatusUpdateEvent(
+            taskId="task-1",
+            contextId="context-1",
+            status=TaskStatus(state=TaskState.failed),
+            final=True,
+        )
+        yield SendStreamingMessageResponse(
+            root=SendStreamingMessageSuccessResponse(id="1", result=event)
+        )
+
+    async def cancel_task(self, request, http_kwargs=None):
+        self.cancelled.append(request.params.id)
+
+
+def test_failed_stream_counts_as_breaker_failure():
+    card = _card()
+
+    async def run():
+        connection = RemoteAgentConnections(card, card.url)
+        client = connection.agent_client = StreamingClient()
+        request = _request(SendStreamingMessageRequest)
+        for _ in range(connection.circuit_breaker.failure_threshold):
+            # O chamador para de ler no evento `failed`, como o orquestrador.
+            async for _response in connection.send_message_streaming(request):
+                break
+        await asyncio.sleep(0)
+        await connection.aclose()
+        return connection, client
+
+    connection, client = asyncio.run(run())
+
+    assert connection.circuit_breaker.state is CircuitState.OPEN
+    assert client.cancelled == []
+    assert connection.pending_tasks == set()
+
+
+class SlowClient:
+    """Cliente A2A falso que nunca responde."""
+
+    async def send_message(self, request, http_kwargs=None):
+        await asyncio.Event().wait()
+
+    async def cancel_task(self, request, http_kwargs=None):
+        pass
+
+
+def test_cancel_while_waiting_for_a_slot_keeps_the_probe_free(clock):
+
+    async def run():
+        connection = RemoteAgentConnections(
+            _card(), "http://localhost:1", max_concurrent_requests=1
+        )
+        connection.agent_client = SlowClient()
+        breaker = connection.circuit_breaker = CircuitBreaker(
+            failure_threshold=1, reset_timeout=10, clock=clock
+        )
+        breaker.record_failure()
+        clock.now = 10
+
+        # A vaga única está ocupada; o chamador desiste enquanto espera por ela.
+        await connection._request_slots.acquire()
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(connection.send_message(_request()), 0.1)
+        connection._request_slots.release()
+        await connection.aclose()
+        return connection
+
+    connection = asyncio.run(run())
+
+    assert connection.circuit_breaker.state is CircuitState.HALF_OPEN
+    assert connection.circuit_breaker.allow_request()
@@ -0,0 +1,178 @@
+import json
+import os
+
+import pytest
+
+from common import expense_store
+from common.expense_ledger import KEEP_GENERATIONS, META_FILE, ExpenseLedger, convert_csv
+from common.expense_store import ExpenseIndex
+
+CSV = """\
+department,amount,supplier,approved_by_legal
+Marketing,2500,Agência XYZ,yes
+Marketing,1800,Agência XYZ,no
+ marketing ,1800.0,agência xyz ,YES
+TI,1800,Dell,no
+TI,1800,Dell,no
+TI,950.5,Dell,yes
+RH,300,Agência XYZ,no
+Financeiro,2500,Contabilidade ABC,yes
+TI,,Dell,yes
+TI,abc,Dell,yes
+"""
+
+QUERIES = [
+    # encontradas, com grafias diferentes
+    ("Marketing", 2500, "Agência XYZ"),
+    ("MARKETING", 2500.0, "  agência xyz"),
+    ("TI", 950.5, "Dell"),
+    ("RH", 300, "Agência XYZ"),
+    ("Financeiro", 2500, "Contabilidade ABC"),
+    # duplicadas: basta uma linha aprovada
+    ("Marketing", 1800, "Agência XYZ"),
+    ("TI", 1800, "Dell"),
+    # valor inexistente, abaixo, entre e acima dos valores da chave
+    ("TI", 100, "Dell"),
+    ("TI", 1000, "Dell"),
+    ("TI", 5000, "Dell"),
+    # combinação inexistente de departamento e fornecedor conhecidos
+    ("RH", 2500, "Dell"),
+    # departamento ou fornecedor desconhecidos
+    ("Jurídico", 2500, "Agência XYZ"),
+    ("Marketing", 2500, "Fornecedor Novo"),
+]
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / "expenses.csv"
+    path.write_text(CSV, encoding="utf-8")
+    return path
+
+
+@pytest.fixture
+def ledger_dir(tmp_path, csv_path):
+    ledger_dir = tmp_path / "expenses.ledger"
+    # Blocos pequenos para exercitar a leitura do CSV em partes.
+    convert_csv(csv_path, ledger_dir, chunk_rows=3)
+    return ledger_dir
+
+
+def test_ledger_matches_index(csv_path, ledger_dir):
+    index = ExpenseIndex.from_csv(csv_path)
+    ledger = ExpenseLedger.open(ledger_dir / META_FILE)
+
+    assert len(ledger) == len(index) == 6
+    for query in QUERIES:
+        assert ledger.is_planned(*query) == index.is_planned(*query), query
+        assert ledger.is_legally_approved(*query) == index.is_legally_approved(*query), query
+
+
+def test_duplicates_are_approved_if_any_row_is(ledger_dir):
+    ledger = ExpenseLedger.open(ledger_dir / META_FILE)
+
+    assert ledger.is_legally_approved("Marketing", 1800, "Agência XYZ")
+    assert ledger.is_planned("TI", 1800, "Dell")
+    assert not ledger.is_legally_approved("TI", 1800, "Dell")
+
+
+def test_lookup_many_matches_index(csv_path, ledger_dir):
+    index = ExpenseIndex.from_csv(csv_path)
+    ledger = ExpenseLedger.open(ledger_dir / META_FILE)
+    expenses = [
+        {"department": department, "amount": amount, "supplier": supplier}
+        for department, amount, supplier in QUERIES
+    ]
+
+    expected = index.lookup_many(expenses)
+    result = ledger.lookup_many(expenses)
+
+    assert result["planned"].tolist() == expected["planned"].tolist()
+    assert result["approved_by_legal"].tolist() == expected["approved_by_legal"].tolist()
+    assert ledger.lookup_many([]).empty
+
+
+def test_empty_csv(tmp_path):
+    csv_path = tmp_path / "expenses.csv"
+    csv_path.write_text(CSV.splitlines()[0] + "\n", encoding="utf-8")
+    convert_csv(csv_path, tmp_path / "ledger")
+
+    ledger = ExpenseLedger.open(tmp_path / "ledger" / META_FILE)
+
+    assert len(ledger) == 0
+    assert not ledger.is_planned("Marketing", 2500, "Agência XYZ")
+
+
+def test_generation_rotation(csv_path, ledger_dir):
+    first = ExpenseLedger.open(ledger_dir / META_FILE)
+
+    csv_path.write_text(CSV + "RH,400,Agência XYZ,yes\n", encoding="utf-8")
+    for _ in range(KEEP_GENERATIONS + 1):
+        convert_csv(csv_path, ledger_dir)
+
+    generations = sorted(path.name for path in ledger_dir.glob("gen-*"))
+    meta = json.loads((ledger_dir / META_FILE).read_text(encoding="utf-8"))
+    assert len(generations) == KEEP_GENERATIONS
+    assert meta["generation"] == generations[-1]
+    assert meta["rows"] == 7
+
+    current = ExpenseLedger.open(ledger_dir / META_FILE)
+    assert current.is_legally_approved("RH", 400, "Agência XYZ")
+    # Um processo que abriu uma geração removida continua lendo o mapeamento.
+    assert not first.is_planned("RH", 400, "Agência XYZ")
+    assert first.is_planned("Marketing", 2500, "Agência XYZ")
+
+
+def _use_store_files(monkeypatch, csv_path, ledger_dir):
+    monkeypatch.setattr(expense_store, "EXPENSES_FILE", csv_path)
+    monkeypatch.setattr(expense_store, "EXPENSES_LEDGER", ledger_dir)
+    monkeypatch.setattr(
+        expense_store, "_csv_snapshot", expense_store.FileSnapshot(csv_path, ExpenseIndex.from_csv)
+    )
+    monkeypatch.setattr(expense_store, "_ledger_snapshot", None)
+
+
+def _make_csv_newer(csv_path, ledger_dir):
+    meta_mtime = os.stat(ledger_dir / META_FILE).st_mtime_ns
+    csv_path.write_text(CSV + "RH,400,Agência XYZ,yes\n", encoding="utf-8")
+    os.utime(csv_path, ns=(meta_mtime + 1, meta_mtime + 1))
+
+
+def test_store_keeps_the_ledger_when_csv_is_newer(monkeypatch, csv_path, ledger_dir):
+    _use_store_files(monkeypatch, csv_path, ledger_dir)
+    monkeypatch.setattr(expense_store, "EXPENSES_CSV_FALLBACK", False)
+    assert isinstance(expense_store.get_expense_index(), ExpenseLedger)
+
+    _make_csv_newer(csv_path, ledger_dir)
+    index = expense_store.get_expense_index()
+    assert isinstance(index, ExpenseLedger)
+    assert not index.is_planned("RH", 400, "Agência XYZ")
+
+    convert_csv(csv_path, ledger_dir)
+    assert expense_store.get_expense_index().is_planned("RH", 400, "Agência XYZ")
+
+
+def test_store_falls_back_to_newer_csv_when_enabled(monkeypatch, csv_path, ledger_dir):
+    _use_store_files(monkeypatch, csv_path, ledger_dir)
+    monkeypatch.setattr(expense_store, "EXPENSES_CSV_FALLBACK", True)
+
+    _make_csv_newer(csv_path, ledger_dir)
+    index = expense_store.get_expense_index()
+    assert isinstance(index, ExpenseIndex)
+    assert index.is_planned("RH", 400, "Agência XYZ")
+
+    convert_csv(csv_path, ledger_dir)
+    assert isinstance(expense_store.get_expense_index(), ExpenseLedger)
+
+
+def test_rows_without_amount_are_skipped(csv_path, ledger_dir, caplog):
+    with caplog.at_level("WARNING"):
+        index = ExpenseIndex.from_csv(csv_path)
+    ledger = ExpenseLedger.open(ledger_dir / META_FILE)
+
+    assert "2 linha(s) sem valor numérico" in caplog.text
+    for source in (index, ledger):
+        assert source.is_planned("TI", 950.5, "Dell")
+        assert not source.lookup_many(
+            [{"department": "TI", "amount": float("nan"), "supplier": "Dell"}]
+        )["planned"].any()
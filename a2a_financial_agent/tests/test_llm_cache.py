@@ -0,0 +1,69 @@
+import asyncio
+
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+
+from common.llm_cache import LlmResponseCache
+
+
+async def same_embedding(text: str) -> list[float]:
+    # Frases que só diferem no departamento têm embeddings quase iguais.
+    return [1.0, 0.0, 0.0]
+
+
+def function_call(department: str) -> LlmResponse:
+    return LlmResponse(
+        content=types.Content(
+            role="model",
+            parts=[
+                types.Part(
+                    function_call=types.FunctionCall(
+                        name="check_planned_expense",
+                        args={
+                            "department": department,
+                            "amount": 2500,
+                            "supplier": "Agência XYZ",
+                        },
+                    )
+                )
+            ],
+        )
+    )
+
+
+def text(value: str) -> LlmResponse:
+    return LlmResponse(content=types.Content(role="model", parts=[types.Part(text=value)]))
+
+
+def lookup(cache: LlmResponseCache, key: str, user_text: str):
+    return asyncio.run(cache.lookup(key, "escopo", user_text))
+
+
+def store(cache: LlmResponseCache, key: str, user_text: str, responses: list[LlmResponse]):
+    _, embedding = lookup(cache, key, user_text)
+    cache.store(key, "escopo", user_text, embedding, responses)
+
+
+def test_function_calls_are_not_served_by_similarity():
+    cache = LlmResponseCache(embedder=same_embedding)
+    store(cache, "marketing", "2500 do Marketing com Agência XYZ", [function_call("Marketing")])
+
+    responses, _ = lookup(cache, "finance", "2500 do Finance com Agência XYZ")
+
+    assert responses is None
+    assert cache.semantic_hits == 0
+    # A mesma pergunta continua sendo servida pela camada exata.
+    responses, _ = lookup(cache, "marketing", "2500 do Marketing com Agência XYZ")
+    assert responses[0].content.parts[0].function_call.args["department"] == "Marketing"
+
+
+def test_text_answers_are_served_by_similarity_with_the_same_numbers():
+    cache = LlmResponseCache(embedder=same_embedding)
+    store(cache, "a", "Qual a previsão do tempo para 2025?", [text("Só posso ajudar com despesas.")])
+
+    same_numbers, _ = lookup(cache, "b", "Como estará o tempo em 2025?")
+    other_numbers, _ = lookup(cache, "c", "Como estará o tempo em 2026?")
+
+    assert same_numbers[0].content.parts[0].text == "Só posso ajudar com despesas."
+    assert other_numbers is None
+    assert cache.semantic_hits == 1
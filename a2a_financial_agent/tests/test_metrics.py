@@ -0,0 +1,41 @@
+import os
+import time
+
+from common.metrics import MetricsRegistry, MultiprocessMetrics, render_families
+
+
+def worker(directory, pid: str, in_flight: float) -> MultiprocessMetrics:
+    registry = MetricsRegistry()
+    registry.gauge("a2a_tasks_in_flight", "Tarefas em andamento").set(in_flight, agent="a")
+    registry.histogram("lag_seconds", "Atraso", buckets=(0.1,)).observe(0.05)
+    registry.add_collector(lambda: [("store_size", "Tarefas", {"agent": "a"}, 3)])
+    metrics = MultiprocessMetrics(directory, registry)
+    metrics.worker, metrics.path = pid, directory / f"worker-{pid}.json"
+    return metrics
+
+
+def test_scrape_includes_every_worker(tmp_path):
+    first = worker(tmp_path, "1", 2)
+    second = worker(tmp_path, "2", 5)
+    second.write()
+
+    text = render_families(first.collect())
+
+    assert text.count("# TYPE a2a_tasks_in_flight gauge") == 1
+    assert 'a2a_tasks_in_flight{agent="a",worker="1"} 2' in text
+    assert 'a2a_tasks_in_flight{agent="a",worker="2"} 5' in text
+    assert 'lag_seconds_bucket{worker="2",le="0.1"} 1' in text
+    assert 'store_size{agent="a",worker="1"} 3' in text
+
+
+def test_files_of_finished_workers_are_dropped(tmp_path):
+    current = worker(tmp_path, "1", 2)
+    finished = worker(tmp_path, "2", 5)
+    finished.write()
+    old = time.time() - current.stale_after - 1
+    os.utime(finished.path, (old, old))
+
+    text = render_families(current.collect())
+
+    assert 'worker="2"' not in text
+    assert not finished.path.exists()
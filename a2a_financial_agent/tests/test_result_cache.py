@@ -0,0 +1,133 @@
+import asyncio
+from types import SimpleNamespace
+
+from a2a.server.agent_execution.context import RequestContext
+from a2a.server.events.event_queue import EventQueue
+from a2a.types import (
+    Message,
+    MessageSendParams,
+    Part,
+    Role,
+    TaskArtifactUpdateEvent,
+    TextPart,
+)
+from google.adk.events import Event
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from common.adk_executor import ADKAgentExecutor
+from common.result_cache import TTLCache
+from common.structured import expense_cache_key, normalize_text
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = TTLCache(ttl=10, clock=clock)
+    cache.put("a", 1)
+
+    clock.now = 9.9
+    assert cache.get("a") == 1
+    clock.now = 10
+    assert cache.get("a") is None
+    assert len(cache) == 0
+    assert cache.hits == 1 and cache.misses == 1
+    assert cache.hit_ratio == 0.5
+
+
+def test_least_recently_used_is_evicted():
+    cache = TTLCache(max_size=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_put_refreshes_ttl(clock):
+    cache = TTLCache(ttl=10, clock=clock)
+    cache.put("a", 1)
+    clock.now = 8
+    cache.put("a", 2)
+    clock.now = 15
+    assert cache.get("a") == 2
+
+
+def test_cache_keys_are_normalized():
+    key = expense_cache_key({"department": " Marketing", "amount": "2500", "supplier": "ACME "})
+    assert key == expense_cache_key({"department": "marketing", "amount": 2500, "supplier": "acme"})
+    assert expense_cache_key({"expenses": []}) is None
+    assert expense_cache_key({"department": "Marketing"}) is None
+    assert normalize_text("  Está   PLANEJADA?\n") == "está planejada?"
+
+
+class FakeRunner:
+    """Runner do ADK falso: cada execução grava um evento na sessão e responde."""
+
+    app_name = "agente"
+    agent = SimpleNamespace(name="agente")
+
+    def __init__(self):
+        self.session_service = InMemorySessionService()
+        self.calls = 0
+        # Textos já presentes na sessão no início de cada execução
+        self.histories: list[list[str]] = []
+
+    async def run_async(self, user_id, session_id, new_message):
+        self.calls += 1
+        session = await self.session_service.get_session(
+            app_name=self.app_name, user_id=user_id, session_id=session_id
+        )
+        self.histories.append([event.content.parts[0].text for event in session.events])
+        await self.session_service.append_event(
+            session, Event(author="user", content=new_message)
+        )
+        event = Event(
+            author=self.app_name,
+            content=types.Content(
+                role="model", parts=[types.Part.from_text(text=f"resposta {self.calls}")]
+            ),
+        )
+        await self.session_service.append_event(session, event)
+        yield event
+
+
+async def _ask(executor: ADKAgentExecutor, text: str, context_id: str, task_id: str) -> str:
+    message = Message(
+        role=Role.user,
+        parts=[Part(root=TextPart(text=text))],
+        messageId=f"m-{task_id}",
+        contextId=context_id,
+        taskId=task_id,
+    )
+    queue = EventQueue()
+    await executor.execute(RequestContext(MessageSendParams(message=message)), queue)
+    while not queue.queue.empty():
+        event = await queue.dequeue_event()
+        if isinstance(event, TaskArtifactUpdateEvent):
+            return event.artifact.parts[0].root.text
+    raise AssertionError("nenhum artefato publicado")
+
+
+def test_text_answers_are_cached_only_for_the_first_turn():
+    runner = FakeRunner()
+    executor = ADKAgentExecutor(runner, result_cache=TTLCache())
+
+    async def run():
+        return [
+            await _ask(executor, "A despesa está planejada?", "c1", "t1"),
+            # Mesmo texto no início de outra conversa: resposta do cache.
+            await _ask(executor, "a despesa  está planejada?", "c2", "t2"),
+            # Mensagem seguinte de uma conversa: depende do histórico.
+            await _ask(executor, "sim", "c1", "t3"),
+            await _ask(executor, "sim", "c2", "t4"),
+        ]
+
+    answers = asyncio.run(run())
+
+    assert answers == ["resposta 1", "resposta 1", "resposta 2", "resposta 3"]
+    assert runner.calls == 3
+    # A resposta servida do cache também entra no histórico da conversa.
+    assert runner.histories[1] == ["A despesa está planejada?", "resposta 1"]
+    assert runner.histories[2] == ["a despesa  está planejada?", "resposta 1"]
@@ -0,0 +1,138 @@
+import asyncio
+
+import pytest
+from a2a.types import Task, TaskState, TaskStatus
+
+from common.task_store import BoundedTaskStore, SqliteTaskStore
+
+
+def task(task_id: str, state: TaskState = TaskState.working) -> Task:
+    return Task(id=task_id, contextId="context", status=TaskStatus(state=state))
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_finished_tasks_expire_after_ttl(clock):
+    store = BoundedTaskStore(ttl=10, clock=clock)
+
+    async def scenario():
+        await store.save(task("active"))
+        await store.save(task("done", TaskState.completed))
+        clock.now = 10
+        return await store.get("active"), await store.get("done")
+
+    active, done = run(scenario())
+
+    assert active is not None
+    assert done is None
+
+
+def test_finished_tasks_are_evicted_first():
+    store = BoundedTaskStore(max_size=2)
+
+    async def scenario():
+        await store.save(task("a"))
+        await store.save(task("b", TaskState.completed))
+        await store.save(task("c"))
+        return [await store.get(task_id) for task_id in ("a", "b", "c")]
+
+    a, b, c = run(scenario())
+
+    assert a is not None and c is not None
+    assert b is None
+    assert len(store) == 2
+    assert store.evicted == 1
+
+
+def test_active_tasks_are_evicted_when_nothing_else_is_left():
+    store = BoundedTaskStore(max_size=1)
+
+    async def scenario():
+        await store.save(task("a"))
+        await store.save(task("b"))
+        return await store.get("a"), await store.get("b")
+
+    a, b = run(scenario())
+
+    assert a is None and b is not None
+    assert store.evicted == 1
+
+
+@pytest.mark.parametrize("factory", ["sqlite", "bounded"])
+def test_terminal_state_is_not_replaced(tmp_path, factory):
+    if factory == "sqlite":
+        store = SqliteTaskStore(tmp_path / "tasks.sqlite3")
+    else:
+        store = BoundedTaskStore()
+
+    async def scenario():
+        await store.save(task("t"))
+        await store.save(task("t", TaskState.canceled))
+        # Ex.: o worker que executava a tarefa tenta concluí-la depois do cancelamento.
+        await store.save(task("t", TaskState.completed))
+        return await store.get("t")
+
+    assert run(scenario()).status.state is TaskState.canceled
+
+
+def test_same_terminal_state_can_be_saved_again(tmp_path):
+    store = SqliteTaskStore(tmp_path / "tasks.sqlite3")
+    updated = task("t", TaskState.completed)
+    updated.metadata = {"artefatos": 2}
+
+    async def scenario():
+        await store.save(task("t", TaskState.completed))
+        await store.save(updated)
+        return await store.get("t")
+
+    assert run(scenario()).metadata == {"artefatos": 2}
+
+
+def test_sqlite_store_is_shared_and_expires_tasks(tmp_path):
+    path = tmp_path / "tasks.sqlite3"
+    writer = SqliteTaskStore(path, ttl=0)
+    reader = SqliteTaskStore(path)
+
+    async def scenario():
+        await writer.save(task("active"))
+        await writer.save(task("done", TaskState.completed))
+        shared = await reader.get("active")
+        expired = await reader.get("done")
+        await reader.delete("active")
+        deleted = await writer.get("active")
+        return shared, expired, deleted
+
+    shared, expired, deleted = run(scenario())
+
+    assert shared is not None
+    assert expired is None
+    assert deleted is None
+    writer.close()
+    reader.close()
+
+
+def test_write_behind_persists_on_close(tmp_path):
+    path = tmp_path / "tasks.sqlite3"
+    # Intervalo longo: só o `close` grava as tarefas.
+    store = BoundedTaskStore(backend=SqliteTaskStore(path), flush_interval=3600)
+
+    async def scenario():
+        await store.save(task("a"))
+        await store.save(task("b"))
+        await store.delete("b")
+
+    run(scenario())
+    store.close()
+
+    restarted = BoundedTaskStore(backend=SqliteTaskStore(path))
+
+    async def reload():
+        return await restarted.get("a"), await restarted.get("b")
+
+    a, b = run(reload())
+    restarted.close()
+
+    assert a is not None
+    assert b is None